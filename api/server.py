@@ -1,17 +1,19 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
 import sys
 import json
 from datetime import datetime
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add src directory to path, so llm.* resolves to the same modules the scanners and agent use
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from src.llm.ollama_client import OllamaClient
-from src.llm.git_analyzer import GitAnalyzer
-from src.prompts.java_analysis import get_java_analysis_prompt
-from src.prompts.impact_analysis import get_impact_analysis_prompt, get_quality_report_prompt
+from llm.ollama_client import OllamaClient
+from llm.load_balancer import parse_base_urls
+from llm.response_cache import get_cache
+from llm.git_analyzer import GitAnalyzer
+from prompts.java_analysis import get_java_analysis_prompt
+from prompts.impact_analysis import get_impact_analysis_prompt, get_quality_report_prompt
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -24,6 +26,12 @@ API_PREFIX = f"/api/{API_VERSION}"
 REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_reports')
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# Shared Ollama client: requests reuse its pooled keep-alive connections and
+# answer repeated prompts from the persistent response cache
+# OLLAMA_API_URL may list several comma-separated servers to load-balance over
+OLLAMA_URLS = parse_base_urls(os.environ.get('OLLAMA_API_URL', 'http://localhost:11434'))
+ollama_client = OllamaClient(base_url=OLLAMA_URLS, cache=get_cache())
+
 # ============================================================================
 # Health & Status Endpoints
 # ============================================================================
@@ -38,7 +46,6 @@ def health_check():
         503: Service is unhealthy
     """
     try:
-        client = OllamaClient()
         return jsonify({
             'status': 'healthy',
             'version': API_VERSION,
@@ -66,10 +73,13 @@ def get_status():
             'timestamp': datetime.now().isoformat(),
             'reports_directory': REPORTS_DIR,
             'total_reports': total_reports,
+            'llm_cache': ollama_client.cache.get_statistics(),
+            'ollama_endpoints': ollama_client.balancer.get_statistics() if ollama_client.balancer else OLLAMA_URLS,
             'supported_languages': ['java', 'python', 'javascript', 'typescript'],
             'endpoints': {
                 'health': f'{API_PREFIX}/health',
                 'analyze': f'{API_PREFIX}/analyze',
+                'analyze_stream': f'{API_PREFIX}/analyze/stream',
                 'analyze_file': f'{API_PREFIX}/analyze/file',
                 'analyze_repo': f'{API_PREFIX}/analyze/repo',
                 'reports': f'{API_PREFIX}/reports',
@@ -83,6 +93,25 @@ def get_status():
 # Code Analysis Endpoints
 # ============================================================================
 
+def build_snippet_prompt(code, language):
+    """Build the analysis prompt for a code snippet"""
+    if language == 'java':
+        return get_java_analysis_prompt('snippet', code)
+    return f"""
+            You are an expert {language} code reviewer. Analyze the following code:
+            
+            ```{language}
+            {code}
+            ```
+            
+            Provide:
+            1. Functionality summary
+            2. Potential bugs or issues
+            3. Improvement suggestions
+            
+            Output in Markdown format.
+            """
+
 @app.route(f'{API_PREFIX}/analyze', methods=['POST'])
 def analyze_code():
     """
@@ -111,26 +140,10 @@ def analyze_code():
         save_report = data.get('save', False)
         
         # Initialize client
-        client = OllamaClient()
+        client = ollama_client
         
         # Generate prompt based on language
-        if language == 'java':
-            prompt = get_java_analysis_prompt('snippet', code)
-        else:
-            prompt = f"""
-            You are an expert {language} code reviewer. Analyze the following code:
-            
-            ```{language}
-            {code}
-            ```
-            
-            Provide:
-            1. Functionality summary
-            2. Potential bugs or issues
-            3. Improvement suggestions
-            
-            Output in Markdown format.
-            """
+        prompt = build_snippet_prompt(code, language)
         
         # Get analysis
         analysis = client.generate_response(prompt)
@@ -158,6 +171,44 @@ def analyze_code():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route(f'{API_PREFIX}/analyze/stream', methods=['POST'])
+def analyze_code_stream():
+    """
+    Analyze code snippet and stream tokens as they are generated
+    
+    Request Body:
+        {
+            "code": "string (required)",
+            "language": "string (optional, default: java)"
+        }
+    
+    Returns:
+        200: NDJSON stream, one {"token": ...} object per chunk, then {"error": "..."}
+             if generation failed, and always a final {"done": true, "metrics": {...}}
+             with time-to-first-token and tokens/sec
+        400: Bad request
+    """
+    data = request.get_json()
+    
+    if not data or 'code' not in data:
+        return jsonify({'error': 'Code is required'}), 400
+    
+    prompt = build_snippet_prompt(data['code'], data.get('language', 'java'))
+    
+    def generate():
+        metrics = {}
+        try:
+            for token in ollama_client.generate_stream(prompt, metrics):
+                yield json.dumps({'token': token}, ensure_ascii=False) + '\n'
+        except Exception as e:
+            metrics['error'] = str(e)
+        error = metrics.pop('error', None)
+        if error:
+            yield json.dumps({'error': error}, ensure_ascii=False) + '\n'
+        yield json.dumps({'done': True, 'metrics': metrics, 'timestamp': datetime.now().isoformat()}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route(f'{API_PREFIX}/analyze/file', methods=['POST'])
 def analyze_file():
     """
@@ -201,7 +252,7 @@ def analyze_file():
             code = f.read()
         
         # Analyze
-        client = OllamaClient()
+        client = ollama_client
         
         if language == 'java':
             prompt = get_java_analysis_prompt(file_path, code)
@@ -339,7 +390,7 @@ def impact_analysis():
             git_changes = []
         
         # Perform analysis
-        client = OllamaClient()
+        client = ollama_client
         
         # 1. Code Analysis
         code_analysis_prompt = get_java_analysis_prompt(file_path, code)
@@ -533,6 +584,7 @@ if __name__ == '__main__':
     print(f"  GET  {API_PREFIX}/health")
     print(f"  GET  {API_PREFIX}/status")
     print(f"  POST {API_PREFIX}/analyze")
+    print(f"  POST {API_PREFIX}/analyze/stream")
     print(f"  POST {API_PREFIX}/analyze/file")
     print(f"  POST {API_PREFIX}/analyze/repo")
     print(f"  POST {API_PREFIX}/impact")
@@ -10,19 +10,36 @@ from langchain.tools import Tool
 from langchain_core.prompts import PromptTemplate
 from langchain_core.language_models.llms import LLM
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun
-import requests
+import os
+import sys
 import json
 import hashlib
 import time
+import uuid
 from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# Add the src directory to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm.http_pool import DEFAULT_POOL_SIZE, get_session, get_timeout
+from llm.response_cache import ResponseCache, get_cache
+from code_chunker import CodeChunker, detect_language
+
+
+# 超出单次分析预算的代码不直接放入代理提示词，而是登记为引用，由工具取回完整代码后分片分析
+CODE_REF_PREFIX = "code://"
+
 
 class OllamaLLM(LLM):
     """自定义 Ollama LLM 包装器，用于 LangChain"""
     
     base_url: str = "http://localhost:11434"
     model: str = "qwen2.5:0.5b"
+    pool_size: int = DEFAULT_POOL_SIZE
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = 30
+    cache_path: Optional[str] = None
     
     @property
     def _llm_type(self) -> str:
@@ -36,19 +53,30 @@ class OllamaLLM(LLM):
         **kwargs: Any,
     ) -> str:
         """调用 Ollama API"""
+        cache = get_cache(self.cache_path) if self.cache_path else None
+        cache_key = None
+        if cache is not None:
+            cache_key = ResponseCache.make_key(self.model, prompt)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = requests.post(
+            response = get_session(self.pool_size).post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
                     "prompt": prompt,
                     "stream": False
                 },
-                timeout=30
+                timeout=get_timeout(self.connect_timeout, self.read_timeout)
             )
             response.raise_for_status()
             result = response.json()
-            return result.get("response", "")
+            text = result.get("response", "")
+            if cache_key is not None:
+                cache.set(cache_key, text, model=self.model)
+            return text
         except Exception as e:
             return f"Error calling Ollama: {e}"
 
@@ -103,7 +131,9 @@ class OptimizedCodeAnalysisAgent:
     """优化版代码分析智能代理"""
     
     def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "qwen2.5:0.5b",
-                 enable_cache: bool = True, enable_parallel: bool = True):
+                 enable_cache: bool = True, enable_parallel: bool = True,
+                 llm_cache: Optional[str] = None, chunk_tokens: int = 512,
+                 chunk_workers: int = 4):
         """
         初始化智能代理
         
@@ -112,10 +142,17 @@ class OptimizedCodeAnalysisAgent:
             model: 使用的模型名称
             enable_cache: 是否启用缓存
             enable_parallel: 是否启用并行调用
+            llm_cache: 持久化 LLM 响应缓存文件路径（跨进程、跨运行共享）
+            chunk_tokens: LLM 工具单次分析的代码 token 上限，超出时按函数边界分片
+            chunk_workers: 分片并发分析数
         """
-        self.llm = OllamaLLM(base_url=ollama_url, model=model)
+        self.llm = OllamaLLM(base_url=ollama_url, model=model, cache_path=llm_cache)
         self.enable_cache = enable_cache
         self.enable_parallel = enable_parallel
+        self.chunker = CodeChunker(chunk_tokens)
+        self.chunk_workers = max(1, chunk_workers)
+        # 代码引用 -> 完整代码（analyze 期间有效）
+        self._code_refs: Dict[str, str] = {}
         
         # 初始化缓存
         if self.enable_cache:
@@ -138,22 +175,22 @@ class OptimizedCodeAnalysisAgent:
             # 原有工具
             Tool(
                 name="analyze_code_quality",
-                func=self._cached_tool(self._analyze_code_quality),
+                func=self._cached_tool(self._analyze_code_quality, chunked=True),
                 description="深入分析代码质量，评估代码结构、命名规范、注释完整性、可读性和可维护性。输入：代码字符串。"
             ),
             Tool(
                 name="detect_bugs",
-                func=self._cached_tool(self._detect_bugs),
+                func=self._cached_tool(self._detect_bugs, chunked=True),
                 description="检测代码中的潜在 bug、逻辑错误、边界条件问题和空指针风险。输入：代码字符串。"
             ),
             Tool(
                 name="suggest_improvements",
-                func=self._cached_tool(self._suggest_improvements),
+                func=self._cached_tool(self._suggest_improvements, chunked=True),
                 description="提供代码改进建议，包括重构方案、性能优化、设计模式应用和最佳实践。输入：代码字符串。"
             ),
             Tool(
                 name="analyze_security",
-                func=self._cached_tool(self._analyze_security),
+                func=self._cached_tool(self._analyze_security, chunked=True),
                 description="全面分析代码安全隐患，包括 SQL 注入、XSS、CSRF、敏感信息泄露等。输入：代码字符串。"
             ),
             Tool(
@@ -168,24 +205,24 @@ class OptimizedCodeAnalysisAgent:
             ),
             Tool(
                 name="generate_summary",
-                func=self._cached_tool(self._generate_summary),
+                func=self._cached_tool(self._generate_summary, chunked=True),
                 description="生成代码功能摘要和技术文档，描述主要功能和核心逻辑。输入：代码字符串。"
             ),
             
             # 新增工具
             Tool(
                 name="analyze_performance",
-                func=self._cached_tool(self._analyze_performance),
+                func=self._cached_tool(self._analyze_performance, chunked=True),
                 description="分析代码性能瓶颈，识别耗时操作、内存使用和优化机会。输入：代码字符串。"
             ),
             Tool(
                 name="check_test_coverage",
-                func=self._cached_tool(self._check_test_coverage),
+                func=self._cached_tool(self._check_test_coverage, chunked=True),
                 description="评估代码的可测试性，建议测试用例和覆盖策略。输入：代码字符串。"
             ),
             Tool(
                 name="analyze_design_patterns",
-                func=self._cached_tool(self._analyze_design_patterns),
+                func=self._cached_tool(self._analyze_design_patterns, chunked=True),
                 description="识别代码中使用的设计模式，建议适用的设计模式。输入：代码字符串。"
             ),
             Tool(
@@ -195,33 +232,71 @@ class OptimizedCodeAnalysisAgent:
             ),
             Tool(
                 name="analyze_error_handling",
-                func=self._cached_tool(self._analyze_error_handling),
+                func=self._cached_tool(self._analyze_error_handling, chunked=True),
                 description="分析异常处理机制，评估错误处理的完整性和健壮性。输入：代码字符串。"
             ),
         ]
         
         return tools
     
-    def _cached_tool(self, func):
-        """为工具函数添加缓存装饰器"""
+    def _cached_tool(self, func, chunked: bool = False):
+        """为工具函数添加缓存装饰器（chunked 为 True 时大段代码按函数边界分片分析）"""
+        def run(code: str) -> str:
+            if chunked:
+                return self._run_chunked(func, code)
+            return func(code)
+        
         def wrapper(code: str) -> str:
+            code = self._resolve_code(code)
             if self.enable_cache:
                 # 检查缓存
-                cached_result = self.cache.get(func.__name__, code[:500])
+                cached_result = self.cache.get(func.__name__, code)
                 if cached_result:
                     return f"[缓存] {cached_result}"
                 
                 # 执行函数
-                result = func(code)
+                result = run(code)
                 
                 # 保存到缓存
-                self.cache.set(func.__name__, code[:500], result)
+                self.cache.set(func.__name__, code, result)
                 return result
             else:
-                return func(code)
+                return run(code)
         
         return wrapper
     
+    def _register_code(self, code: str) -> str:
+        """登记代码并返回引用（每次分析使用独立的引用，并行任务互不影响）"""
+        ref = CODE_REF_PREFIX + uuid.uuid4().hex[:12]
+        self._code_refs[ref] = code
+        return ref
+    
+    def _resolve_code(self, tool_input: str) -> str:
+        """工具输入是代码引用时取回完整代码，否则原样返回"""
+        ref = tool_input.strip().strip('`"\'').strip()
+        return self._code_refs.get(ref, tool_input)
+    
+    def _run_chunked(self, func, code: str) -> str:
+        """超出 token 预算的代码按函数边界分片，并发调用 LLM 工具后合并结果"""
+        if not self.chunker.needs_chunking(code):
+            return func(code)
+        
+        chunks = self.chunker.chunk(code, detect_language(code))
+        contents = [chunk['content'] for chunk in chunks]
+        if self.enable_parallel:
+            with ThreadPoolExecutor(max_workers=min(self.chunk_workers, len(contents))) as executor:
+                results = list(executor.map(func, contents))
+        else:
+            results = [func(content) for content in contents]
+        
+        merged = []
+        for chunk, result in zip(chunks, results):
+            header = f"### 片段 {chunk['index']}/{len(chunks)}（第 {chunk['start_line']}-{chunk['end_line']} 行"
+            if chunk['functions']:
+                header += f"，{', '.join(chunk['functions'])}"
+            merged.append(f"{header}）\n{result}")
+        return "\n\n".join(merged)
+    
     # ========== 优化的提示词模板 ==========
     
     def _analyze_code_quality(self, code: str) -> str:
@@ -230,7 +305,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请从以下维度进行评估（1-10分）：
@@ -250,7 +325,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 重点关注：
@@ -269,7 +344,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请提供：
@@ -288,7 +363,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 安全检查清单：
@@ -392,7 +467,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请包含：
@@ -413,7 +488,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请分析：
@@ -432,7 +507,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请提供：
@@ -451,7 +526,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请分析：
@@ -504,7 +579,7 @@ class OptimizedCodeAnalysisAgent:
 
 代码：
 ```
-{code[:1000]}
+{code}
 ```
 
 请检查：
@@ -574,9 +649,19 @@ Thought: {agent_scratchpad}"""
         Returns:
             分析结果字典
         """
+        ref = None
         try:
-            if code:
-                full_task = f"{task}\n\n代码内容:\n```\n{code[:2000]}\n```"
+            if code and self.chunker.needs_chunking(code):
+                # 大文件不截断：提示词中只给出引用和函数概览，工具通过引用取得完整代码并分片分析
+                ref = self._register_code(code)
+                chunks = self.chunker.chunk(code, detect_language(code))
+                functions = [name for chunk in chunks for name in chunk['functions']]
+                outline = ', '.join(functions[:30]) + (' ...' if len(functions) > 30 else '')
+                full_task = (f"{task}\n\n代码共 {code.count(chr(10)) + 1} 行，较长，未直接展开。"
+                             f"调用工具时 Action Input 请填写代码引用 {ref}，工具会取得完整代码。\n"
+                             f"包含的函数: {outline or '无'}")
+            elif code:
+                full_task = f"{task}\n\n代码内容:\n```\n{code}\n```"
             else:
                 full_task = task
             
@@ -594,6 +679,9 @@ Thought: {agent_scratchpad}"""
                 "task": task,
                 "error": str(e)
             }
+        finally:
+            if ref is not None:
+                self._code_refs.pop(ref, None)
     
     def analyze_parallel(self, tasks: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """
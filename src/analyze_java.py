@@ -5,15 +5,17 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from llm.ollama_client import OllamaClient
+from llm.response_cache import get_cache
 from prompts.java_analysis import get_java_analysis_prompt
 
-def process_directory(directory_path, output_dir=None):
+def process_directory(directory_path, output_dir=None, cache_path=None):
     """
     Recursively finds all .java files in the directory and analyzes them.
     
     Args:
         directory_path: Path to the directory containing Java files
         output_dir: Optional path to save analysis results. If None, only prints to console.
+        cache_path: Optional LLM response cache file. Unchanged files are answered from the cache.
     """
     if not os.path.isdir(directory_path):
         print(f"Error: Directory '{directory_path}' not found.")
@@ -39,7 +41,7 @@ def process_directory(directory_path, output_dir=None):
     print(f"Found {len(java_files)} Java files. Starting analysis...\n")
     
     # Initialize Ollama Client
-    client = OllamaClient()
+    client = OllamaClient(cache=get_cache(cache_path) if cache_path else None)
     
     for file_path in java_files:
         print(f"--- Analyzing {file_path} ---")
@@ -74,11 +76,13 @@ def process_directory(directory_path, output_dir=None):
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python3 src/analyze_java.py <directory_path> [output_directory]")
+        print("Usage: python3 src/analyze_java.py <directory_path> [output_directory] [cache_path]")
         print("  directory_path: Path to Java project directory")
         print("  output_directory: (Optional) Path to save analysis results")
+        print("  cache_path: (Optional) LLM response cache file to reuse results across runs")
         sys.exit(1)
     
     target_dir = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) > 2 else None
-    process_directory(target_dir, output_dir)
+    cache_path = sys.argv[3] if len(sys.argv) > 3 else None
+    process_directory(target_dir, output_dir, cache_path)
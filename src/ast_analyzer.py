@@ -10,24 +10,36 @@ import ast
 import subprocess
 from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict
+from functools import partial
 import json
 
+from parse_pool import parse_in_pool
+from parse_cache import ParseCache
+from impact_engine import DEFAULT_MAX_PATHS, Reachability, trace_reachability
+from symbol_graph import SymbolGraph
+
 
 class ASTAnalyzer:
     """AST 静态分析器基类"""
     
-    def __init__(self, language: str = 'Python'):
+    # 单文件分析结果的格式版本，修改 _analyze_python_file / _analyze_java_file 的输出时递增（使解析缓存失效）
+    ANALYZER_VERSION = 1
+    
+    def __init__(self, language: str = 'Python', parse_cache: Optional[ParseCache] = None):
         """
         初始化 AST 分析器
         
         Args:
             language: 编程语言（Python, Java）
+            parse_cache: 可选的解析缓存，内容未变化的文件直接使用缓存的分析结果
         """
         self.language = language
+        self.parse_cache = parse_cache
         self.classes = {}  # 类定义: {class_name: {file, methods, fields, parent}}
         self.methods = {}  # 方法定义: {method_name: {class, file, calls}}
-        self.dependencies = defaultdict(set)  # 依赖关系: {item: {dependencies}}
-        self.reverse_dependencies = defaultdict(set)  # 反向依赖: {item: {dependents}}
+        self.symbol_graph = SymbolGraph()  # 文件、模块、类名驻留为整数 id 的依赖图
+        self.dependencies = self.symbol_graph.forward  # 依赖关系视图: {item: [dependencies]}
+        self.reverse_dependencies = self.symbol_graph.reverse  # 反向依赖视图: {item: [dependents]}
         self.inheritance = defaultdict(set)  # 继承关系: {child: {parents}}
         self.implementations = defaultdict(set)  # 接口实现: {class: {interfaces}}
     
@@ -41,6 +53,17 @@ class ASTAnalyzer:
         Returns:
             分析结果字典
         """
+        if self.parse_cache is not None:
+            cached = self.parse_cache.lookup(file_path, self.language)
+            if cached is not None:
+                return cached
+        
+        result = self._analyze_file_uncached(file_path)
+        if self.parse_cache is not None:
+            self.parse_cache.store(file_path, self.language, result)
+        return result
+    
+    def _analyze_file_uncached(self, file_path: str) -> Dict:
         if self.language == 'Python':
             return self._analyze_python_file(file_path)
         elif self.language == 'Java':
@@ -48,6 +71,11 @@ class ASTAnalyzer:
         else:
             raise ValueError(f"Unsupported language: {self.language}")
     
+    @classmethod
+    def open_parse_cache(cls, path: str) -> ParseCache:
+        """打开与当前分析器版本匹配的解析缓存"""
+        return ParseCache(path, version=f"ast-{cls.ANALYZER_VERSION}")
+    
     def _analyze_python_file(self, file_path: str) -> Dict:
         """分析 Python 文件"""
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -134,15 +162,6 @@ class ASTAnalyzer:
             }
             
             classes.append(class_info)
-            
-            # 记录继承关系
-            if parent_class:
-                self.inheritance[class_name].add(parent_class)
-            
-            # 记录接口实现
-            if interfaces:
-                for interface in class_info['interfaces']:
-                    self.implementations[class_name].add(interface.strip())
         
         return classes
     
@@ -178,152 +197,136 @@ class ASTAnalyzer:
         
         return methods
     
-    def build_dependency_graph(self, files: List[str]) -> Dict:
+    def build_dependency_graph(self, files: List[str], workers: int = 1) -> Dict:
         """
         构建依赖关系图
         
         Args:
             files: 要分析的文件列表
+            workers: 解析文件的进程数（1 表示在当前进程中逐个解析）
             
         Returns:
             依赖图信息
         """
-        results = []
+        if workers <= 1:
+            results = [self.analyze_file(file_path) for file_path in files]
+        else:
+            results = self._analyze_files_parallel(files, workers)
         
-        for file_path in files:
-            result = self.analyze_file(file_path)
-            results.append(result)
-            
-            # 构建依赖关系
+        # 依赖关系在当前进程中按文件顺序合并
+        for result in results:
             if self.language == 'Python':
                 self._build_python_dependencies(result)
             elif self.language == 'Java':
                 self._build_java_dependencies(result)
         
+        if self.parse_cache is not None:
+            self.parse_cache.flush()
+        
         return {
             'files': results,
-            'dependencies': {k: list(v) for k, v in self.dependencies.items()},
-            'reverse_dependencies': {k: list(v) for k, v in self.reverse_dependencies.items()},
+            'dependencies': self.dependencies.to_dict(),
+            'reverse_dependencies': self.reverse_dependencies.to_dict(),
             'inheritance': {k: list(v) for k, v in self.inheritance.items()},
             'implementations': {k: list(v) for k, v in self.implementations.items()}
         }
     
+    def _analyze_files_parallel(self, files: List[str], workers: int) -> List[Dict]:
+        """缓存命中的文件在当前进程中取出，其余文件分发给进程池解析"""
+        results: List[Optional[Dict]] = [None] * len(files)
+        missing = []
+        for i, file_path in enumerate(files):
+            if self.parse_cache is not None:
+                results[i] = self.parse_cache.lookup(file_path, self.language)
+            if results[i] is None:
+                missing.append(i)
+        
+        parse = partial(analyze_file_summary, self.language)
+        for i, result in zip(missing, parse_in_pool(parse, [files[i] for i in missing], workers)):
+            results[i] = result
+            if self.parse_cache is not None:
+                self.parse_cache.store(files[i], self.language, result)
+        return results
+    
     def _build_python_dependencies(self, result: Dict):
         """构建 Python 依赖关系"""
         file_path = result['file']
         
         # 导入依赖
-        for imp in result.get('imports', []):
-            self.dependencies[file_path].add(imp)
-            self.reverse_dependencies[imp].add(file_path)
+        self.symbol_graph.add_edges(file_path, result.get('imports', []))
     
     def _build_java_dependencies(self, result: Dict):
         """构建 Java 依赖关系"""
         file_path = result['file']
         
         # 导入依赖
-        for imp in result.get('imports', []):
-            self.dependencies[file_path].add(imp)
-            self.reverse_dependencies[imp].add(file_path)
+        self.symbol_graph.add_edges(file_path, result.get('imports', []))
         
         # 继承依赖
         for class_info in result.get('classes', []):
             class_name = class_info['name']
             
+            # 记录继承关系和接口实现
+            if class_info.get('parent'):
+                self.inheritance[class_name].add(class_info['parent'])
+            for interface in class_info.get('interfaces', []):
+                self.implementations[class_name].add(interface)
+            
             if class_info.get('parent'):
-                self.dependencies[class_name].add(class_info['parent'])
-                self.reverse_dependencies[class_info['parent']].add(class_name)
+                self.symbol_graph.add_edge(class_name, class_info['parent'])
             
             # 接口依赖
-            for interface in class_info.get('interfaces', []):
-                self.dependencies[class_name].add(interface)
-                self.reverse_dependencies[interface].add(class_name)
+            self.symbol_graph.add_edges(class_name, class_info.get('interfaces', []))
     
-    def trace_impact(self, changed_items: List[str], max_depth: int = 5) -> Dict:
+    def trace_impact(self, changed_items: List[str], max_depth: int = 5,
+                     max_paths: int = DEFAULT_MAX_PATHS) -> Dict:
         """
         追踪变更影响链
         
         Args:
             changed_items: 变更的项目（文件、类、方法）
             max_depth: 最大追踪深度
+            max_paths: 每个变更项目每个方向最多保留的示例路径数
             
         Returns:
-            影响链信息
+            影响链信息：upstream_impact / downstream_impact 为示例路径，
+            upstream_affected / downstream_affected 为 {受影响项目: 最短距离}
         """
         upstream_impact = {}  # 向上影响（调用者）
         downstream_impact = {}  # 向下影响（被调用者）
+        upstream_affected = {}
+        downstream_affected = {}
+        affected = set(changed_items)
         
         for item in changed_items:
             # 向上追踪（谁依赖这个变更）
-            upstream_impact[item] = self._trace_upstream(item, max_depth)
+            upstream = self.trace_upstream(item, max_depth, max_paths)
+            upstream_impact[item] = upstream.sample_paths
+            upstream_affected[item] = upstream.affected
+            affected.update(upstream.distances)
             
             # 向下追踪（这个变更依赖谁）
-            downstream_impact[item] = self._trace_downstream(item, max_depth)
+            downstream = self.trace_downstream(item, max_depth, max_paths)
+            downstream_impact[item] = downstream.sample_paths
+            downstream_affected[item] = downstream.affected
+            affected.update(downstream.distances)
         
         return {
             'changed_items': changed_items,
             'upstream_impact': upstream_impact,
             'downstream_impact': downstream_impact,
-            'total_affected': self._count_affected(upstream_impact, downstream_impact)
+            'upstream_affected': upstream_affected,
+            'downstream_affected': downstream_affected,
+            'total_affected': len(affected)
         }
     
-    def _trace_upstream(self, item: str, max_depth: int) -> List[List[str]]:
-        """向上追踪依赖链（谁依赖我）"""
-        chains = []
-        visited = set()
-        
-        def dfs(current: str, path: List[str], depth: int):
-            if depth > max_depth or current in visited:
-                return
-            
-            visited.add(current)
-            new_path = path + [current]
-            
-            if current not in self.reverse_dependencies:
-                chains.append(new_path)
-                return
-            
-            for dependent in self.reverse_dependencies[current]:
-                dfs(dependent, new_path, depth + 1)
-        
-        dfs(item, [], 0)
-        return chains
+    def trace_upstream(self, item: str, max_depth: int = 5, max_paths: int = DEFAULT_MAX_PATHS) -> Reachability:
+        """向上追踪依赖链（谁依赖我），可通过 path_to 重建到任一受影响项目的路径"""
+        return trace_reachability(self.reverse_dependencies, item, max_depth, max_paths)
     
-    def _trace_downstream(self, item: str, max_depth: int) -> List[List[str]]:
+    def trace_downstream(self, item: str, max_depth: int = 5, max_paths: int = DEFAULT_MAX_PATHS) -> Reachability:
         """向下追踪依赖链（我依赖谁）"""
-        chains = []
-        visited = set()
-        
-        def dfs(current: str, path: List[str], depth: int):
-            if depth > max_depth or current in visited:
-                return
-            
-            visited.add(current)
-            new_path = path + [current]
-            
-            if current not in self.dependencies:
-                chains.append(new_path)
-                return
-            
-            for dependency in self.dependencies[current]:
-                dfs(dependency, new_path, depth + 1)
-        
-        dfs(item, [], 0)
-        return chains
-    
-    def _count_affected(self, upstream: Dict, downstream: Dict) -> int:
-        """统计受影响的项目总数"""
-        affected = set()
-        
-        for chains in upstream.values():
-            for chain in chains:
-                affected.update(chain)
-        
-        for chains in downstream.values():
-            for chain in chains:
-                affected.update(chain)
-        
-        return len(affected)
+        return trace_reachability(self.dependencies, item, max_depth, max_paths)
     
     def generate_impact_report(self, impact_data: Dict) -> str:
         """生成影响分析报告"""
@@ -362,6 +365,17 @@ class ASTAnalyzer:
         return ''.join(report)
 
 
+def analyze_file_summary(language: str, file_path: str) -> Dict:
+    """
+    在工作进程中分析单个文件，返回可 pickle 的分析结果（用于多进程解析）
+    
+    Args:
+        language: 编程语言（Python, Java）
+        file_path: 文件路径
+    """
+    return ASTAnalyzer(language=language).analyze_file(file_path)
+
+
 class PythonASTVisitor(ast.NodeVisitor):
     """Python AST 访问器"""
     
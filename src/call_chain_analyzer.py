@@ -6,10 +6,42 @@ Call Chain Analyzer - 函数调用链分析器
 
 import os
 import re
+from bisect import bisect_right
+from itertools import accumulate
 from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict
+from functools import partial
 import json
 
+from parse_pool import parse_in_pool
+from impact_engine import DEFAULT_MAX_PATHS, Reachability, trace_reachability
+from symbol_graph import SymbolGraph
+from graph_components import Condensation, condense
+
+
+_BRACE_OR_NEWLINE = re.compile(r'[{}\n]')
+
+# 方法定义: public/private/protected [static] [final] ReturnType methodName(params) {
+_JAVA_METHOD = re.compile(
+    r'^[ \t]*(public|private|protected)?\s*(static)?\s*(final)?\s*'
+    r'(\w+(?:<[^>]+>)?)\s+(\w+)\s*\(([^)]*)\)\s*(?:throws\s+[\w\s,]+)?\s*\{',
+    re.MULTILINE
+)
+_PYTHON_FUNCTION = re.compile(r'^[ \t]*def\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^:]+))?\s*:', re.MULTILINE)
+# 函数调用: name( 或 obj.name(；后行断言使 f(g()) 中紧跟在 '(' 之后的 g 也能匹配
+_CALL_NAME = re.compile(r'(?<!\w)(\w+)\s*\(')
+
+
+def _mermaid_node(name: str) -> str:
+    """Mermaid 节点：限定名中的 '.'、'(' 等字符不能出现在节点 id 中，此时使用带引号的标签"""
+    node_id = re.sub(r'\W', '_', name)
+    return f"{node_id}[{name}]" if node_id == name else f'{node_id}["{name}"]'
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    """各行起始字符偏移，配合 bisect 将字符偏移换算为行号（从 1 开始）"""
+    return list(accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+
 
 class CallChainAnalyzer:
     """函数调用链分析器"""
@@ -21,6 +53,7 @@ class CallChainAnalyzer:
         r'^is[A-Z]',   # boolean getter
         r'^has[A-Z]',  # has方法
     ]
+    _JAVA_DEFAULT_METHOD = re.compile('|'.join(f'(?:{p})' for p in JAVA_DEFAULT_METHOD_PATTERNS))
     
     # Java 常见工具方法（需要过滤的调用）
     JAVA_COMMON_METHODS = {
@@ -38,6 +71,12 @@ class CallChainAnalyzer:
         'valueOf', 'parse', 'format', 'append',
     }
     
+    # 各语言中形如调用但不是函数调用的名称（关键字、内置函数）
+    CALL_KEYWORDS = {
+        'Java': frozenset({'if', 'for', 'while', 'switch', 'catch', 'new', 'return'}),
+        'Python': frozenset({'if', 'for', 'while', 'with', 'print', 'len', 'range', 'str', 'int', 'list', 'dict'}),
+    }
+    
     def __init__(self, language: str = 'Java', filter_default_methods: bool = True):
         """
         初始化调用链分析器
@@ -49,8 +88,10 @@ class CallChainAnalyzer:
         self.language = language
         self.filter_default_methods = filter_default_methods
         self.functions = {}  # 函数定义: {function_name: {file, line, code}}
-        self.call_graph = defaultdict(set)  # 调用图: {caller: {callees}}
-        self.reverse_call_graph = defaultdict(set)  # 反向调用图: {callee: {callers}}
+        self.symbol_graph = SymbolGraph()  # 函数名驻留为整数 id 的调用图
+        self.call_graph = self.symbol_graph.forward  # 调用图视图: {caller: [callees]}
+        self.reverse_call_graph = self.symbol_graph.reverse  # 反向调用图视图: {callee: [callers]}
+        self._call_filters = {}  # 按语言构建一次的调用过滤表: {language: (排除的名称, 默认方法正则)}
     
     def extract_functions_java(self, content: str, file_path: str) -> List[Dict]:
         """
@@ -61,28 +102,19 @@ class CallChainAnalyzer:
         """
         functions = []
         
-        # 匹配方法定义的正则表达式
-        # 匹配: public/private/protected [static] [final] ReturnType methodName(params)
-        method_pattern = re.compile(
-            r'^\s*(public|private|protected)?\s*(static)?\s*(final)?\s*'
-            r'(\w+(?:<[^>]+>)?)\s+(\w+)\s*\(([^)]*)\)\s*(?:throws\s+[\w\s,]+)?\s*\{',
-            re.MULTILINE
-        )
-        
         lines = content.split('\n')
+        line_starts = _line_starts(lines)
         
-        for match in method_pattern.finditer(content):
+        matches = list(_JAVA_METHOD.finditer(content))
+        start_lines = [bisect_right(line_starts, match.start()) for match in matches]
+        # 一次扫描全文的大括号，得到所有方法的结束行
+        end_lines = self._find_method_ends(content, start_lines, len(lines))
+        
+        for match, start_line, end_line in zip(matches, start_lines, end_lines):
             method_name = match.group(5)
             params = match.group(6)
             return_type = match.group(4)
             
-            # 计算起始行号
-            start_pos = match.start()
-            start_line = content[:start_pos].count('\n') + 1
-            
-            # 查找方法结束位置（匹配大括号）
-            end_line = self._find_method_end(lines, start_line - 1)
-            
             # 提取方法代码
             method_code = '\n'.join(lines[start_line - 1:end_line])
             
@@ -117,12 +149,11 @@ class CallChainAnalyzer:
             是否应该过滤
         """
         # 检查是否匹配默认方法模式
-        for pattern in self.JAVA_DEFAULT_METHOD_PATTERNS:
-            if re.match(pattern, method_name):
-                # 进一步检查：如果方法体很简单（少于5行），则过滤
-                code_lines = [l.strip() for l in method_code.split('\n') if l.strip() and not l.strip().startswith('//')]
-                if len(code_lines) <= 5:
-                    return True
+        if self._JAVA_DEFAULT_METHOD.match(method_name):
+            # 进一步检查：如果方法体很简单（少于5行），则过滤
+            code_lines = [l.strip() for l in method_code.split('\n') if l.strip() and not l.strip().startswith('//')]
+            if len(code_lines) <= 5:
+                return True
         
         return False
     
@@ -135,22 +166,19 @@ class CallChainAnalyzer:
         """
         functions = []
         
-        # 匹配函数定义
-        func_pattern = re.compile(r'^\s*def\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^:]+))?\s*:', re.MULTILINE)
-        
         lines = content.split('\n')
+        line_starts = _line_starts(lines)
+        
+        matches = list(_PYTHON_FUNCTION.finditer(content))
+        start_lines = [bisect_right(line_starts, match.start()) for match in matches]
+        # 一次扫描所有行的缩进，得到所有函数的结束行
+        end_lines = self._find_python_function_ends(lines, start_lines)
         
-        for match in func_pattern.finditer(content):
+        for match, start_line, end_line in zip(matches, start_lines, end_lines):
             func_name = match.group(1)
             params = match.group(2)
             return_type = match.group(3) or 'None'
             
-            start_pos = match.start()
-            start_line = content[:start_pos].count('\n') + 1
-            
-            # 查找函数结束位置（基于缩进）
-            end_line = self._find_python_function_end(lines, start_line - 1)
-            
             func_code = '\n'.join(lines[start_line - 1:end_line])
             
             signature = f"def {func_name}({params})"
@@ -168,48 +196,78 @@ class CallChainAnalyzer:
         
         return functions
     
-    def _find_method_end(self, lines: List[str], start_line: int) -> int:
-        """查找Java方法的结束行（基于大括号匹配）"""
-        brace_count = 0
-        in_method = False
+    def _find_method_ends(self, content: str, start_lines: List[int], total_lines: int) -> List[int]:
+        """
+        查找所有Java方法的结束行（基于大括号匹配，单次扫描）
         
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                    in_method = True
-                elif char == '}':
-                    brace_count -= 1
-                    if in_method and brace_count == 0:
-                        return i + 1
-        
-        return len(lines)
+        每个方法从起始行行首开始计数，遇到第一个 '{' 后，大括号深度回到起始行行首的深度时结束。
+        
+        Args:
+            content: 文件内容
+            start_lines: 各方法的起始行（从 1 开始，升序）
+            total_lines: 总行数（未闭合的方法以此为结束行）
+        """
+        end_lines = [total_lines] * len(start_lines)
+        waiting: List[Tuple[int, int]] = []  # 已到起始行、尚未遇到 '{' 的方法: (序号, 起始深度)
+        open_methods: Dict[int, List[int]] = defaultdict(list)  # {起始深度: [方法序号]}
+        
+        next_method = 0
+        line = 1
+        depth = 0
+        
+        def enter_line():
+            nonlocal next_method
+            while next_method < len(start_lines) and start_lines[next_method] == line:
+                waiting.append((next_method, depth))
+                next_method += 1
+        
+        enter_line()
+        for match in _BRACE_OR_NEWLINE.finditer(content):
+            char = match.group()
+            if char == '\n':
+                line += 1
+                enter_line()
+            elif char == '{':
+                for index, base in waiting:
+                    open_methods[base].append(index)
+                waiting.clear()
+                depth += 1
+            else:
+                depth -= 1
+                for index in open_methods.pop(depth, ()):
+                    end_lines[index] = line
+        
+        return end_lines
     
-    def _find_python_function_end(self, lines: List[str], start_line: int) -> int:
-        """查找Python函数的结束行（基于缩进）"""
-        if start_line >= len(lines):
-            return len(lines)
+    def _find_python_function_ends(self, lines: List[str], start_lines: List[int]) -> List[int]:
+        """
+        查找所有Python函数的结束行（基于缩进，单次扫描）
         
-        # 获取函数定义的缩进级别
-        def_line = lines[start_line]
-        base_indent = len(def_line) - len(def_line.lstrip())
+        函数在其后第一个缩进不大于 def 行的非空、非注释行之前结束。
         
-        for i in range(start_line + 1, len(lines)):
-            line = lines[i]
-            
+        Args:
+            lines: 文件的所有行
+            start_lines: 各函数 def 所在行（从 1 开始，升序）
+        """
+        end_lines = [len(lines)] * len(start_lines)
+        starts_at: Dict[int, List[int]] = defaultdict(list)  # {行下标: [函数序号]}
+        for index, start_line in enumerate(start_lines):
+            starts_at[start_line - 1].append(index)
+        
+        stack: List[Tuple[int, int]] = []  # 未结束的函数: (缩进, 序号)，缩进单调递增
+        for i, line in enumerate(lines):
             # 跳过空行和注释
-            stripped = line.strip()
+            stripped = line.lstrip()
             if not stripped or stripped.startswith('#'):
                 continue
             
-            # 检查缩进
-            current_indent = len(line) - len(line.lstrip())
-            if current_indent <= base_indent:
-                return i
+            indent = len(line) - len(stripped)
+            while stack and stack[-1][0] >= indent:
+                end_lines[stack.pop()[1]] = i
+            for index in starts_at.get(i, ()):
+                stack.append((indent, index))
         
-        return len(lines)
+        return end_lines
     
     def extract_function_calls(self, function_code: str, language: str = 'Java') -> Set[str]:
         """
@@ -222,60 +280,43 @@ class CallChainAnalyzer:
         Returns:
             被调用的函数名集合
         """
-        calls = set()
-        
-        if language == 'Java':
-            # 匹配方法调用: methodName( 或 object.methodName(
-            call_pattern = re.compile(r'(?:^|[^\w])(\w+)\s*\(')
-            
-            for match in call_pattern.finditer(function_code):
-                method_name = match.group(1)
-                # 过滤掉关键字和构造函数
-                if method_name in ['if', 'for', 'while', 'switch', 'catch', 'new', 'return']:
-                    continue
-                
-                # 如果启用过滤，过滤掉getter/setter和常见方法
-                if self.filter_default_methods:
-                    # 过滤getter/setter
-                    is_default = False
-                    for pattern in self.JAVA_DEFAULT_METHOD_PATTERNS:
-                        if re.match(pattern, method_name):
-                            is_default = True
-                            break
-                    
-                    # 过滤常见工具方法
-                    if method_name in self.JAVA_COMMON_METHODS:
-                        is_default = True
-                    
-                    if not is_default:
-                        calls.add(method_name)
-                else:
-                    calls.add(method_name)
-        
-        elif language == 'Python':
-            # 匹配函数调用
-            call_pattern = re.compile(r'(?:^|[^\w])(\w+)\s*\(')
-            
-            for match in call_pattern.finditer(function_code):
-                func_name = match.group(1)
-                # 过滤掉关键字
-                if func_name not in ['if', 'for', 'while', 'with', 'print', 'len', 'range', 'str', 'int', 'list', 'dict']:
-                    calls.add(func_name)
-        
+        if language not in self.CALL_KEYWORDS:
+            return set()
+        excluded, default_method = self._call_filter(language)
+        
+        # 先对调用名去重，每个名称只查一次过滤表
+        calls = set(_CALL_NAME.findall(function_code))
+        calls -= excluded
+        if default_method is not None:
+            # 过滤getter/setter
+            calls = {name for name in calls if not default_method.match(name)}
         return calls
     
-    def build_call_graph(self, content: str, file_path: str) -> Dict:
+    def _call_filter(self, language: str) -> Tuple[frozenset, Optional[re.Pattern]]:
         """
-        构建函数调用图
+        语言对应的调用过滤表，每个分析器只构建一次
         
-        Args:
-            content: 文件内容
-            file_path: 文件路径
-            
         Returns:
-            调用图信息
+            (要排除的名称集合, 默认方法正则)；未启用过滤时 Java 只排除关键字，正则为 None
+        """
+        table = self._call_filters.get(language)
+        if table is None:
+            excluded = self.CALL_KEYWORDS[language]
+            default_method = None
+            if language == 'Java' and self.filter_default_methods:
+                # 过滤常见工具方法
+                excluded = excluded | self.JAVA_COMMON_METHODS
+                default_method = self._JAVA_DEFAULT_METHOD
+            table = self._call_filters[language] = (frozenset(excluded), default_method)
+        return table
+    
+    def summarize_file(self, content: str, file_path: str) -> Dict:
+        """
+        提取单个文件的函数定义和调用关系（不修改分析器的全局图）
+        
+        Returns:
+            文件摘要: {file, functions, calls: {caller: [callees]}}
         """
-        # 提取函数定义
         if self.language == 'Java':
             functions = self.extract_functions_java(content, file_path)
         elif self.language == 'Python':
@@ -283,90 +324,139 @@ class CallChainAnalyzer:
         else:
             functions = []
         
-        # 存储函数定义
+        calls = {}
         for func in functions:
+            calls[func['name']] = sorted(self.extract_function_calls(self._strip_declaration(func), self.language))
+        
+        return {'file': file_path, 'functions': functions, 'calls': calls}
+    
+    @staticmethod
+    def _strip_declaration(func: Dict) -> str:
+        """去掉函数声明中的 `函数名(`，避免把声明本身识别为一次自调用（否则每个函数都成了递归函数）"""
+        code = func['code']
+        match = re.search(rf'\b{re.escape(func["name"])}\s*\(', code)
+        if match is None:
+            return code
+        return code[:match.start()] + ' ' + code[match.end():]
+    
+    def merge_summary(self, summary: Dict):
+        """将单个文件的摘要合并到全局调用图"""
+        # 存储函数定义
+        for func in summary['functions']:
             self.functions[func['name']] = func
         
         # 构建调用关系
-        for func in functions:
-            caller = func['name']
-            callees = self.extract_function_calls(func['code'], self.language)
-            
-            for callee in callees:
-                self.call_graph[caller].add(callee)
-                self.reverse_call_graph[callee].add(caller)
-        
+        for caller, callees in summary['calls'].items():
+            self.symbol_graph.add_edges(caller, callees)
+    
+    def _graph_views(self, functions: List[Dict]) -> Dict:
         return {
             'functions': functions,
-            'call_graph': {k: list(v) for k, v in self.call_graph.items()},
-            'reverse_call_graph': {k: list(v) for k, v in self.reverse_call_graph.items()}
+            'call_graph': self.symbol_graph.forward.to_dict(),
+            'reverse_call_graph': self.symbol_graph.reverse.to_dict()
         }
     
-    def get_call_chain(self, function_name: str, max_depth: int = 5) -> List[List[str]]:
+    def build_call_graph(self, content: str, file_path: str) -> Dict:
         """
-        获取函数的调用链
+        构建函数调用图
         
         Args:
-            function_name: 函数名
-            max_depth: 最大深度
+            content: 文件内容
+            file_path: 文件路径
             
         Returns:
-            调用链列表
+            调用图信息
         """
-        chains = []
+        summary = self.summarize_file(content, file_path)
+        self.merge_summary(summary)
+        return self._graph_views(summary['functions'])
+    
+    def build_call_graph_from_files(self, file_paths: List[str], workers: int = 1) -> Dict:
+        """
+        解析多个文件并构建调用图
         
-        def dfs(current: str, path: List[str], depth: int):
-            if depth > max_depth:
-                return
-            
-            if current in path:  # 检测循环调用
-                chains.append(path + [current + " (循环)"])
-                return
-            
-            new_path = path + [current]
+        Args:
+            file_paths: 文件路径列表（按分析器的语言解析）
+            workers: 解析文件的进程数（1 表示在当前进程中逐个解析）
             
-            if current not in self.call_graph or not self.call_graph[current]:
-                chains.append(new_path)
-                return
+        Returns:
+            调用图信息（functions 包含所有文件的函数）
+        """
+        functions = []
+        parse = partial(summarize_call_file, self.language, self.filter_default_methods)
+        for summary in parse_in_pool(parse, file_paths, workers):
+            self.merge_summary(summary)
+            functions.extend(summary['functions'])
+        return self._graph_views(functions)
+    
+    def trace_calls(self, function_name: str, max_depth: int = 5, reverse: bool = False,
+                    max_paths: int = DEFAULT_MAX_PATHS) -> Reachability:
+        """
+        计算函数在调用图中可达的函数及最短调用距离
+        
+        Args:
+            function_name: 函数名
+            max_depth: 最大深度
+            reverse: 为 True 时沿反向调用图追踪（谁调用了这个函数）
+            max_paths: 最多保留的示例调用链数
             
-            for callee in self.call_graph[current]:
-                dfs(callee, new_path, depth + 1)
+        Returns:
+            Reachability 查询结果，可通过 path_to 重建到任一可达函数的调用链
+        """
+        graph = self.reverse_call_graph if reverse else self.call_graph
+        return trace_reachability(graph, function_name, max_depth, max_paths, mark_cycles=True)
+    
+    def get_call_chain(self, function_name: str, max_depth: int = 5,
+                       max_paths: int = DEFAULT_MAX_PATHS) -> List[List[str]]:
+        """
+        获取函数的调用链
         
-        dfs(function_name, [], 0)
-        return chains
+        Args:
+            function_name: 函数名
+            max_depth: 最大深度
+            max_paths: 最多返回的调用链数
+            
+        Returns:
+            调用链列表（最短的在前，循环调用以 "(循环)" 标记结尾）
+        """
+        return self.trace_calls(function_name, max_depth, max_paths=max_paths).sample_paths
     
-    def get_reverse_call_chain(self, function_name: str, max_depth: int = 5) -> List[List[str]]:
+    def get_reverse_call_chain(self, function_name: str, max_depth: int = 5,
+                               max_paths: int = DEFAULT_MAX_PATHS) -> List[List[str]]:
         """
         获取函数的反向调用链（谁调用了这个函数）
         
         Args:
             function_name: 函数名
             max_depth: 最大深度
+            max_paths: 最多返回的调用链数
             
         Returns:
-            反向调用链列表
+            反向调用链列表（从调用者到该函数，循环调用以 "(循环)" 标记开头）
+        """
+        reach = self.trace_calls(function_name, max_depth, reverse=True, max_paths=max_paths)
+        return [path[::-1] for path in reach.sample_paths]
+    
+    def analyze_cycles(self) -> Condensation:
         """
-        chains = []
+        计算整个调用图的强连通分量（线性时间）
         
-        def dfs(current: str, path: List[str], depth: int):
-            if depth > max_depth:
-                return
-            
-            if current in path:
-                chains.append([current + " (循环)"] + path)
-                return
-            
-            new_path = [current] + path
-            
-            if current not in self.reverse_call_graph or not self.reverse_call_graph[current]:
-                chains.append(new_path)
-                return
-            
-            for caller in self.reverse_call_graph[current]:
-                dfs(caller, new_path, depth + 1)
+        Returns:
+            Condensation：循环调用组（每组一次）以及按拓扑顺序编号的缩点 DAG
+        """
+        if self.call_graph is self.symbol_graph.forward:
+            # 按图版本缓存：共享同一张项目调用图的多个文件报告只计算一次
+            return self.symbol_graph.memo('condensation', lambda: condense(self.call_graph))
+        return condense(self.call_graph)
+    
+    def get_impact_order(self, function_name: str, max_depth: int = 5) -> List[str]:
+        """
+        修改函数后受影响的调用者，按缩点 DAG 的拓扑顺序排列
         
-        dfs(function_name, [], 0)
-        return chains
+        离变更点近的被调用者排在前面，同一循环调用组内的函数相邻。
+        """
+        affected = self.trace_calls(function_name, max_depth, reverse=True).affected
+        return self.analyze_cycles().order(affected, callees_first=True)
     
     def generate_call_chain_report(self) -> str:
         """生成调用链报告"""
@@ -375,23 +465,31 @@ class CallChainAnalyzer:
         report.append("# 函数调用链分析报告\n")
         report.append(f"**编程语言**: {self.language}\n")
         report.append(f"**函数总数**: {len(self.functions)}\n")
-        report.append(f"**调用关系数**: {sum(len(v) for v in self.call_graph.values())}\n\n")
+        report.append(f"**调用关系数**: {sum(len(self.call_graph.get(f, ())) for f in self.functions)}\n\n")
         
         # 统计信息
         report.append("## 统计信息\n")
         
         # 找出入口函数（没有被调用的函数）
-        entry_functions = set(self.functions.keys()) - set(self.reverse_call_graph.keys())
+        entry_functions = [f for f in self.functions if f not in self.reverse_call_graph]
         report.append(f"- **入口函数** (未被其他函数调用): {len(entry_functions)}\n")
         for func in sorted(entry_functions):
             report.append(f"  - `{func}`\n")
         
         # 找出叶子函数（不调用其他函数的函数）
-        leaf_functions = set(self.functions.keys()) - set(self.call_graph.keys())
+        leaf_functions = [f for f in self.functions if f not in self.call_graph]
         report.append(f"\n- **叶子函数** (不调用其他函数): {len(leaf_functions)}\n")
         for func in sorted(leaf_functions):
             report.append(f"  - `{func}`\n")
         
+        # 循环调用（强连通分量，每组只列出一次；只列出包含本报告函数的组）
+        condensation = self.analyze_cycles()
+        cyclic = {condensation.component_of[f] for f in self.functions if condensation.is_cyclic(f)}
+        cycles = sorted(sorted(condensation.components[index]) for index in cyclic)
+        report.append(f"\n- **循环调用组** (直接或间接递归): {len(cycles)}\n")
+        for members in cycles:
+            report.append(f"  - {' ⇄ '.join(f'`{m}`' for m in members)}\n")
+        
         # 详细的调用链
         report.append("\n## 详细调用链\n")
         
@@ -401,6 +499,10 @@ class CallChainAnalyzer:
             report.append(f"- **文件**: `{func['file']}`\n")
             report.append(f"- **位置**: 第 {func['start_line']}-{func['end_line']} 行\n")
             
+            cycle = condensation.cycle_of(func_name)
+            if cycle:
+                report.append(f"- **所在循环调用组**: {', '.join(f'`{m}`' for m in sorted(cycle))}\n")
+            
             # 正向调用链
             if func_name in self.call_graph and self.call_graph[func_name]:
                 report.append(f"- **调用的函数**: {', '.join(f'`{c}`' for c in sorted(self.call_graph[func_name]))}\n")
@@ -423,15 +525,34 @@ class CallChainAnalyzer:
         lines.append("```mermaid")
         lines.append("graph TD")
         
-        # 添加节点和边
-        for caller, callees in self.call_graph.items():
-            for callee in callees:
-                lines.append(f"    {caller}[{caller}] --> {callee}[{callee}]")
+        # 添加节点和边：本报告函数发出的调用，以及其他函数对它们的调用
+        for caller in self.functions:
+            for callee in self.call_graph.get(caller, ()):
+                lines.append(f"    {_mermaid_node(caller)} --> {_mermaid_node(callee)}")
+        for callee in self.functions:
+            for caller in self.reverse_call_graph.get(callee, ()):
+                if caller not in self.functions:
+                    lines.append(f"    {_mermaid_node(caller)} --> {_mermaid_node(callee)}")
         
         lines.append("```")
         return '\n'.join(lines)
 
 
+def summarize_call_file(language: str, filter_default_methods: bool, file_path: str) -> Dict:
+    """
+    在工作进程中读取并解析单个文件，返回可 pickle 的调用关系摘要（用于多进程解析）
+    
+    Args:
+        language: 编程语言
+        filter_default_methods: 是否过滤默认方法
+        file_path: 文件路径
+    """
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    analyzer = CallChainAnalyzer(language=language, filter_default_methods=filter_default_methods)
+    return analyzer.summarize_file(content, file_path)
+
+
 if __name__ == "__main__":
     # 测试代码
     test_java_code = """
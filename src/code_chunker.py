@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Code Chunker - 按函数边界将大文件切分为受 token 预算约束的代码片段
+用于避免超长提示词撑爆模型上下文，或只分析文件开头的一小部分
+"""
+
+import re
+from typing import List, Dict, Optional, Tuple
+
+from call_chain_analyzer import CallChainAnalyzer
+
+
+# 粗略估算: 平均每个 token 约 4 个字符（代码中英文标识符为主）
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的 token 数量"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def detect_language(code: str) -> Optional[str]:
+    """根据代码内容粗略判断语言（用于没有文件扩展名的代码片段）"""
+    if re.search(r'^\s*def\s+\w+\s*\(.*\)\s*(?:->\s*[^:]+)?:', code, re.MULTILINE):
+        return 'Python'
+    if re.search(r'^\s*(public|private|protected)\s+[\w<>\[\], ]+\s+\w+\s*\(', code, re.MULTILINE):
+        return 'Java'
+    return None
+
+
+class CodeChunker:
+    """按函数边界切分代码文件"""
+
+    def __init__(self, max_tokens: int = 2048):
+        """
+        初始化代码切分器
+
+        Args:
+            max_tokens: 每个片段的最大 token 数
+        """
+        self.max_tokens = max_tokens
+        self.max_chars = max_tokens * CHARS_PER_TOKEN
+
+    def needs_chunking(self, content: str) -> bool:
+        """判断内容是否超出 token 预算"""
+        return estimate_tokens(content) > self.max_tokens
+
+    def chunk(self, content: str, language: Optional[str] = None) -> List[Dict]:
+        """
+        将代码切分为与函数边界对齐的片段
+
+        Args:
+            content: 文件内容
+            language: 编程语言（Java, Python；其他语言按空行切分）
+
+        Returns:
+            片段列表: [{index, start_line, end_line, functions, content}]
+        """
+        lines = content.split('\n')
+        segments = self._split_segments(content, lines, language)
+
+        chunks = []
+        current: List[Tuple[int, int, List[str]]] = []
+        current_chars = 0
+
+        for start, end, names in segments:
+            size = sum(len(lines[i]) + 1 for i in range(start - 1, end))
+
+            # 单个片段超出预算时按行硬切分
+            if size > self.max_chars:
+                if current:
+                    chunks.append(self._make_chunk(lines, current))
+                    current, current_chars = [], 0
+                for piece in self._split_lines(lines, start, end, names):
+                    chunks.append(self._make_chunk(lines, [piece]))
+                continue
+
+            if current and current_chars + size > self.max_chars:
+                chunks.append(self._make_chunk(lines, current))
+                current, current_chars = [], 0
+
+            current.append((start, end, names))
+            current_chars += size
+
+        if current:
+            chunks.append(self._make_chunk(lines, current))
+
+        for index, chunk in enumerate(chunks, 1):
+            chunk['index'] = index
+        return chunks
+
+    def _split_segments(self, content: str, lines: List[str],
+                        language: Optional[str]) -> List[Tuple[int, int, List[str]]]:
+        """
+        将文件划分为连续的行区间: 函数体各自成段，函数之间的代码（类头、字段、导入等）单独成段
+
+        Returns:
+            [(start_line, end_line, function_names)]，行号从 1 开始且首尾相接
+        """
+        total = len(lines)
+        ranges = self._function_ranges(content, language)
+
+        if not ranges:
+            return self._blank_line_segments(lines)
+
+        segments = []
+        cursor = 1
+        for start, end, name in ranges:
+            if start < cursor:
+                continue  # 嵌套函数已包含在外层函数中
+            if start > cursor:
+                segments.append((cursor, start - 1, []))
+            end = max(start, min(end, total))
+            segments.append((start, end, [name]))
+            cursor = end + 1
+        if cursor <= total:
+            segments.append((cursor, total, []))
+        return segments
+
+    def _function_ranges(self, content: str, language: Optional[str]) -> List[Tuple[int, int, str]]:
+        """使用 CallChainAnalyzer 提取函数的起止行"""
+        analyzer = CallChainAnalyzer(language=language or '', filter_default_methods=False)
+        if language == 'Java':
+            functions = analyzer.extract_functions_java(content, '')
+        elif language == 'Python':
+            functions = analyzer.extract_functions_python(content, '')
+        else:
+            return []
+        return sorted((f['start_line'], f['end_line'], f['name']) for f in functions)
+
+    def _blank_line_segments(self, lines: List[str]) -> List[Tuple[int, int, List[str]]]:
+        """没有函数信息时按空行分块"""
+        segments = []
+        start = 1
+        for i, line in enumerate(lines, 1):
+            if not line.strip() and i > start:
+                segments.append((start, i, []))
+                start = i + 1
+        if start <= len(lines):
+            segments.append((start, len(lines), []))
+        return segments
+
+    def _split_lines(self, lines: List[str], start: int, end: int,
+                     names: List[str]) -> List[Tuple[int, int, List[str]]]:
+        """将超长区间按行切分为不超过预算的片段"""
+        pieces = []
+        piece_start = start
+        size = 0
+        for line_no in range(start, end + 1):
+            line_size = len(lines[line_no - 1]) + 1
+            if size and size + line_size > self.max_chars:
+                pieces.append((piece_start, line_no - 1, names))
+                piece_start, size = line_no, 0
+            size += line_size
+        pieces.append((piece_start, end, names))
+        return pieces
+
+    def _make_chunk(self, lines: List[str], segments: List[Tuple[int, int, List[str]]]) -> Dict:
+        start_line = segments[0][0]
+        end_line = segments[-1][1]
+        functions = [name for _, _, names in segments for name in names]
+        return {
+            'index': 0,
+            'start_line': start_line,
+            'end_line': end_line,
+            'functions': functions,
+            'content': '\n'.join(lines[start_line - 1:end_line]),
+        }
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Dependency Index - 文件级反向依赖索引
+基于 ASTAnalyzer 提取的导入、继承和接口实现关系，以及项目调用图中的跨文件调用
+（同包的 Java 类互相调用时不需要导入），找出依赖变更文件的其他文件
+"""
+
+import os
+from collections import defaultdict, deque
+from typing import List, Dict, Set, Optional, Tuple
+
+from ast_analyzer import ASTAnalyzer
+from file_signature import stat_signature
+from graph_components import condense
+from parse_pool import parse_in_pool
+from project_call_graph import SUMMARY_VERSION, ProjectCallGraph, summarize_project_file
+
+# 符号摘要的格式版本（包含调用摘要的版本），缓存中版本不同的摘要重新解析
+SYMBOLS_VERSION = f"2.{SUMMARY_VERSION}"
+
+
+class DependencyIndex:
+    """文件级依赖索引（支持 Python 和 Java）"""
+
+    LANGUAGES = {'.py': 'Python', '.java': 'Java'}
+
+    def __init__(self, root_dir: str, cache=None, workers: int = 1):
+        """
+        初始化依赖索引
+
+        Args:
+            root_dir: 项目根目录
+            cache: 可选的 AnalysisCache，用于持久化每个文件的符号摘要（文件未变化时无需重新解析）
+            workers: 解析文件的进程数（1 表示在当前进程中逐个解析）
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.cache = cache
+        self.workers = workers
+        self.symbols: Dict[str, Dict] = {}  # 文件符号摘要: {file: {language, imports, types, ...}}
+        self.dependencies = defaultdict(set)  # 文件依赖: {file: {被依赖的文件}}
+        self.reverse_dependencies = defaultdict(set)  # 反向依赖: {file: {依赖它的文件}}
+        self.call_graph: Optional[ProjectCallGraph] = None  # 由符号摘要中的调用摘要链接而成
+        self._blast_radii: Optional[Dict[str, int]] = None  # 每次链接后按需计算一次
+        self.stats = {'files': 0, 'parsed_files': 0, 'reused_files': 0, 'edges': 0, 'call_edges': 0}
+
+    def build(self, files: List[str]):
+        """
+        解析文件并构建文件级依赖图
+
+        Args:
+            files: 项目中的文件列表
+        """
+        cached_symbols = self.cache.load_symbols() if self.cache is not None else {}
+
+        to_parse = []  # (文件, 语言, 状态签名)
+        for file_path in files:
+            abs_path = os.path.abspath(file_path)
+            language = self.LANGUAGES.get(os.path.splitext(abs_path)[1].lower())
+            if not language:
+                continue
+
+            signature = stat_signature(abs_path)
+            cached = cached_symbols.get(abs_path)
+            if (cached is not None and signature is not None and cached[0] == signature
+                    and cached[1].get('version') == SYMBOLS_VERSION):
+                self.symbols[abs_path] = cached[1]
+                self.stats['reused_files'] += 1
+                continue
+            to_parse.append((abs_path, language, signature))
+
+        # 需要重新解析的文件分发给进程池，摘要在当前进程中写入索引和缓存
+        summaries = parse_in_pool(summarize_file, [(path, language) for path, language, _ in to_parse], self.workers)
+        for (abs_path, _, signature), summary in zip(to_parse, summaries):
+            self.symbols[abs_path] = summary
+            self.stats['parsed_files'] += 1
+            if self.cache is not None and signature is not None:
+                self.cache.set_symbols(abs_path, signature, summary)
+
+        if self.cache is not None:
+            self.cache.flush()
+
+        self.stats['files'] = len(self.symbols)
+        self._link()
+
+    def update(self, changed_files: List[str], deleted_files: List[str] = None):
+        """
+        增量更新索引：重新解析变更的文件、移除已删除的文件，然后重新链接依赖
+
+        Args:
+            changed_files: 新增或修改的文件
+            deleted_files: 已删除的文件
+        """
+        for file_path in deleted_files or []:
+            self.symbols.pop(os.path.abspath(file_path), None)
+
+        for file_path in changed_files:
+            abs_path = os.path.abspath(file_path)
+            language = self.LANGUAGES.get(os.path.splitext(abs_path)[1].lower())
+            signature = stat_signature(abs_path)
+            if not language or signature is None:
+                continue
+            summary = summarize_file((abs_path, language))
+            self.symbols[abs_path] = summary
+            self.stats['parsed_files'] += 1
+            if self.cache is not None:
+                self.cache.set_symbols(abs_path, signature, summary)
+
+        if self.cache is not None:
+            self.cache.flush()
+
+        self.dependencies.clear()
+        self.reverse_dependencies.clear()
+        self.stats['files'] = len(self.symbols)
+        self._link()
+
+    def _link(self):
+        """将导入、继承和跨文件调用解析为文件，生成依赖边"""
+        self._blast_radii = None
+        modules = defaultdict(set)  # Python 模块名（含各级后缀）-> 文件
+        qualified_types = defaultdict(set)  # Java 全限定类名 -> 文件
+        packages = defaultdict(set)  # Java 包名 -> 文件
+        simple_types = defaultdict(set)  # 类型简单名 -> 文件
+
+        for file_path, summary in self.symbols.items():
+            for type_name in summary['types']:
+                simple_types[type_name].add(file_path)
+
+            if summary['language'] == 'Python':
+                parts = os.path.relpath(file_path, self.root_dir)[:-len('.py')].split(os.sep)
+                if parts[-1] == '__init__':
+                    parts = parts[:-1]
+                for i in range(len(parts)):
+                    modules['.'.join(parts[i:])].add(file_path)
+            else:
+                package = summary.get('package') or ''
+                packages[package].add(file_path)
+                for type_name in summary['types']:
+                    qualified_types[f"{package}.{type_name}" if package else type_name].add(file_path)
+
+        for file_path, summary in self.symbols.items():
+            targets = set()
+            if summary['language'] == 'Python':
+                for imp in summary['imports']:
+                    targets |= self._resolve_module(imp, modules)
+            else:
+                imported = set()
+                for imp in summary['imports']:
+                    if imp.endswith('.*'):
+                        imported |= packages.get(imp[:-2], set())
+                    else:
+                        imported |= qualified_types.get(imp, set())
+                targets |= imported
+
+                # 继承和接口实现：同包或已导入的同名类型优先
+                package_files = packages.get(summary.get('package') or '', set())
+                for parent in summary['parents']:
+                    candidates = simple_types.get(parent.split('.')[-1], set())
+                    preferred = candidates & (package_files | imported)
+                    targets |= preferred or candidates
+
+            targets.discard(file_path)
+            for target in targets:
+                self.dependencies[file_path].add(target)
+                self.reverse_dependencies[target].add(file_path)
+
+        self._link_calls()
+        self.stats['edges'] = sum(len(v) for v in self.dependencies.values())
+
+    def _link_calls(self):
+        """调用其他文件中函数的文件依赖被调用函数所在的文件（不需要导入的同包调用也能发现）"""
+        self.call_graph = ProjectCallGraph(self.root_dir, filter_default_methods=False).link(
+            {path: summary['calls'] for path, summary in self.symbols.items() if summary.get('calls')})
+        functions = self.call_graph.functions
+        call_edges = 0
+        for caller, callee in self.call_graph.symbol_graph.edges():
+            target = functions.get(callee)
+            if target is None:
+                continue  # 未解析到项目内函数的外部调用
+            source, target = functions[caller]['file'], target['file']
+            if source != target and target not in self.dependencies[source]:
+                self.dependencies[source].add(target)
+                self.reverse_dependencies[target].add(source)
+                call_edges += 1
+        self.stats['call_edges'] = call_edges
+
+    @staticmethod
+    def _resolve_module(name: str, modules: Dict[str, Set[str]]) -> Set[str]:
+        """按最长前缀匹配解析 Python 导入（a.b.c 依次尝试 a.b.c、a.b、a）"""
+        parts = name.split('.')
+        for end in range(len(parts), 0, -1):
+            files = modules.get('.'.join(parts[:end]))
+            if files:
+                return files
+        return set()
+
+    def get_dependents(self, changed_files: List[str], max_depth: int = 1) -> Dict[str, int]:
+        """
+        查找依赖变更文件的文件（广度优先，按层数限制）
+
+        Args:
+            changed_files: 变更的文件
+            max_depth: 最大追踪层数（1 表示只包含直接依赖者）
+
+        Returns:
+            {依赖文件: 距离变更文件的层数}，不包含变更文件本身
+        """
+        changed = {os.path.abspath(f) for f in changed_files}
+        distances = {f: 0 for f in changed}
+        queue = deque(changed)
+
+        while queue:
+            current = queue.popleft()
+            depth = distances[current]
+            if depth >= max_depth:
+                continue
+            for dependent in self.reverse_dependencies.get(current, ()):
+                if dependent not in distances:
+                    distances[dependent] = depth + 1
+                    queue.append(dependent)
+
+        return {f: d for f, d in distances.items() if f not in changed}
+
+    def blast_radius(self, file_path: str) -> int:
+        """文件的影响范围：直接或间接依赖它的文件数"""
+        return self._compute_blast_radii().get(os.path.abspath(file_path), 0)
+
+    def _compute_blast_radii(self) -> Dict[str, int]:
+        """
+        一次计算所有文件的影响范围
+
+        反向依赖图缩点后为 DAG，按逆拓扑顺序合并后继分量的可达集合（以整数位图表示），
+        每个分量只计算一次，而不是对每个文件各做一次广度优先搜索。
+        """
+        if self._blast_radii is None:
+            result = condense(self.reverse_dependencies)
+            reach = [0] * len(result.components)
+            for index in range(len(result.components) - 1, -1, -1):
+                bits = 1 << index
+                for successor in result.dag[index]:
+                    bits |= reach[successor]
+                reach[index] = bits
+            radii = {}
+            for index, members in enumerate(result.components):
+                # 可达的分量中所有文件，减去文件自身
+                count = sum(len(result.components[i]) for i in _set_bits(reach[index]))
+                for member in members:
+                    radii[member] = count - 1
+            self._blast_radii = radii
+        return self._blast_radii
+
+    def rank_by_blast_radius(self, files: List[str]) -> List[Tuple[str, int]]:
+        """
+        按影响范围从大到小排序（影响范围大的文件优先分析）
+
+        Returns:
+            [(file, blast_radius)]
+        """
+        radii = self._compute_blast_radii()
+        ranked = [(f, radii.get(os.path.abspath(f), 0)) for f in files]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked
+
+    def get_statistics(self) -> Dict:
+        """获取索引统计信息"""
+        return dict(self.stats)
+
+
+def _set_bits(bits: int):
+    """位图中为 1 的位的序号"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def summarize_file(item: Tuple[str, str]) -> Dict:
+    """
+    使用 ASTAnalyzer 提取文件的依赖相关符号，以及项目调用图使用的调用摘要（可在工作进程中执行）
+
+    Args:
+        item: (文件路径, 语言)
+    """
+    file_path, language = item
+    try:
+        result = ASTAnalyzer(language=language).analyze_file(file_path)
+    except Exception:
+        return {'version': SYMBOLS_VERSION, 'language': language, 'imports': [], 'types': [], 'parents': [],
+                'package': None, 'calls': None}
+
+    parents = []
+    for class_info in result.get('classes', []):
+        if class_info.get('parent'):
+            parents.append(class_info['parent'])
+        parents.extend(class_info.get('interfaces', []))
+        parents.extend(b for b in class_info.get('bases', []) if b)
+
+    return {
+        'version': SYMBOLS_VERSION,
+        'language': language,
+        'package': result.get('package'),
+        'imports': result.get('imports', []),
+        'types': [c['name'] for c in result.get('classes', [])] + result.get('interfaces', []),
+        'parents': parents,
+        # getter/setter 调用同样是对其他文件的依赖，不过滤默认方法
+        'calls': summarize_project_file((file_path, language, False)),
+    }
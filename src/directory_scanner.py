@@ -7,7 +7,12 @@ Directory Scanner - 递归扫描目录下的程序文件并使用 Ollama 进行
 import os
 import sys
 import re
-from typing import List, Dict, Set, Optional, Pattern
+import io
+import threading
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Set, Optional, Pattern, Union
 import json
 from datetime import datetime
 
@@ -15,8 +20,16 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from llm.ollama_client import OllamaClient
+from llm.async_ollama_client import AsyncOllamaClient
+from llm.http_pool import DEFAULT_POOL_SIZE
+from llm.response_cache import DEFAULT_CACHE_PATH, get_cache
 from call_chain_analyzer import CallChainAnalyzer
+from project_call_graph import DEFAULT_CALL_GRAPH_CACHE_PATH, ProjectCallGraph
 from ast_analyzer import ASTAnalyzer
+from code_chunker import CodeChunker
+from run_manifest import RunManifest
+from results_sink import ResultsSink
+from file_discovery import FileDiscovery
 
 
 class DirectoryScanner:
@@ -40,9 +53,15 @@ class DirectoryScanner:
     
     def __init__(self, root_dir: str, output_dir: str = None, extensions: List[str] = None,
                  ignore_dirs: Set[str] = None, max_file_size: int = 1024 * 1024,
-                 ollama_url: str = "http://localhost:11434", model: str = "qwen2.5:0.5b",
+                 ollama_url: Union[str, List[str]] = "http://localhost:11434", model: str = "qwen2.5:0.5b",
                  dir_pattern: Optional[str] = None, file_pattern: Optional[str] = None,
-                 enable_call_chain: bool = False, enable_ast: bool = False):
+                 enable_call_chain: bool = False, enable_ast: bool = False,
+                 pool_size: int = DEFAULT_POOL_SIZE, connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None, workers: int = 1,
+                 llm_cache: Optional[str] = None, max_prompt_tokens: Optional[int] = None,
+                 chunk_workers: int = 4, resume: Optional[str] = None, use_gitignore: bool = True,
+                 discovery_workers: int = 1, call_graph_workers: int = 1,
+                 call_graph_cache: Optional[str] = None):
         """
         初始化目录扫描器
         
@@ -52,12 +71,24 @@ class DirectoryScanner:
             extensions: 要扫描的文件扩展名列表
             ignore_dirs: 要忽略的目录名称集合
             max_file_size: 最大文件大小（字节）
-            ollama_url: Ollama 服务地址
+            ollama_url: Ollama 服务地址，传入多个地址时按最少未完成请求进行负载均衡
             model: 使用的模型名称
             dir_pattern: 目录名正则表达式（匹配的目录会被扫描）
             file_pattern: 文件名正则表达式（匹配的文件会被分析）
             enable_call_chain: 是否启用函数调用链分析
             enable_ast: 是否启用AST语法分析
+            pool_size: Ollama HTTP 连接池大小（保持长连接复用）
+            connect_timeout: 连接 Ollama 的超时时间（秒）
+            read_timeout: 等待 Ollama 响应的超时时间（秒）
+            workers: 并行分析的文件数（1 表示串行分析）
+            llm_cache: LLM 响应缓存文件路径（为 None 时不使用缓存）
+            max_prompt_tokens: 单个提示词中代码的最大 token 数，超出时按函数边界分片分析（为 None 时不分片）
+            chunk_workers: 单个文件的分片并发分析数
+            resume: 要恢复的运行 ID，跳过该运行中已完成的文件（为 None 时开始新的运行）
+            use_gitignore: 是否遵循 .gitignore（Git 仓库中使用 git ls-files 列出文件）
+            discovery_workers: 并行列出目录的线程数（网络文件系统、超大仓库可调大）
+            call_graph_workers: 构建项目调用图时解析文件的进程数
+            call_graph_cache: 项目调用图摘要缓存文件路径（为 None 时不使用缓存）
         """
         self.root_dir = os.path.abspath(root_dir)
         self.output_dir = output_dir
@@ -68,6 +99,16 @@ class DirectoryScanner:
         self.model = model
         self.enable_call_chain = enable_call_chain
         self.enable_ast = enable_ast
+        self.call_graph_workers = max(1, call_graph_workers)
+        self.call_graph_cache = call_graph_cache
+        # 项目调用图：启用调用链分析时构建一次，每个文件只查询自己的切片；文件变化后只重新解析该文件
+        self._project_call_graph: Optional[ProjectCallGraph] = None
+        self._call_graph_lock = threading.RLock()
+        self.workers = max(1, workers)
+        self.chunk_workers = max(1, chunk_workers)
+        self.chunker = CodeChunker(max_prompt_tokens) if max_prompt_tokens else None
+        self.resume = resume
+        self.run_id: Optional[str] = None
         
         # 编译正则表达式
         self.dir_pattern: Optional[Pattern] = re.compile(dir_pattern) if dir_pattern else None
@@ -76,26 +117,70 @@ class DirectoryScanner:
         if not os.path.isdir(self.root_dir):
             raise ValueError(f"目录不存在: {self.root_dir}")
         
+        self.discovery = FileDiscovery(self.root_dir, extensions=self.extensions, ignore_dirs=self.ignore_dirs,
+                                       dir_filter=self._should_scan_directory, file_filter=self._should_analyze_file,
+                                       use_gitignore=use_gitignore, workers=discovery_workers)
+        # 扫描时取得的状态签名 {文件路径: (size, mtime_ns, inode)}，供增量分析复用
+        self.file_signatures: Dict[str, tuple] = {}
+        
         if self.output_dir:
             os.makedirs(self.output_dir, exist_ok=True)
             print(f"✓ 报告将保存到: {self.output_dir}\n")
         
         # 使用配置的 Ollama 地址和模型
-        self.ollama_client = OllamaClient(base_url=self.ollama_url, model=self.model)
+        self.ollama_client = OllamaClient(base_url=self.ollama_url, model=self.model,
+                                          pool_size=max(pool_size, self.workers * self.chunk_workers if self.chunker else self.workers),
+                                          connect_timeout=connect_timeout, read_timeout=read_timeout,
+                                          cache=get_cache(llm_cache) if llm_cache else None)
         print(f"🤖 Ollama 配置:")
-        print(f"   服务地址: {self.ollama_url}")
+        if isinstance(self.ollama_url, (list, tuple)):
+            print(f"   服务地址: {', '.join(self.ollama_url)}")
+        else:
+            print(f"   服务地址: {self.ollama_url}")
         print(f"   模型名称: {self.model}")
         
         if self.enable_call_chain:
             print(f"🔗 调用链分析: 已启用")
         if self.enable_ast:
             print(f"🔬 AST 语法分析: 已启用")
+        if self.workers > 1:
+            print(f"⚡ 并行分析: {self.workers} 个工作线程")
+        if llm_cache:
+            print(f"📦 LLM 响应缓存: {llm_cache}")
+        if self.chunker:
+            print(f"✂️  大文件分片: 每片最多 {max_prompt_tokens} tokens, {self.chunk_workers} 路并发")
         if not self.enable_call_chain and not self.enable_ast:
             print()
         else:
             print()
         
-        self.stats = {'total_files': 0, 'analyzed_files': 0, 'skipped_files': 0, 'failed_files': 0, 'total_size': 0}
+        self.stats = {'total_files': 0, 'analyzed_files': 0, 'skipped_files': 0, 'failed_files': 0, 'total_size': 0,
+                      'resumed_files': 0}
+        self._stats_lock = threading.Lock()
+        # 并行模式下每个工作线程的输出缓冲区，保证单个文件的输出不被交错
+        self._output = threading.local()
+    
+    def _increment_stat(self, key: str, amount: int = 1):
+        """线程安全地更新统计信息"""
+        with self._stats_lock:
+            self.stats[key] += amount
+    
+    def _log(self, message: str = ""):
+        """输出日志；并行分析时写入当前线程的缓冲区，由主线程按文件顺序打印"""
+        buffer = getattr(self._output, 'buffer', None)
+        if buffer is not None:
+            buffer.write(f"{message}\n")
+        else:
+            print(message)
+    
+    def _analyze_file_buffered(self, file_path: str):
+        """在工作线程中分析文件，返回分析结果和该文件的完整输出"""
+        self._output.buffer = io.StringIO()
+        try:
+            result = self.analyze_file(file_path)
+            return result, self._output.buffer.getvalue()
+        finally:
+            self._output.buffer = None
     
     def _should_scan_directory(self, dir_name: str) -> bool:
         """判断是否应该扫描该目录"""
@@ -117,8 +202,39 @@ class DirectoryScanner:
         
         return True
     
+    def is_scannable(self, file_path: str) -> bool:
+        """判断单个文件是否会被 scan_directory 选中（用于监听模式过滤变更事件）"""
+        name = os.path.basename(file_path)
+        if os.path.splitext(name)[1].lower() not in self.extensions or not self._should_analyze_file(name):
+            return False
+        if self.discovery.is_ignored(file_path):
+            return False
+        
+        try:
+            return os.path.getsize(file_path) <= self.max_file_size
+        except OSError:
+            return False
+    
+    def iter_files(self) -> Iterator[str]:
+        """
+        逐个产生符合条件的文件（生成器，遍历未结束时即可开始处理）
+        
+        文件大小取自遍历时的 stat 结果，不再单独调用 getsize。file_signatures 只保留本次遍历
+        得到的文件，已删除的文件不会残留在"上次扫描的文件列表"中。
+        """
+        self.file_signatures = {}
+        for found in self.discovery.iter_files():
+            if found.size > self.max_file_size:
+                print(f"⚠️  跳过大文件 ({found.size / 1024:.1f} KB): {found.path}")
+                self.stats['skipped_files'] += 1
+                continue
+            
+            self.stats['total_size'] += found.size
+            self.stats['total_files'] += 1
+            self.file_signatures[found.path] = found.signature
+            yield found.path
+    
     def scan_directory(self) -> List[str]:
-        found_files = []
         print(f"🔍 开始扫描目录: {self.root_dir}")
         print(f"📝 支持的文件类型: {', '.join(self.extensions)}")
         
@@ -128,35 +244,14 @@ class DirectoryScanner:
             print(f"📄 文件过滤规则: {self.file_pattern.pattern}")
         print()
         
-        for root, dirs, files in os.walk(self.root_dir):
-            # 过滤目录
-            dirs[:] = [d for d in dirs if self._should_scan_directory(d)]
-            
-            for file in files:
-                file_ext = os.path.splitext(file)[1].lower()
-                if file_ext not in self.extensions:
-                    continue
-                
-                # 检查文件名是否匹配正则表达式
-                if not self._should_analyze_file(file):
-                    continue
-                
-                file_path = os.path.join(root, file)
-                try:
-                    file_size = os.path.getsize(file_path)
-                    if file_size > self.max_file_size:
-                        print(f"⚠️  跳过大文件 ({file_size / 1024:.1f} KB): {file_path}")
-                        self.stats['skipped_files'] += 1
-                        continue
-                    
-                    self.stats['total_size'] += file_size
-                    found_files.append(file_path)
-                    self.stats['total_files'] += 1
-                except OSError as e:
-                    print(f"⚠️  无法访问文件: {file_path} - {e}")
-        
-        print(f"\n✓ 扫描完成，找到 {len(found_files)} 个文件")
-        print(f"  总大小: {self.stats['total_size'] / 1024:.2f} KB\n")
+        found_files = list(self.iter_files())
+        
+        discovery_stats = self.discovery.get_statistics()
+        method = '（git ls-files）' if discovery_stats['method'] == 'git' else ''
+        print(f"\n✓ 扫描完成{method}，找到 {len(found_files)} 个文件")
+        print(f"  总大小: {self.stats['total_size'] / 1024:.2f} KB")
+        print(f"  遍历: {discovery_stats['directories']} 个目录, 耗时 {discovery_stats['elapsed']:.2f}s "
+              f"({discovery_stats['files_per_sec']:.0f} 文件/秒, {discovery_stats['workers']} 个线程)\n")
         return found_files
     
     def get_analysis_prompt(self, file_path: str, content: str, language: str) -> str:
@@ -190,13 +285,14 @@ class DirectoryScanner:
             'status': 'pending', 
             'analysis': None, 
             'error': None,
-            'call_chain': None
+            'call_chain': None,
+            'report_file': None
         }
         
-        print(f"{'='*80}")
-        print(f"📄 分析文件: {rel_path}")
-        print(f"🔤 语言: {language}")
-        print(f"{'='*80}\n")
+        self._log(f"{'='*80}")
+        self._log(f"📄 分析文件: {rel_path}")
+        self._log(f"🔤 语言: {language}")
+        self._log(f"{'='*80}\n")
         
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -205,46 +301,171 @@ class DirectoryScanner:
             # 调用链分析
             call_chain_info = None
             if self.enable_call_chain:
-                print("🔗 正在分析函数调用链...")
+                self._log("🔗 正在分析函数调用链...")
                 call_chain_info = self._analyze_call_chain(content, file_path, language)
                 result['call_chain'] = call_chain_info
-                print(f"✓ 发现 {len(call_chain_info.get('functions', []))} 个函数\n")
+                self._log(f"✓ 发现 {len(call_chain_info.get('functions', []))} 个函数\n")
             
             # AST 语法分析
             ast_info = None
             if self.enable_ast:
-                print("🔬 正在进行 AST 语法分析...")
+                self._log("🔬 正在进行 AST 语法分析...")
                 ast_info = self._analyze_ast(content, file_path, language)
                 result['ast_analysis'] = ast_info
                 if ast_info:
-                    print(f"✓ 提取了 {len(ast_info.get('classes', []))} 个类, {len(ast_info.get('functions', []))} 个函数\n")
+                    self._log(f"✓ 提取了 {len(ast_info.get('classes', []))} 个类, {len(ast_info.get('functions', []))} 个函数\n")
             
-            # 基础代码分析
-            prompt = self.get_analysis_prompt(rel_path, content, language, call_chain_info, ast_info)
-            print("🤖 正在调用 Ollama 进行分析...")
-            analysis = self.ollama_client.generate_response(prompt)
+            # 基础代码分析（超出 token 预算的大文件按函数边界分片并发分析）
+            if self.chunker and self.chunker.needs_chunking(content):
+                analysis = self._analyze_chunks(rel_path, content, language, call_chain_info, ast_info)
+            else:
+                prompt = self.get_analysis_prompt(rel_path, content, language, call_chain_info, ast_info)
+                self._log("🤖 正在调用 Ollama 进行分析...")
+                analysis = self.ollama_client.generate_response(prompt)
             
             result['status'] = 'success'
             result['analysis'] = analysis
-            self.stats['analyzed_files'] += 1
+            self._increment_stat('analyzed_files')
             
-            print("\n" + "="*80)
-            print("📊 分析结果")
-            print("="*80)
-            print(analysis)
-            print("\n")
+            self._log("\n" + "="*80)
+            self._log("📊 分析结果")
+            self._log("="*80)
+            self._log(analysis)
+            self._log("\n")
             
             if self.output_dir:
-                self._save_analysis(rel_path, language, analysis, call_chain_info, ast_info)
+                result['report_file'] = self._save_analysis(rel_path, language, analysis, call_chain_info, ast_info)
             
         except Exception as e:
             result['status'] = 'failed'
             result['error'] = str(e)
-            self.stats['failed_files'] += 1
-            print(f"❌ 分析失败: {e}\n")
+            self._increment_stat('failed_files')
+            self._log(f"❌ 分析失败: {e}\n")
         
         return result
     
+    def _analyze_chunks(self, file_path: str, content: str, language: str,
+                        call_chain_info: Optional[Dict] = None, ast_info: Optional[Dict] = None) -> str:
+        """
+        将大文件按函数边界分片，并发分析各片段后合并为一份文件报告
+        
+        Args:
+            file_path: 文件相对路径
+            content: 文件内容
+            language: 编程语言
+            call_chain_info: 文件的调用链信息，每个片段的提示词只包含其中函数的调用者和被调用者
+            ast_info: 文件的 AST 信息，每个片段的提示词包含包名、导入和所在的类
+            
+        Returns:
+            合并后的分析结果
+        """
+        chunks = self.chunker.chunk(content, language)
+        prompts = [self.get_chunk_prompt(file_path, chunk, len(chunks), language, call_chain_info, ast_info)
+                   for chunk in chunks]
+        self._log(f"✂️  文件超出 token 预算，拆分为 {len(chunks)} 个片段")
+        self._log("🤖 正在调用 Ollama 并发分析各片段...")
+        
+        # 片段提示词交给异步客户端，最多 chunk_workers 个同时在途，结果按片段顺序返回
+        with AsyncOllamaClient(client=self.ollama_client,
+                               max_in_flight=min(self.chunk_workers, len(prompts))) as async_client:
+            analyses = async_client.run_many(prompts)
+        
+        return self._merge_chunk_analyses(chunks, analyses)
+    
+    def get_chunk_prompt(self, file_path: str, chunk: Dict, total_chunks: int, language: str,
+                         call_chain_info: Optional[Dict] = None, ast_info: Optional[Dict] = None) -> str:
+        """生成单个代码片段的分析提示词，附带该片段的 AST 上下文和调用关系切片"""
+        functions = ', '.join(f"`{name}`" for name in chunk['functions']) or '无（类定义、导入或模块级代码）'
+        prompt = f"""请分析以下 {language} 代码片段。该片段来自一个较大的文件，是其中的第 {chunk['index']}/{total_chunks} 部分。
+
+文件路径: {file_path}
+编程语言: {language}
+行号范围: 第 {chunk['start_line']}-{chunk['end_line']} 行
+包含函数: {functions}
+
+代码内容:
+```{language.lower()}
+{chunk['content']}
+```
+"""
+        
+        ast_context = self._chunk_ast_context(chunk, ast_info) if ast_info else ''
+        if ast_context:
+            prompt += f"\n\n## 片段所在的语法结构\n\n{ast_context}"
+        
+        call_context = self._chunk_call_context(chunk, call_chain_info) if call_chain_info else ''
+        if call_context:
+            prompt += f"\n\n## 片段中函数的调用关系\n\n{call_context}"
+        
+        prompt += """
+请只针对该片段从以下几个方面进行简要分析：
+
+1. **功能说明** - 片段中各函数或代码块的作用
+2. **潜在问题** - 可能的 bug 或逻辑错误、性能问题、安全隐患、代码异味
+3. **改进建议** - 重构建议、性能优化建议、最佳实践建议
+"""
+        if call_context:
+            prompt += "4. **调用关系** - 基于上述调用者和被调用者，说明片段中函数在调用链中的作用及可能的影响范围\n"
+        
+        prompt += "\n请以 Markdown 格式输出，使用清晰的列表，引用代码时注明函数名或行号。"
+        return prompt
+    
+    @staticmethod
+    def _chunk_ast_context(chunk: Dict, ast_info: Dict) -> str:
+        """片段的 AST 上下文：包名、包含或位于片段之前最近的类、导入依赖"""
+        lines = []
+        if ast_info.get('package'):
+            lines.append(f"**包名**: `{ast_info['package']}`\n")
+        
+        classes = [cls for cls in ast_info.get('classes', []) if isinstance(cls.get('line'), int)]
+        enclosing = [cls for cls in classes if cls['line'] < chunk['start_line']][-1:]
+        inside = [cls for cls in classes if chunk['start_line'] <= cls['line'] <= chunk['end_line']]
+        for cls in (enclosing + inside)[:10]:
+            line = f"- 类 `{cls['name']}`"
+            if cls.get('parent'):
+                line += f" extends `{cls['parent']}`"
+            if cls.get('interfaces'):
+                line += f" implements `{', '.join(cls['interfaces'])}`"
+            lines.append(line + f" (第 {cls['line']} 行)")
+        
+        imports = ast_info.get('imports', [])
+        if imports:
+            lines.append(f"\n**导入依赖** ({len(imports)} 个): {', '.join(f'`{imp}`' for imp in imports[:15])}")
+        return '\n'.join(lines) + '\n' if lines else ''
+    
+    @staticmethod
+    def _chunk_call_context(chunk: Dict, call_chain_info: Dict) -> str:
+        """片段的调用图切片：起始行落在片段内的函数，以及它们的被调用者和调用者（可能在其他文件中）"""
+        call_graph = call_chain_info.get('call_graph', {})
+        reverse_call_graph = call_chain_info.get('reverse_call_graph', {})
+        lines = []
+        for func in call_chain_info.get('functions', []):
+            if not chunk['start_line'] <= func['start_line'] <= chunk['end_line']:
+                continue
+            name = func.get('qualified_name', func['name'])
+            callees = call_graph.get(name, [])
+            callers = reverse_call_graph.get(name, [])
+            if not callees and not callers:
+                continue
+            lines.append(f"- `{func['signature']}` (第 {func['start_line']}-{func['end_line']} 行)")
+            if callees:
+                lines.append(f"  - 调用: {', '.join(f'`{c}`' for c in callees[:8])}")
+            if callers:
+                lines.append(f"  - 被调用于: {', '.join(f'`{c}`' for c in callers[:8])}")
+            if len(lines) >= 30:
+                break
+        return '\n'.join(lines) + '\n' if lines else ''
+    
+    def _merge_chunk_analyses(self, chunks: List[Dict], analyses: List[str]) -> str:
+        """按文件中的顺序合并各片段的分析结果"""
+        merged = f"> 该文件超出单次分析的 token 预算，已按函数边界拆分为 {len(chunks)} 个片段分别分析。\n"
+        for chunk, analysis in zip(chunks, analyses):
+            merged += f"\n## 片段 {chunk['index']}: 第 {chunk['start_line']}-{chunk['end_line']} 行"
+            if chunk['functions']:
+                merged += f"（{', '.join(chunk['functions'])}）"
+            merged += f"\n\n{analysis.strip()}\n"
+        return merged
+    
     def _analyze_call_chain(self, content: str, file_path: str, language: str) -> Dict:
         """
         分析函数调用链
@@ -257,8 +478,13 @@ class DirectoryScanner:
         Returns:
             调用链信息字典
         """
-        analyzer = CallChainAnalyzer(language=language)
-        call_graph = analyzer.build_call_graph(content, file_path)
+        project_slice = self._project_call_graph_slice(file_path) if language in ('Java', 'Python') else None
+        if project_slice is not None:
+            # 函数以限定名标识，调用者和被调用者可以在其他文件中
+            analyzer, call_graph = project_slice
+        else:
+            analyzer = CallChainAnalyzer(language=language)
+            call_graph = analyzer.build_call_graph(content, file_path)
         
         # 生成调用链报告
         call_chain_report = analyzer.generate_call_chain_report()
@@ -272,6 +498,57 @@ class DirectoryScanner:
             'mermaid': mermaid_diagram
         }
     
+    def get_project_call_graph(self, files: Optional[List[str]] = None) -> ProjectCallGraph:
+        """
+        获取项目调用图，首次调用时在一次并行解析中构建（多个分析线程共享同一个实例）
+        
+        已构建的图与 files 同步：只重新解析状态签名变化或新增的文件，移除已不存在的文件。
+        
+        Args:
+            files: 项目文件列表，为 None 时使用最近一次扫描得到的文件列表（不重新遍历目录）
+        """
+        with self._call_graph_lock:
+            if files is None:
+                files = list(self.file_signatures)
+            if self._project_call_graph is None:
+                graph = ProjectCallGraph(self.root_dir, workers=self.call_graph_workers)
+                self._with_call_graph_cache(graph, graph.build, files)
+                stats = graph.get_statistics()
+                print(f"🔗 项目调用图: {stats['functions']} 个函数, {stats['edges']} 条调用关系 "
+                      f"(解析 {stats['parsed_files']} 个文件, 缓存命中 {stats['cached_files']} 个, "
+                      f"{stats['elapsed']:.2f}s)")
+                self._project_call_graph = graph
+            elif files:
+                self._with_call_graph_cache(self._project_call_graph, self._project_call_graph.update, files)
+            return self._project_call_graph
+    
+    def _project_call_graph_slice(self, file_path: str) -> Optional[tuple]:
+        """
+        文件在项目调用图中的 (分析器, 切片)；文件在构建后被修改或新增时先重新解析该文件
+        
+        在锁内取切片，其他线程刷新调用图时不会读到链接了一半的结果。
+        """
+        with self._call_graph_lock:
+            if self._project_call_graph is None:
+                # 没有扫描过目录时只解析该文件，不为单个文件遍历整个项目
+                self.get_project_call_graph(list(self.file_signatures) or [file_path])
+            graph = self._project_call_graph
+            if graph.is_stale(file_path):
+                self._with_call_graph_cache(graph, graph.refresh, [file_path])
+            if file_path not in graph:
+                return None
+            return graph.analyzer_for(file_path), graph.file_slice(file_path)
+    
+    def _with_call_graph_cache(self, graph: ProjectCallGraph, operation, files: List[str]):
+        """在打开摘要缓存的情况下执行 build / update / refresh，结束后关闭缓存"""
+        graph.cache = ProjectCallGraph.open_cache(self.call_graph_cache) if self.call_graph_cache else None
+        try:
+            operation(files)
+        finally:
+            if graph.cache is not None:
+                graph.cache.close()
+                graph.cache = None
+    
     def _analyze_ast(self, content: str, file_path: str, language: str) -> Optional[Dict]:
         """
         进行 AST 语法分析
@@ -300,7 +577,7 @@ class DirectoryScanner:
                 'interfaces': ast_result.get('interfaces', [])
             }
         except Exception as e:
-            print(f"⚠️  AST 分析失败: {e}")
+            self._log(f"⚠️  AST 分析失败: {e}")
             return None
     
     def get_analysis_prompt(self, file_path: str, content: str, language: str, 
@@ -400,9 +677,10 @@ class DirectoryScanner:
         return base_prompt
     
     def _save_analysis(self, file_path: str, language: str, analysis: str, 
-                      call_chain_info: Optional[Dict] = None, ast_info: Optional[Dict] = None):
+                      call_chain_info: Optional[Dict] = None, ast_info: Optional[Dict] = None) -> str:
         safe_path = file_path.replace(os.sep, '_').replace('.', '_')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 同一次运行的报告使用运行 ID 命名，恢复运行时可以和清单中的文件一一对应
+        timestamp = self.run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = os.path.join(self.output_dir, f"{safe_path}_analysis_{timestamp}.md")
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -459,7 +737,7 @@ class DirectoryScanner:
             f.write("## 🤖 AI 代码分析\n\n")
             f.write(analysis)
         
-        print(f"✓ 分析报告已保存: {output_file}\n")
+        self._log(f"✓ 分析报告已保存: {output_file}\n")
         
         # 如果有调用链信息，同时保存JSON格式
         if call_chain_info:
@@ -473,7 +751,7 @@ class DirectoryScanner:
                     'call_graph': call_chain_info.get('call_graph', {}),
                     'reverse_call_graph': call_chain_info.get('reverse_call_graph', {})
                 }, f, ensure_ascii=False, indent=2)
-            print(f"✓ 调用链数据已保存: {json_file}\n")
+            self._log(f"✓ 调用链数据已保存: {json_file}\n")
         
         # 如果有AST信息，保存JSON格式
         if ast_info:
@@ -485,27 +763,91 @@ class DirectoryScanner:
                     'timestamp': datetime.now().isoformat(),
                     'ast_analysis': ast_info
                 }, f, ensure_ascii=False, indent=2)
-            print(f"✓ AST 数据已保存: {ast_json_file}\n")
+            self._log(f"✓ AST 数据已保存: {ast_json_file}\n")
+        
+        return output_file
+    
+    def _run_config(self) -> Dict:
+        """影响分析结果的运行配置，恢复运行时用于核对"""
+        return {
+            'model': self.model,
+            'extensions': sorted(self.extensions),
+            'enable_call_chain': self.enable_call_chain,
+            'enable_ast': self.enable_ast,
+            'max_prompt_tokens': self.chunker.max_tokens if self.chunker else None,
+        }
     
-    def analyze_all(self) -> List[Dict]:
+    def analyze_all(self) -> Union[ResultsSink, List[Dict]]:
+        """
+        分析所有扫描到的文件
+
+        Returns:
+            结果流（ResultsSink）：可迭代得到每个文件的完整结果，结果保存在磁盘上而不是内存中
+        """
         files = self.scan_directory()
         
         if not files:
             print("⚠️  未找到符合条件的文件")
             return []
         
-        results = []
-        for i, file_path in enumerate(files, 1):
-            print(f"\n进度: [{i}/{len(files)}]")
-            result = self.analyze_file(file_path)
-            results.append(result)
+        # 运行清单：每完成一个文件记录一次检查点，中断后可用 --resume 继续
+        manifest, done, pending = RunManifest.start(
+            RunManifest.runs_dir_for(self.output_dir), 'DirectoryScanner', self.root_dir, files,
+            self._run_config(), resume=self.resume, stats=self.stats)
+        self.run_id = manifest.run_id
+        
+        if self.enable_call_chain and pending:
+            # 所有文件（包括已完成的）参与构建项目调用图，跨文件调用才能完整
+            self.get_project_call_graph(files)
+        
+        # 结果写入结果流后即释放，不在内存中累积
+        sink = manifest.record_all(self.iter_analyze(pending, len(done), len(files)), self.stats)
         
         self._print_summary()
         
         if self.output_dir:
-            self._save_summary(results)
+            self._save_summary(sink)
         
-        return results
+        return sink
+    
+    def iter_analyze(self, files: List[str], start: int = 0, total: Optional[int] = None) -> Iterator[Dict]:
+        """
+        按给定顺序逐个产生文件的分析结果（workers > 1 时并行分析）
+        
+        并行分析时结果和输出也按给定顺序依次交付，与串行运行一致。全量扫描和增量分析
+        都通过这里分析文件。最多 2 × workers 个文件同时提交：队首的慢文件不会让后面
+        已完成的结果和输出缓冲无限堆积，每交付一个结果才提交下一个文件。
+        
+        Args:
+            files: 要分析的文件
+            start: 已完成的文件数（用于进度显示）
+            total: 文件总数（用于进度显示，默认为 start + len(files)）
+        """
+        total = total if total is not None else start + len(files)
+        if self.workers <= 1:
+            for i, file_path in enumerate(files, start + 1):
+                print(f"\n进度: [{i}/{total}]")
+                yield self.analyze_file(file_path)
+            return
+        
+        remaining = iter(files)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = deque(executor.submit(self._analyze_file_buffered, path)
+                            for path in islice(remaining, 2 * self.workers))
+            try:
+                i = start
+                while futures:
+                    result, output = futures.popleft().result()
+                    futures.extend(executor.submit(self._analyze_file_buffered, path)
+                                   for path in islice(remaining, 1))
+                    i += 1
+                    print(f"\n进度: [{i}/{total}]")
+                    print(output, end='')
+                    yield result
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
     
     def _print_summary(self):
         print("\n" + "="*80)
@@ -513,12 +855,24 @@ class DirectoryScanner:
         print("="*80)
         print(f"扫描的文件总数: {self.stats['total_files']}")
         print(f"成功分析: {self.stats['analyzed_files']}")
+        if self.stats['resumed_files']:
+            print(f"  其中恢复自上次运行: {self.stats['resumed_files']}")
         print(f"跳过的文件: {self.stats['skipped_files']}")
         print(f"失败的文件: {self.stats['failed_files']}")
         print(f"总文件大小: {self.stats['total_size'] / 1024:.2f} KB")
+        if self.ollama_client.cache is not None:
+            cache_stats = self.ollama_client.cache.get_statistics()
+            print(f"LLM 缓存命中: {cache_stats['hits']} / 未命中: {cache_stats['misses']} (命中率 {cache_stats['hit_rate']:.1%})")
+        if self.ollama_client.balancer is not None:
+            print("Ollama 节点统计:")
+            for endpoint in self.ollama_client.balancer.get_statistics():
+                avg_latency = f"{endpoint['avg_latency']:.2f}s" if endpoint['avg_latency'] is not None else "N/A"
+                print(f"  - {endpoint['url']}: 请求 {endpoint['requests']}, 失败 {endpoint['failures']}, "
+                      f"平均延迟 {avg_latency}, 剔除 {endpoint['ejections']} 次")
         print("="*80)
     
-    def _save_summary(self, results: List[Dict]):
+    def _save_summary(self, sink: ResultsSink):
+        """从结果流生成汇总报告（Markdown 只用轻量索引，JSON 逐条复制结果）"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         summary_file = os.path.join(self.output_dir, f"summary_{timestamp}.md")
         
@@ -526,14 +880,18 @@ class DirectoryScanner:
             f.write(f"# 代码分析汇总报告\n\n")
             f.write(f"**扫描目录**: `{self.root_dir}`\n\n")
             f.write(f"**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            if self.run_id:
+                f.write(f"**运行 ID**: `{self.run_id}`\n\n")
             f.write("## 统计信息\n\n")
             f.write(f"- 扫描的文件总数: {self.stats['total_files']}\n")
             f.write(f"- 成功分析: {self.stats['analyzed_files']}\n")
+            if self.stats['resumed_files']:
+                f.write(f"  - 其中恢复自上次运行: {self.stats['resumed_files']}\n")
             f.write(f"- 跳过的文件: {self.stats['skipped_files']}\n")
             f.write(f"- 失败的文件: {self.stats['failed_files']}\n")
             f.write(f"- 总文件大小: {self.stats['total_size'] / 1024:.2f} KB\n\n")
             f.write("## 分析结果\n\n")
-            for result in results:
+            for result in sink.entries():
                 status_emoji = "✅" if result['status'] == 'success' else "❌"
                 f.write(f"{status_emoji} **{result['file_path']}** ({result['language']})\n")
                 if result['error']:
@@ -543,13 +901,12 @@ class DirectoryScanner:
         print(f"\n✓ 汇总报告已保存: {summary_file}")
         
         json_file = os.path.join(self.output_dir, f"summary_{timestamp}.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'root_dir': self.root_dir,
-                'timestamp': datetime.now().isoformat(),
-                'stats': self.stats,
-                'results': results,
-            }, f, ensure_ascii=False, indent=2)
+        sink.write_json(json_file, {
+            'root_dir': self.root_dir,
+            'run_id': self.run_id,
+            'timestamp': datetime.now().isoformat(),
+            'stats': self.stats,
+        })
         
         print(f"✓ JSON 报告已保存: {json_file}")
 
@@ -568,6 +925,10 @@ def main():
   # 使用远程 Ollama 服务
   python directory_scanner.py /path/to/project --ollama-url http://192.168.1.100:11434
   
+  # 在多台 Ollama 服务器之间负载均衡（配合 --workers 使用）
+  python directory_scanner.py /path/to/project --workers 8 \\
+    --ollama-url http://192.168.1.100:11434 http://192.168.1.101:11434
+  
   # 使用不同的模型
   python directory_scanner.py /path/to/project --model qwen2.5:7b
   
@@ -580,6 +941,15 @@ def main():
   # 使用正则表达式过滤目录（只扫描 src 和 lib 目录）
   python directory_scanner.py /path/to/project --dir-pattern "^(src|lib)$"
   
+  # 同时并行分析 4 个文件
+  python directory_scanner.py /path/to/project --workers 4 -o reports
+  
+  # 继续上次中断的运行（跳过已完成的文件，运行 ID 在开始分析时打印）
+  python directory_scanner.py /path/to/project -o reports --resume 20240101_120000_a1b2c3
+  
+  # 超过 2048 tokens 的大文件按函数边界分片，并发分析后合并报告
+  python directory_scanner.py /path/to/project --max-prompt-tokens 2048 --chunk-workers 4
+  
   # 组合使用
   python directory_scanner.py /path/to/project \\
     --ollama-url http://192.168.1.100:11434 \\
@@ -595,12 +965,21 @@ def main():
     parser.add_argument('-e', '--extensions', nargs='+', help='要扫描的文件扩展名（例如: .py .java .js）')
     parser.add_argument('--max-size', type=int, default=1024 * 1024, help='最大文件大小（字节），默认 1MB')
     parser.add_argument('--ignore-dirs', nargs='+', help='要忽略的目录名称')
+    parser.add_argument('--no-gitignore', action='store_true', help='不遵循 .gitignore 规则')
+    parser.add_argument('--discovery-workers', type=int, default=1,
+                       help='并行列出目录的线程数（默认: 1，网络文件系统或超大仓库可调大）')
     
     # Ollama 配置参数
-    parser.add_argument('--ollama-url', default='http://localhost:11434', 
-                       help='Ollama 服务地址（默认: http://localhost:11434）')
+    parser.add_argument('--ollama-url', nargs='+', default=['http://localhost:11434'],
+                       help='Ollama 服务地址，可指定多个以进行负载均衡（默认: http://localhost:11434）')
     parser.add_argument('--model', default='qwen2.5:0.5b',
                        help='使用的模型名称（默认: qwen2.5:0.5b）')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                       help=f'Ollama HTTP 连接池大小（默认: {DEFAULT_POOL_SIZE}）')
+    parser.add_argument('--connect-timeout', type=float, help='连接 Ollama 的超时时间（秒）')
+    parser.add_argument('--read-timeout', type=float, help='等待 Ollama 响应的超时时间（秒）')
+    parser.add_argument('--llm-cache', nargs='?', const=DEFAULT_CACHE_PATH,
+                       help=f'启用持久化 LLM 响应缓存，可指定缓存文件（默认: {DEFAULT_CACHE_PATH}）')
     
     # 正则表达式过滤参数
     parser.add_argument('--dir-pattern', help='目录名正则表达式（只扫描匹配的目录）')
@@ -611,6 +990,18 @@ def main():
                        help='启用函数调用链分析（生成调用图和递归审核）')
     parser.add_argument('--enable-ast', action='store_true',
                        help='启用AST语法分析（提取类、方法、依赖关系）')
+    parser.add_argument('--call-graph-workers', type=int, default=1,
+                       help='构建项目调用图时解析文件的进程数（默认: 1）')
+    parser.add_argument('--call-graph-cache', nargs='?', const=DEFAULT_CALL_GRAPH_CACHE_PATH,
+                       help=f'启用项目调用图摘要缓存，可指定缓存文件（默认: {DEFAULT_CALL_GRAPH_CACHE_PATH}）')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='并行分析的文件数（默认: 1，即串行分析）')
+    parser.add_argument('--max-prompt-tokens', type=int,
+                       help='单个提示词中代码的最大 token 数，超出时按函数边界分片分析（默认不分片）')
+    parser.add_argument('--chunk-workers', type=int, default=4,
+                       help='单个文件的分片并发分析数（默认: 4）')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                       help='恢复中断的运行，跳过已完成的文件（运行清单保存在输出目录的 runs/ 下）')
     
     args = parser.parse_args()
     
@@ -626,7 +1017,19 @@ def main():
             dir_pattern=args.dir_pattern,
             file_pattern=args.file_pattern,
             enable_call_chain=args.enable_call_chain,
-            enable_ast=args.enable_ast
+            enable_ast=args.enable_ast,
+            pool_size=args.pool_size,
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout,
+            workers=args.workers,
+            llm_cache=args.llm_cache,
+            max_prompt_tokens=args.max_prompt_tokens,
+            chunk_workers=args.chunk_workers,
+            resume=args.resume,
+            use_gitignore=not args.no_gitignore,
+            discovery_workers=args.discovery_workers,
+            call_graph_workers=args.call_graph_workers,
+            call_graph_cache=args.call_graph_cache
         )
         scanner.analyze_all()
         
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+File Discovery - 共享的源文件发现引擎
+基于 os.scandir 遍历目录，复用 DirEntry 的 stat 结果，遵循 .gitignore 规则；
+在 Git 仓库中优先使用 `git ls-files -z` 快速列出文件。
+以生成器形式逐个产生文件，分析可以在遍历结束前开始；
+大型仓库可使用多个线程并行列出目录（工作窃取队列），输出顺序与单线程遍历一致。
+"""
+
+import os
+import re
+import stat
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+
+class DiscoveredFile(NamedTuple):
+    """发现的文件及其状态签名（来自遍历时已取得的 stat，无需再次 stat）"""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @property
+    def signature(self) -> Tuple[int, int, int]:
+        """(size, mtime_ns, inode)，与增量缓存的状态签名格式一致"""
+        return (self.size, self.mtime_ns, self.inode)
+
+
+def _translate_glob(pattern: str) -> str:
+    """将 gitignore 通配符翻译为正则表达式（不含锚点）"""
+    i, n = 0, len(pattern)
+    parts = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                # '**/' 匹配零个或多个目录，结尾的 '**' 匹配其下的全部内容
+                if pattern.startswith('**/', i):
+                    parts.append('(?:.*/)?')
+                    i += 3
+                else:
+                    parts.append('.*')
+                    i += 2
+                continue
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            # 紧跟在 '[' 或 '[!' 之后的 ']' 属于字符集本身
+            j = i + 1
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            end = pattern.find(']', j)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+class GitignoreRules:
+    """
+    单个 .gitignore 文件编译后的规则
+
+    规则按出现顺序匹配，最后一条匹配的规则生效（'!' 开头的规则重新包含）。
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.rules: List[Tuple[Pattern, bool, bool]] = []  # (正则, 是否取反, 是否只匹配目录)
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line or line.startswith('#'):
+                continue
+            if not line.endswith('\\ '):
+                line = line.rstrip(' ')
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # 含有 '/' 的规则相对于 .gitignore 所在目录锚定，否则匹配任意层级的名称
+            anchored = '/' in line
+            regex = _translate_glob(line.lstrip('/'))
+            if not anchored:
+                regex = '(?:.*/)?' + regex
+            self.rules.append((re.compile(f"^{regex}$", re.DOTALL), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional['GitignoreRules']:
+        """读取 .gitignore 文件，不存在或没有有效规则时返回 None"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                rules = cls(f)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        判断相对于规则所在目录的路径是否被忽略
+
+        Returns:
+            True 忽略，False 明确重新包含，None 没有规则匹配
+        """
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+class FileDiscovery:
+    """
+    源文件发现引擎
+
+    目录名过滤（ignore_dirs / dir_filter）、扩展名与文件名过滤在 stat 之前完成，
+    只有候选文件才会取得状态信息；文件大小等限制由调用方根据产生的签名判断。
+    """
+
+    def __init__(self, root_dir: str, extensions: Optional[Iterable[str]] = None,
+                 ignore_dirs: Optional[Iterable[str]] = None,
+                 dir_filter: Optional[Callable[[str], bool]] = None,
+                 file_filter: Optional[Callable[[str], bool]] = None,
+                 use_gitignore: bool = True, use_git: bool = True, workers: int = 1):
+        """
+        初始化文件发现引擎
+
+        Args:
+            root_dir: 要遍历的根目录
+            extensions: 要包含的扩展名（小写，含 '.'），为 None 时包含全部文件
+            ignore_dirs: 要跳过的目录名集合
+            dir_filter: 目录名过滤函数，返回 False 的目录不会进入
+            file_filter: 文件名过滤函数，返回 False 的文件不会产生
+            use_gitignore: 是否遵循 .gitignore 规则
+            use_git: 根目录位于 Git 工作区时是否使用 `git ls-files` 列出文件
+            workers: 并行列出目录（git 模式下并行 stat）的线程数，1 表示单线程遍历
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.extensions = frozenset(ext.lower() for ext in extensions) if extensions is not None else None
+        self.ignore_dirs = frozenset(ignore_dirs or ())
+        self.dir_filter = dir_filter
+        self.file_filter = file_filter
+        self.use_gitignore = use_gitignore
+        self.use_git = use_git and use_gitignore
+        self._gitignore_cache: Dict[str, Optional[GitignoreRules]] = {}
+        self.workers = max(1, workers)
+        # 最近一次遍历使用的方式：'git' 或 'scandir'
+        self.method: Optional[str] = None
+        self._reset_metrics()
+
+    def _accept_dir(self, name: str) -> bool:
+        if name in self.ignore_dirs:
+            return False
+        return self.dir_filter is None or self.dir_filter(name)
+
+    def _accept_file(self, name: str) -> bool:
+        if self.extensions is not None and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        return self.file_filter is None or self.file_filter(name)
+
+    def _gitignore_for(self, rel_dir: str) -> Optional[GitignoreRules]:
+        """某个目录（相对根目录，根目录为 ''）下的 .gitignore 规则，按目录缓存"""
+        if rel_dir not in self._gitignore_cache:
+            self._gitignore_cache[rel_dir] = GitignoreRules.from_file(
+                os.path.join(self.root_dir, rel_dir, '.gitignore'))
+        return self._gitignore_cache[rel_dir]
+
+    def _is_gitignored(self, rel_path: str, is_dir: bool, scopes: List[Tuple[str, GitignoreRules]]) -> bool:
+        """按从根目录到当前目录的顺序应用各层 .gitignore，越深的规则优先级越高"""
+        ignored = False
+        for base, rules in scopes:
+            result = rules.match(rel_path[len(base) + 1:] if base else rel_path, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
+
+    def _scopes_for(self, rel_dir: str) -> List[Tuple[str, GitignoreRules]]:
+        """从根目录到 rel_dir（含）路径上所有生效的 .gitignore"""
+        scopes = []
+        parts = rel_dir.split('/') if rel_dir else []
+        for depth in range(len(parts) + 1):
+            base = '/'.join(parts[:depth])
+            rules = self._gitignore_for(base)
+            if rules is not None:
+                scopes.append((base, rules))
+        return scopes
+
+    def is_ignored(self, file_path: str) -> bool:
+        """判断单个文件是否会被遍历排除（目录过滤、.gitignore），不检查扩展名和文件名"""
+        rel_path = os.path.relpath(os.path.abspath(file_path), self.root_dir)
+        if rel_path.startswith('..'):
+            return True
+        parts = rel_path.split(os.sep)
+        if not all(self._accept_dir(d) for d in parts[:-1]):
+            return True
+        if not self.use_gitignore:
+            return False
+        for depth in range(1, len(parts) + 1):
+            is_dir = depth < len(parts)
+            rel = '/'.join(parts[:depth])
+            if self._is_gitignored(rel, is_dir, self._scopes_for('/'.join(parts[:depth - 1]))):
+                return True
+        return False
+
+    def _reset_metrics(self):
+        self.metrics = {'files': 0, 'directories': 0, 'steals': 0, 'elapsed': 0.0}
+        self._started = None
+
+    def get_statistics(self) -> Dict:
+        """最近一次遍历的统计：文件数、目录数、耗时、每秒文件数（用于按存储类型调整线程数）"""
+        elapsed = self.metrics['elapsed']
+        if self._started is not None:
+            elapsed = time.perf_counter() - self._started
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'files': self.metrics['files'],
+            'directories': self.metrics['directories'],
+            'steals': self.metrics['steals'],
+            'elapsed': elapsed,
+            'files_per_sec': self.metrics['files'] / elapsed if elapsed > 0 else 0.0,
+            'dirs_per_sec': self.metrics['directories'] / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def __iter__(self) -> Iterator[DiscoveredFile]:
+        return self.iter_files()
+
+    def iter_files(self) -> Iterator[DiscoveredFile]:
+        """逐个产生符合条件的文件（同一目录内按名称排序，先文件后子目录；并行遍历时顺序不变）"""
+        self._reset_metrics()
+        self._started = time.perf_counter()
+        source = None
+        try:
+            if self.use_git:
+                git_files = self._git_ls_files()
+                if git_files is not None:
+                    self.method = 'git'
+                    source = self._iter_git_files(git_files)
+            if source is None:
+                self.method = 'scandir'
+                source = self._iter_scandir() if self.workers == 1 else self._iter_scandir_parallel()
+            for found in source:
+                self.metrics['files'] += 1
+                yield found
+        finally:
+            if source is not None:
+                source.close()  # 提前停止迭代时立即结束并行遍历的工作线程
+            self.metrics['elapsed'] = time.perf_counter() - self._started
+            self._started = None
+
+    def _git_ls_files(self) -> Optional[List[str]]:
+        """用 git 列出已跟踪和未被忽略的未跟踪文件（相对根目录），不是 Git 工作区时返回 None"""
+        if not self._inside_git_worktree():
+            return None
+        try:
+            output = subprocess.run(
+                ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+                cwd=self.root_dir, capture_output=True, check=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        paths = []
+        for raw in output.split(b'\0'):
+            # 冲突中的文件会出现多次
+            if raw and (not paths or paths[-1] != raw):
+                paths.append(raw)
+        return [os.fsdecode(p) for p in paths]
+
+    def _inside_git_worktree(self) -> bool:
+        """向上查找 .git，避免在非 Git 目录中启动 git 进程"""
+        path = self.root_dir
+        while True:
+            if os.path.exists(os.path.join(path, '.git')):
+                return True
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+
+    # git 模式下每个 stat 任务处理的文件数
+    STAT_BATCH_SIZE = 256
+
+    def _stat_batch(self, paths: List[str]) -> List[Optional[DiscoveredFile]]:
+        results = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                results.append(None)  # 已跟踪但在工作区中被删除
+                continue
+            results.append(DiscoveredFile(path, st.st_size, st.st_mtime_ns, st.st_ino)
+                           if stat.S_ISREG(st.st_mode) else None)
+        return results
+
+    def _iter_git_files(self, rel_paths: List[str]) -> Iterator[DiscoveredFile]:
+        rejected_dirs = set()
+        accepted_dirs = set()
+        candidates = []
+        for rel_path in sorted(rel_paths, key=lambda p: (os.path.dirname(p).split('/'), p)):
+            directory, name = os.path.split(rel_path)
+            if not self._accept_file(name):
+                continue
+            if directory and directory not in accepted_dirs:
+                if directory in rejected_dirs:
+                    continue
+                if not all(self._accept_dir(d) for d in directory.split('/')):
+                    rejected_dirs.add(directory)
+                    continue
+                accepted_dirs.add(directory)
+            candidates.append(os.path.join(self.root_dir, *rel_path.split('/')))
+        self.metrics['directories'] = len(accepted_dirs) + 1
+
+        batches = [candidates[i:i + self.STAT_BATCH_SIZE] for i in range(0, len(candidates), self.STAT_BATCH_SIZE)]
+        if self.workers == 1:
+            for batch in map(self._stat_batch, batches):
+                yield from filter(None, batch)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch in executor.map(self._stat_batch, batches):
+                yield from filter(None, batch)
+
+    def _list_directory(self, directory: str, rel_dir: str, scopes: List) -> Tuple[List[DiscoveredFile], List[Tuple]]:
+        """
+        列出单个目录：返回符合条件的文件（含 stat 结果）和要进入的子目录
+
+        子目录以 (绝对路径, 相对路径, 生效的 .gitignore 列表) 表示，均按名称排序。
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return [], []
+
+        files, subdirs = [], []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                # 与 os.walk 一致，不进入指向目录的符号链接
+                if entry.is_symlink() or not self._accept_dir(entry.name):
+                    continue
+                if scopes and self._is_gitignored(rel_path, True, scopes):
+                    continue
+                child_scopes = scopes
+                if self.use_gitignore:
+                    rules = self._gitignore_for(rel_path)
+                    if rules is not None:
+                        child_scopes = scopes + [(rel_path, rules)]
+                subdirs.append((entry.path, rel_path, child_scopes))
+                continue
+            if not self._accept_file(entry.name):
+                continue
+            if scopes and self._is_gitignored(rel_path, False, scopes):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                files.append(DiscoveredFile(entry.path, st.st_size, st.st_mtime_ns, st.st_ino))
+        return files, subdirs
+
+    def _root_node(self) -> Tuple:
+        return (self.root_dir, '', self._scopes_for('') if self.use_gitignore else [])
+
+    def _iter_scandir(self) -> Iterator[DiscoveredFile]:
+        # 子目录逆序入栈以保持名称顺序
+        stack = [self._root_node()]
+        while stack:
+            files, subdirs = self._list_directory(*stack.pop())
+            self.metrics['directories'] += 1
+            yield from files
+            stack.extend(reversed(subdirs))
+
+    def _iter_scandir_parallel(self) -> Iterator[DiscoveredFile]:
+        """
+        多线程遍历：每个线程有自己的双端队列，新发现的子目录压入自己队列的尾部（深度优先、局部性好），
+        自己的队列为空时从其他线程队列的头部窃取（较浅的目录，包含更多后续工作）。
+        列出结果按相对路径暂存，主线程按单线程遍历的顺序逐个取出，因此输出顺序确定。
+        """
+        queues = [deque() for _ in range(self.workers)]
+        listings: Dict[str, Tuple[List[DiscoveredFile], List[str]]] = {}
+        cond = threading.Condition()
+        stop = threading.Event()
+        state = {'pending': 1, 'error': None}
+
+        root = self._root_node()
+        queues[0].append(root)
+
+        def take(index: int) -> Optional[Tuple]:
+            try:
+                return queues[index].pop()
+            except IndexError:
+                pass
+            for offset in range(1, self.workers):
+                try:
+                    node = queues[(index + offset) % self.workers].popleft()
+                except IndexError:
+                    continue
+                with cond:
+                    self.metrics['steals'] += 1
+                return node
+            return None
+
+        def worker(index: int):
+            try:
+                while not stop.is_set():
+                    node = take(index)
+                    if node is None:
+                        with cond:
+                            if state['pending'] == 0:
+                                return
+                            cond.wait(0.05)
+                        continue
+                    files, subdirs = self._list_directory(*node)
+                    with cond:
+                        # 先入队子目录再减少当前目录的计数，pending 不会提前归零
+                        queues[index].extend(reversed(subdirs))
+                        listings[node[1]] = (files, [child[1] for child in subdirs])
+                        state['pending'] += len(subdirs) - 1
+                        self.metrics['directories'] += 1
+                        cond.notify_all()
+            except BaseException as e:  # 交给主线程抛出
+                with cond:
+                    state['error'] = e
+                    cond.notify_all()
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            order = [root[1]]
+            while order:
+                rel_dir = order.pop()
+                with cond:
+                    while rel_dir not in listings and state['error'] is None:
+                        cond.wait()
+                    if state['error'] is not None:
+                        raise state['error']
+                    files, children = listings.pop(rel_dir)
+                yield from files
+                order.extend(reversed(children))
+        finally:
+            stop.set()
+            with cond:
+                cond.notify_all()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+File Signature - 文件状态签名与内容哈希
+增量分析缓存、解析缓存和依赖索引共用：状态签名 (size, mtime_ns, inode) 未变时不读取文件，
+签名变化时再按内容哈希判断文件是否真正改变。
+"""
+
+import os
+import hashlib
+from typing import Optional, Tuple
+
+try:
+    import xxhash
+except ImportError:  # 可选依赖，未安装时使用标准库的 BLAKE2b
+    xxhash = None
+
+# 内容哈希算法：优先使用 xxhash，否则使用 BLAKE2b（旧版缓存中的 MD5 哈希仍可比较）
+HASH_ALGORITHM = 'xxh3_128' if xxhash else 'blake2b'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def stat_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """文件状态签名 (size, mtime_ns, inode)，无法访问时返回 None"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def hash_file(file_path: str, algorithm: str = HASH_ALGORITHM) -> Optional[str]:
+    """
+    分块计算文件内容的哈希值
+
+    Args:
+        file_path: 文件路径
+        algorithm: 'xxh3_128'（未安装 xxhash 时退回 BLAKE2b）、'blake2b' 或 'md5'
+
+    Returns:
+        十六进制哈希值，文件无法读取时返回 None
+    """
+    if algorithm == 'xxh3_128' and xxhash:
+        hasher = xxhash.xxh3_128()
+    elif algorithm == 'md5':
+        hasher = hashlib.md5()
+    else:
+        hasher = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                hasher.update(block)
+    except OSError:
+        return None
+    return hasher.hexdigest()
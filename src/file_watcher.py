@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+File Watcher - 监听目录下的文件变更
+优先使用 watchdog（Linux 下基于 inotify），未安装时回退到定时轮询文件状态
+两种后端都通过 FileDiscovery 判断文件是否被排除（忽略目录、.gitignore）
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple, Callable
+
+from file_discovery import FileDiscovery
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # 可选依赖，未安装时使用轮询
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _EventHandler(FileSystemEventHandler):
+    """将 watchdog 事件转换为 (路径, 事件类型) 放入队列"""
+
+    def __init__(self, watcher: 'FileWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == 'moved':
+            self.watcher._put(event.src_path, 'deleted')
+            self.watcher._put(event.dest_path, 'changed')
+        elif event.event_type == 'deleted':
+            self.watcher._put(event.src_path, 'deleted')
+        elif event.event_type in ('created', 'modified', 'closed'):
+            self.watcher._put(event.src_path, 'changed')
+
+
+class FileWatcher:
+    """目录文件变更监听器（带防抖和事件合并）"""
+
+    def __init__(self, root_dir: str, ignore_dirs: Optional[Set[str]] = None,
+                 path_filter: Optional[Callable[[str], bool]] = None,
+                 debounce: float = 0.5, max_delay: float = 5.0, poll_interval: float = 1.0,
+                 backend: str = 'auto', discovery: Optional[FileDiscovery] = None):
+        """
+        初始化文件监听器
+
+        Args:
+            root_dir: 要监听的根目录
+            ignore_dirs: 忽略的目录名称集合
+            path_filter: 可选的文件过滤函数，返回 False 的路径不会产生事件
+            debounce: 防抖时间（秒），最后一个事件之后静默这么久才输出一批变更
+            max_delay: 持续有事件时，一批变更最多等待的时间（秒）
+            poll_interval: 轮询模式下的扫描间隔（秒）
+            backend: 'auto'（有 watchdog 时使用 watchdog）、'watchdog' 或 'polling'
+            discovery: 扫描器使用的 FileDiscovery（共享扩展名、目录过滤和 .gitignore 规则），
+                为 None 时按 ignore_dirs 和 .gitignore 创建
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.ignore_dirs = set(ignore_dirs or ())
+        self.path_filter = path_filter
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.discovery = discovery or FileDiscovery(self.root_dir, ignore_dirs=self.ignore_dirs)
+
+        if backend == 'auto':
+            backend = 'watchdog' if Observer is not None else 'polling'
+        if backend == 'watchdog' and Observer is None:
+            raise ValueError("未安装 watchdog，无法使用 watchdog 监听（pip install watchdog）")
+        self.backend = backend
+
+        self._events: 'queue.Queue[Tuple[str, str]]' = queue.Queue()
+        self._stop = threading.Event()
+        self._observer = None
+        self._poll_thread = None
+        self._snapshot: Dict[str, Tuple[int, int, int]] = {}
+
+    def _is_ignored(self, path: str) -> bool:
+        rel_path = os.path.relpath(path, self.root_dir)
+        if rel_path.startswith('..'):
+            return True
+        parts = rel_path.split(os.sep)
+        if any(part in self.ignore_dirs for part in parts[:-1]):
+            return True
+        if self.path_filter is not None and not self.path_filter(path):
+            return True
+        return self.discovery.is_ignored(path)
+
+    def _put(self, path: str, kind: str):
+        path = os.path.abspath(path)
+        if not self._is_ignored(path):
+            self._events.put((path, kind))
+
+    def start(self):
+        """开始监听"""
+        if self.backend == 'watchdog':
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.root_dir, recursive=True)
+            self._observer.start()
+        else:
+            self._snapshot = self._take_snapshot()
+            self._poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
+            self._poll_thread.start()
+
+    def stop(self):
+        """停止监听"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._poll_thread is not None:
+            self._poll_thread.join()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int, int]]:
+        """记录所有文件的状态签名（与扫描器相同的遍历：Git 工作区中使用 git ls-files，遵循 .gitignore）"""
+        snapshot = {}
+        for found in self.discovery.iter_files():
+            if self.path_filter is not None and not self.path_filter(found.path):
+                continue
+            snapshot[found.path] = found.signature
+        return snapshot
+
+    def _poll_loop(self):
+        """轮询模式：定时比较前后两次快照"""
+        while not self._stop.wait(self.poll_interval):
+            current = self._take_snapshot()
+            for path, signature in current.items():
+                if self._snapshot.get(path) != signature:
+                    self._events.put((path, 'changed'))
+            for path in self._snapshot.keys() - current.keys():
+                self._events.put((path, 'deleted'))
+            self._snapshot = current
+
+    def next_batch(self, timeout: Optional[float] = None) -> Optional[Tuple[Set[str], Set[str]]]:
+        """
+        等待下一批变更：收到第一个事件后继续收集，直到静默 debounce 秒或达到 max_delay
+
+        同一文件的多次事件会被合并，以最后一次事件为准。
+
+        Args:
+            timeout: 等待第一个事件的超时时间（秒），为 None 时一直等待
+
+        Returns:
+            (变更的文件集合, 删除的文件集合)，超时返回 None
+        """
+        try:
+            path, kind = self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+        pending = {path: kind}
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                path, kind = self._events.get(timeout=min(self.debounce, remaining))
+            except queue.Empty:
+                break
+            pending[path] = kind
+
+        changed = {p for p, k in pending.items() if k == 'changed'}
+        deleted = {p for p, k in pending.items() if k == 'deleted'}
+        return changed, deleted
+
+    def batches(self):
+        """持续产生合并后的变更批次，直到 stop() 被调用"""
+        while not self._stop.is_set():
+            batch = self.next_batch(timeout=0.5)
+            if batch is not None:
+                yield batch
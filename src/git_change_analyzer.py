@@ -12,22 +12,29 @@ from datetime import datetime
 import json
 
 from ast_analyzer import ASTAnalyzer
+from parse_cache import DEFAULT_PARSE_CACHE_PATH
+from file_discovery import FileDiscovery
 
 
 class GitChangeAnalyzer:
     """Git 变更分析器"""
     
-    def __init__(self, repo_path: str, language: str = 'Java'):
+    def __init__(self, repo_path: str, language: str = 'Java', workers: int = 1,
+                 parse_cache: Optional[str] = DEFAULT_PARSE_CACHE_PATH):
         """
         初始化 Git 变更分析器
         
         Args:
             repo_path: Git 仓库路径
             language: 编程语言
+            workers: 构建依赖图时解析文件的进程数
+            parse_cache: 解析缓存文件路径，内容未变化的文件不再重新解析（为 None 时不使用缓存）
         """
         self.repo_path = os.path.abspath(repo_path)
         self.language = language
-        self.ast_analyzer = ASTAnalyzer(language=language)
+        self.workers = workers
+        self.ast_analyzer = ASTAnalyzer(language=language,
+                                        parse_cache=ASTAnalyzer.open_parse_cache(parse_cache) if parse_cache else None)
         
         if not os.path.isdir(os.path.join(self.repo_path, '.git')):
             raise ValueError(f"Not a git repository: {self.repo_path}")
@@ -208,7 +215,7 @@ class GitChangeAnalyzer:
         
         # 3. 构建依赖图
         all_files = self._get_all_project_files()
-        dependency_graph = self.ast_analyzer.build_dependency_graph(all_files)
+        dependency_graph = self.ast_analyzer.build_dependency_graph(all_files, workers=self.workers)
         
         # 4. 追踪影响链
         impact_data = self.ast_analyzer.trace_impact(all_changed_items, max_depth)
@@ -226,21 +233,12 @@ class GitChangeAnalyzer:
         }
     
     def _get_all_project_files(self) -> List[str]:
-        """获取项目中所有相关文件"""
-        files = []
+        """获取项目中所有相关文件（git ls-files 列出，遵循 .gitignore）"""
+        extension = {'Java': '.java', 'Python': '.py'}.get(self.language)
+        if extension is None:
+            return []
         
-        for root, dirs, filenames in os.walk(self.repo_path):
-            # 跳过 .git 目录
-            if '.git' in root:
-                continue
-            
-            for filename in filenames:
-                if self.language == 'Java' and filename.endswith('.java'):
-                    files.append(os.path.join(root, filename))
-                elif self.language == 'Python' and filename.endswith('.py'):
-                    files.append(os.path.join(root, filename))
-        
-        return files
+        return [found.path for found in FileDiscovery(self.repo_path, extensions=[extension], ignore_dirs={'.git'})]
     
     def _generate_summary(self, file_details: List[Dict], impact_data: Dict) -> str:
         """生成摘要"""
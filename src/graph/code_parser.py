@@ -7,6 +7,13 @@ import os
 from typing import Dict, List, Optional, Tuple
 import logging
 
+try:
+    from ..file_discovery import FileDiscovery
+    from ..parse_pool import parse_in_pool
+except ImportError:  # imported as top-level package `graph` with src/ on sys.path
+    from file_discovery import FileDiscovery
+    from parse_pool import parse_in_pool
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -377,13 +384,14 @@ class CodeParser:
         
         logger.info(f"Stored structure for {file_path} in graph database")
     
-    def parse_directory(self, directory: str, extensions: List[str] = None) -> List[Dict]:
+    def parse_directory(self, directory: str, extensions: List[str] = None, workers: int = 1) -> List[Dict]:
         """
         Parse all source files in a directory.
         
         Args:
             directory: Directory to scan
             extensions: List of file extensions to include (e.g., ['.java', '.py'])
+            workers: Number of worker processes for parsing (1 parses in this process)
             
         Returns:
             List of parsed structures
@@ -393,15 +401,33 @@ class CodeParser:
         
         results = []
         
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if any(file.endswith(ext) for ext in extensions):
-                    file_path = os.path.join(root, file)
-                    try:
-                        structure = self.parse_file(file_path)
-                        results.append(structure)
-                        logger.info(f"Parsed: {file_path}")
-                    except Exception as e:
-                        logger.error(f"Error parsing {file_path}: {e}")
+        if workers <= 1:
+            for found in FileDiscovery(directory, extensions=extensions):
+                try:
+                    structure = self.parse_file(found.path)
+                    results.append(structure)
+                    logger.info(f"Parsed: {found.path}")
+                except Exception as e:
+                    logger.error(f"Error parsing {found.path}: {e}")
+            return results
+        
+        # Parse in worker processes; graph storage stays in this process
+        file_paths = [found.path for found in FileDiscovery(directory, extensions=extensions)]
+        for file_path, structure, error in parse_in_pool(_parse_file_worker, file_paths, workers):
+            if error is not None:
+                logger.error(f"Error parsing {file_path}: {error}")
+                continue
+            if self.neo4j_client:
+                self._store_in_graph(structure)
+            results.append(structure)
+            logger.info(f"Parsed: {file_path}")
         
         return results
+
+
+def _parse_file_worker(file_path: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Parse one file in a worker process; returns (path, structure, error message)."""
+    try:
+        return file_path, CodeParser().parse_file(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
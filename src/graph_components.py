@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Graph Components - 强连通分量与缩点 DAG
+对整张调用图做一次迭代式 Tarjan 遍历（线性时间，不受递归深度限制），
+每个循环调用组只报告一次；缩点后的 DAG 用于按拓扑顺序排列受影响的函数。
+"""
+
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence
+
+from symbol_graph import GraphView
+
+
+class Condensation:
+    """
+    调用图的强连通分量及缩点 DAG
+
+    分量按拓扑顺序编号：缩点 DAG 中的每条边都从编号小的分量指向编号大的分量，
+    即调用者排在被调用者之前。
+
+    Attributes:
+        components: 分量列表，每个分量为节点列表（按节点首次出现的顺序）
+        component_of: {节点: 分量编号}
+        dag: 每个分量的后继分量编号（升序）
+        cyclic: 形成循环调用的分量编号（多个节点，或节点调用自身）
+    """
+
+    def __init__(self, components: List[List[str]], dag: List[List[int]], cyclic: List[int]):
+        self.components = components
+        self.dag = dag
+        self.cyclic = cyclic
+        self.component_of: Dict[str, int] = {}
+        self._position: Dict[str, int] = {}
+        for index, members in enumerate(components):
+            for node in members:
+                self.component_of[node] = index
+                self._position[node] = len(self._position)
+        self._cyclic = frozenset(cyclic)
+
+    def cycles(self) -> List[List[str]]:
+        """所有循环调用组，每组只出现一次"""
+        return [self.components[index] for index in self.cyclic]
+
+    def is_cyclic(self, node: str) -> bool:
+        index = self.component_of.get(node)
+        return index is not None and index in self._cyclic
+
+    def cycle_of(self, node: str) -> List[str]:
+        """node 所在的循环调用组，不在循环中时返回空列表"""
+        return self.components[self.component_of[node]] if self.is_cyclic(node) else []
+
+    def order(self, nodes: Iterable[str], callees_first: bool = False) -> List[str]:
+        """
+        按缩点 DAG 的拓扑顺序排列节点（同一分量内保持分量中的顺序，未知节点排在最后）
+
+        Args:
+            nodes: 要排序的节点，例如影响分析得到的受影响函数
+            callees_first: 为 True 时被调用者在前（变更向调用者传播的顺序）
+        """
+        unknown = len(self.components)
+
+        def rank(node):
+            index = self.component_of.get(node, unknown)
+            if callees_first and index != unknown:
+                index = unknown - 1 - index
+            return index, self._position.get(node, 0)
+
+        return sorted(nodes, key=rank)
+
+
+def condense(graph: Mapping[str, Iterable[str]]) -> Condensation:
+    """
+    计算调用图的强连通分量和缩点 DAG
+
+    Args:
+        graph: 邻接表 {调用者: 被调用者}；SymbolGraph 的视图直接按整数 id 遍历
+
+    Returns:
+        Condensation 结果
+    """
+    if isinstance(graph, GraphView):
+        names = graph.names
+        return _condense_ids(len(names), graph.index().neighbors, names)
+
+    names: List[str] = []
+    ids: Dict[str, int] = {}
+    adjacency: List[List[int]] = []
+
+    def intern(node):
+        node_id = ids.get(node)
+        if node_id is None:
+            node_id = ids[node] = len(names)
+            names.append(node)
+            adjacency.append([])
+        return node_id
+
+    for caller, callees in graph.items():
+        caller_id = intern(caller)
+        for callee in callees:
+            adjacency[caller_id].append(intern(callee))
+    return _condense_ids(len(names), adjacency.__getitem__, names)
+
+
+def strongly_connected_components(graph: Mapping[str, Iterable[str]]) -> List[List[str]]:
+    """强连通分量列表（拓扑顺序，调用者所在分量在前）"""
+    return condense(graph).components
+
+
+def _condense_ids(node_count: int, neighbors: Callable[[int], Sequence[int]],
+                  names: Sequence[str]) -> Condensation:
+    raw_components = _tarjan(node_count, neighbors)
+    # Tarjan 按逆拓扑顺序产生分量，倒序后调用者在前
+    raw_components.reverse()
+
+    component_of = [0] * node_count
+    for index, members in enumerate(raw_components):
+        for node in members:
+            component_of[node] = index
+
+    dag: List[List[int]] = []
+    cyclic: List[int] = []
+    for index, members in enumerate(raw_components):
+        successors = set()
+        self_loop = False
+        for node in members:
+            for successor in neighbors(node):
+                target = component_of[successor]
+                if target != index:
+                    successors.add(target)
+                elif len(members) == 1:
+                    self_loop = True
+        dag.append(sorted(successors))
+        if len(members) > 1 or self_loop:
+            cyclic.append(index)
+
+    components = [[names[node] for node in sorted(members)] for members in raw_components]
+    return Condensation(components, dag, cyclic)
+
+
+def _tarjan(node_count: int, neighbors: Callable[[int], Sequence[int]]) -> List[List[int]]:
+    """迭代式 Tarjan 算法，每个节点和每条边只处理一次"""
+    UNVISITED = -1
+    index = [UNVISITED] * node_count
+    low = [0] * node_count
+    on_stack = [False] * node_count
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(node_count):
+        if index[root] != UNVISITED:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(neighbors(root)))]
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if index[successor] == UNVISITED:
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    work.append((successor, iter(neighbors(successor))))
+                    break
+                if on_stack[successor] and index[successor] < low[node]:
+                    low[node] = index[successor]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+
+    return components
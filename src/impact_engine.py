@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Impact Engine - 基于可达性的影响链追踪
+按层次（BFS）遍历依赖图 / 调用图，每个节点只访问一次，记录到起点的最短距离和前驱节点。
+受影响节点集合与路径数量无关；完整路径通过前驱链按需重建，报告只取有限条示例路径。
+"""
+
+from collections import deque
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+from symbol_graph import GraphView
+
+# 每次查询最多保留的示例路径数
+DEFAULT_MAX_PATHS = 20
+
+# 调用图中形成环的节点在示例路径中的标记
+CYCLE_MARK = " (循环)"
+
+
+class Reachability:
+    """
+    从一个起点出发的可达性查询结果
+
+    Attributes:
+        source: 起点
+        distances: {节点: 到起点的最短距离}，包含起点本身（距离 0）
+        predecessors: {节点: 最短路径上的前一个节点}，起点没有前驱
+        sample_paths: 示例路径（从起点出发，按 BFS 顺序，最短的在前）
+        truncated: 是否有节点因为达到最大深度而未继续展开
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.distances: Dict[str, int] = {source: 0}
+        self.predecessors: Dict[str, str] = {}
+        self.sample_paths: List[List[str]] = []
+        self.truncated = False
+
+    @property
+    def affected(self) -> Dict[str, int]:
+        """受影响的节点（不含起点）及其最短距离"""
+        return {node: dist for node, dist in self.distances.items() if node != self.source}
+
+    def path_to(self, node: str) -> Optional[List[str]]:
+        """沿前驱链重建从起点到 node 的一条最短路径，node 不可达时返回 None"""
+        if node not in self.distances:
+            return None
+        path = [node]
+        while node in self.predecessors:
+            node = self.predecessors[node]
+            path.append(node)
+        path.reverse()
+        return path
+
+    def _is_ancestor(self, node: str, of: str) -> bool:
+        while True:
+            if of == node:
+                return True
+            if of not in self.predecessors:
+                return False
+            of = self.predecessors[of]
+
+
+def trace_reachability(graph: Mapping[str, Iterable[str]], source: str, max_depth: int = 5,
+                       max_paths: int = DEFAULT_MAX_PATHS, mark_cycles: bool = False) -> Reachability:
+    """
+    从 source 出发按 BFS 遍历 graph，计算 max_depth 以内可达的节点
+
+    示例路径在以下节点处结束：没有后继的节点、达到 max_depth 仍有后继的节点，
+    以及（mark_cycles 为 True 时）指回自身祖先的边，此时路径末尾追加带 CYCLE_MARK 的节点。
+
+    Args:
+        graph: 邻接表 {节点: 后继节点}，不会被修改（defaultdict 也不会新增键）；
+               SymbolGraph 的视图直接按整数 id 遍历
+        source: 起点
+        max_depth: 最大深度（起点深度为 0）
+        max_paths: 最多保留的示例路径数
+        mark_cycles: 是否记录回到祖先节点的环路径
+
+    Returns:
+        Reachability 查询结果
+    """
+    if isinstance(graph, GraphView):
+        return _trace_graph_view(graph, source, max_depth, max_paths, mark_cycles)
+
+    result = Reachability(source)
+    samples = _bfs(result, graph.get, max_depth, max_paths, mark_cycles)
+    result.sample_paths = [path + [cycle + CYCLE_MARK] if cycle is not None else path
+                           for path, cycle in samples]
+    return result
+
+
+def _trace_graph_view(view: GraphView, source: str, max_depth: int, max_paths: int,
+                      mark_cycles: bool) -> Reachability:
+    """在 CSR 索引上按整数 id 遍历，最后一次性把结果换算为符号名"""
+    source_id = view.node_id(source)
+    if source_id is None:
+        return trace_reachability({}, source, max_depth, max_paths, mark_cycles)
+
+    by_id = Reachability(source_id)
+    samples = _bfs(by_id, view.index().neighbors, max_depth, max_paths, mark_cycles)
+
+    names = view.names
+    result = Reachability(source)
+    result.distances = {names[node]: dist for node, dist in by_id.distances.items()}
+    result.predecessors = {names[node]: names[pred] for node, pred in by_id.predecessors.items()}
+    result.truncated = by_id.truncated
+    result.sample_paths = [[names[node] for node in path] + ([names[cycle] + CYCLE_MARK] if cycle is not None else [])
+                           for path, cycle in samples]
+    return result
+
+
+def _bfs(result: Reachability, successors_of: Callable[[Hashable], Optional[Iterable[Hashable]]],
+         max_depth: int, max_paths: int, mark_cycles: bool) -> List[Tuple[List[Hashable], Optional[Hashable]]]:
+    """
+    BFS 主循环，填充 result 的距离和前驱
+
+    Returns:
+        示例路径列表 [(路径, 形成环的节点或 None)]
+    """
+    distances = result.distances
+    predecessors = result.predecessors
+    samples = []
+
+    if max_depth < 0:
+        return samples
+
+    queue = deque([result.source])
+    while queue:
+        current = queue.popleft()
+        depth = distances[current]
+        successors = successors_of(current)
+
+        if not successors:
+            if len(samples) < max_paths:
+                samples.append((result.path_to(current), None))
+            continue
+        if depth >= max_depth:
+            result.truncated = True
+            if len(samples) < max_paths:
+                samples.append((result.path_to(current), None))
+            continue
+
+        for successor in successors:
+            if successor not in distances:
+                distances[successor] = depth + 1
+                predecessors[successor] = current
+                queue.append(successor)
+            elif mark_cycles and len(samples) < max_paths and result._is_ancestor(successor, current):
+                samples.append((result.path_to(current), successor))
+
+    return samples
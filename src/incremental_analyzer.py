@@ -7,8 +7,10 @@ Incremental Code Analyzer - 增量代码分析器
 import os
 import sys
 import json
-import hashlib
-from typing import List, Dict, Set, Optional
+import sqlite3
+import threading
+import zlib
+from typing import List, Dict, Set, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -18,96 +20,355 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from llm.ollama_client import OllamaClient
 from llm.git_analyzer import GitAnalyzer
 from directory_scanner import DirectoryScanner
+from dependency_index import DependencyIndex
+from file_watcher import FileWatcher
+from file_signature import HASH_ALGORITHM, hash_file, stat_signature
 
 
 class AnalysisCache:
-    """分析结果缓存管理器"""
+    """分析结果缓存管理器（SQLite WAL 存储，支持从旧版 JSON 缓存迁移）"""
     
-    def __init__(self, cache_dir: str):
+    VERSION = '2.0'
+    
+    def __init__(self, cache_dir: str, batch_size: int = 50):
         """
         初始化缓存管理器
         
         Args:
             cache_dir: 缓存目录路径
+            batch_size: 累积多少次更新后提交一次事务（调用 flush() 时也会提交）
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_file = self.cache_dir / "analysis_cache.json"
+        self.cache_file = self.cache_dir / "analysis_cache.sqlite"
+        self.legacy_cache_file = self.cache_dir / "analysis_cache.json"
+        self.batch_size = max(1, batch_size)
+        self._pending = 0
+        self._lock = threading.RLock()
+        
+        self._conn = sqlite3.connect(str(self.cache_file), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " hash TEXT,"
+            " last_analyzed TEXT,"
+            " status TEXT,"
+            " language TEXT)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        # 完整分析结果按内容哈希存储（zlib 压缩的 JSON），内容相同的文件共享同一条记录
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " content_key TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " created_at TEXT)"
+        )
+        # 依赖索引使用的文件符号摘要，按文件状态签名判断是否需要重新解析
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS symbols ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER,"
+            " mtime_ns INTEGER,"
+            " inode INTEGER,"
+            " data TEXT NOT NULL)"
+        )
+        self._migrate_schema()
+        
         self.cache_data = self._load_cache()
+        if self.legacy_cache_file.exists():
+            self._migrate_json_cache()
+    
+    # files 表在 2.0 之后新增的列: {列名: 类型}
+    STAT_COLUMNS = {'hash_algorithm': 'TEXT', 'size': 'INTEGER', 'mtime_ns': 'INTEGER', 'inode': 'INTEGER'}
+    
+    def _migrate_schema(self):
+        """为旧数据库补充文件状态签名列"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        for column, column_type in self.STAT_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE files ADD COLUMN {column} {column_type}")
     
     def _load_cache(self) -> Dict:
-        """加载缓存数据"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️  加载缓存失败: {e}，将创建新缓存")
+        """从 SQLite 加载缓存数据到内存索引"""
+        files = {}
+        for row in self._conn.execute(
+                "SELECT path, hash, last_analyzed, status, language, hash_algorithm, size, mtime_ns, inode FROM files"):
+            path, file_hash, last_analyzed, status, language, algorithm, size, mtime_ns, inode = row
+            files[path] = {
+                'hash': file_hash,
+                'last_analyzed': last_analyzed,
+                'status': status,
+                'language': language,
+                'hash_algorithm': algorithm or 'md5',
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'inode': inode
+            }
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
         return {
-            'version': '1.0',
-            'last_update': None,
-            'files': {}
+            'version': self.VERSION,
+            'last_update': meta.get('last_update'),
+            'last_commit': meta.get('last_commit'),
+            'files': files
         }
     
-    def _save_cache(self):
-        """保存缓存数据"""
+    def _migrate_json_cache(self):
+        """将旧版 analysis_cache.json 导入 SQLite，完成后重命名为 .migrated"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
+            with open(self.legacy_cache_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
         except Exception as e:
-            print(f"⚠️  保存缓存失败: {e}")
+            print(f"⚠️  读取旧版缓存失败: {e}，跳过迁移")
+            return
+        
+        files = legacy.get('files', {})
+        with self._lock:
+            self._begin()
+            for path, info in files.items():
+                if path in self.cache_data['files']:
+                    continue  # SQLite 中已有更新的记录
+                self._write_file_row(path, info)
+            if legacy.get('last_update') and not self.cache_data['last_update']:
+                self._write_meta('last_update', legacy['last_update'])
+            self._commit()
+        
+        self.legacy_cache_file.rename(self.legacy_cache_file.with_name(self.legacy_cache_file.name + '.migrated'))
+        print(f"✓ 已将 {len(files)} 条旧版 JSON 缓存迁移到 {self.cache_file.name}")
+    
+    def _begin(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+    
+    def _commit(self):
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._pending = 0
+    
+    def _write_file_row(self, path: str, info: Dict):
+        """写入单个文件记录（同时更新内存索引）"""
+        info.setdefault('hash_algorithm', 'md5')
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files"
+            " (path, hash, last_analyzed, status, language, hash_algorithm, size, mtime_ns, inode)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, info.get('hash'), info.get('last_analyzed'), info.get('status'), info.get('language'),
+             info['hash_algorithm'], info.get('size'), info.get('mtime_ns'), info.get('inode'))
+        )
+        self.cache_data['files'][path] = info
+    
+    def _write_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self.cache_data[key] = value
+    
+    @staticmethod
+    def _content_key(info: Dict) -> str:
+        """分析结果的内容寻址键: <哈希算法>:<内容哈希>"""
+        return f"{info.get('hash_algorithm', 'md5')}:{info.get('hash')}"
+    
+    def _write_result(self, content_key: str, analysis_result: Dict, created_at: str):
+        """压缩并保存完整分析结果（分析文本、AST 信息、调用链数据）"""
+        payload = {
+            'file_path': analysis_result.get('file_path'),
+            'language': analysis_result.get('language'),
+            'status': analysis_result.get('status'),
+            'analysis': analysis_result.get('analysis'),
+            'ast_analysis': analysis_result.get('ast_analysis'),
+            'call_chain': analysis_result.get('call_chain'),
+        }
+        data = zlib.compress(json.dumps(payload, ensure_ascii=False, default=list).encode('utf-8'), 6)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (content_key, data, created_at) VALUES (?, ?, ?)",
+            (content_key, data, created_at)
+        )
+    
+    def get_cached_result(self, file_path: str) -> Optional[Dict]:
+        """
+        获取文件上次的完整分析结果
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            分析结果字典（与 DirectoryScanner.analyze_file 的返回格式一致），没有记录时返回 None
+        """
+        info = self.cache_data['files'].get(self._cache_key(file_path))
+        if info is None:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM results WHERE content_key = ?",
+                                     (self._content_key(info),)).fetchone()
+        if row is None:
+            return None
+        result = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+        result.setdefault('error', None)
+        result['last_analyzed'] = info.get('last_analyzed')
+        return result
+    
+    def prune_results(self) -> int:
+        """删除不再被任何文件引用的分析结果，返回删除的条数"""
+        with self._lock:
+            self._begin()
+            # 没有哈希的文件（无法读取或旧版记录）会使子查询产生 NULL，NOT IN 对 NULL 永远不成立，
+            # 导致一条结果都删不掉，因此排除这些行
+            cursor = self._conn.execute(
+                "DELETE FROM results WHERE content_key NOT IN ("
+                " SELECT COALESCE(hash_algorithm, 'md5') || ':' || hash FROM files WHERE hash IS NOT NULL)"
+            )
+            self._commit()
+        return max(cursor.rowcount, 0)
+    
+    def load_symbols(self) -> Dict[str, tuple]:
+        """加载所有文件的符号摘要: {path: ((size, mtime_ns, inode), summary)}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, size, mtime_ns, inode, data FROM symbols").fetchall()
+        return {path: ((size, mtime_ns, inode), json.loads(data)) for path, size, mtime_ns, inode, data in rows}
+    
+    def set_symbols(self, file_path: str, signature: tuple, summary: Dict):
+        """保存文件的符号摘要（按批次提交）"""
+        with self._lock:
+            self._begin()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO symbols (path, size, mtime_ns, inode, data) VALUES (?, ?, ?, ?, ?)",
+                (self._cache_key(file_path), *signature, json.dumps(summary, ensure_ascii=False))
+            )
+            self._record_update()
     
-    def _calculate_file_hash(self, file_path: str) -> str:
-        """计算文件内容的 MD5 哈希值"""
+    def _record_update(self):
+        """记录一次更新，累积到 batch_size 时提交事务"""
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._commit()
+    
+    def flush(self):
+        """提交尚未写入磁盘的更新"""
         try:
-            with open(file_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
+            with self._lock:
+                self._commit()
         except Exception as e:
-            print(f"⚠️  计算文件哈希失败 {file_path}: {e}")
+            print(f"⚠️  保存缓存失败: {e}")
+    
+    def close(self):
+        """提交剩余更新并关闭数据库连接"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _cache_key(file_path: str) -> str:
+        """缓存键：文件的绝对路径"""
+        return os.path.abspath(file_path)
+    
+    def _calculate_file_hash(self, file_path: str, algorithm: str = HASH_ALGORITHM) -> str:
+        """分块计算文件内容的哈希值"""
+        file_hash = hash_file(file_path, algorithm)
+        if file_hash is None:
+            print(f"⚠️  计算文件哈希失败 {file_path}: 无法读取文件")
             return ""
+        return file_hash
+    
+    def is_cached(self, file_path: str) -> bool:
+        """检查文件是否已在缓存中"""
+        return self._cache_key(file_path) in self.cache_data['files']
     
-    def is_file_changed(self, file_path: str) -> bool:
+    def is_file_changed(self, file_path: str, signature: Optional[tuple] = None,
+                        verify_content: bool = False) -> bool:
         """
         检查文件是否已更改
         
+        先比较文件状态签名（大小、mtime_ns、inode），签名一致时直接视为未更改；
+        只有签名变化的文件才会读取内容计算哈希。内容未变（例如只是 touch）时
+        会更新缓存中的签名，下次运行即可走快速路径。
+        
         Args:
             file_path: 文件路径
+            signature: 调用方已取得的状态签名（例如扫描时的 stat 结果），为 None 时重新 stat
+            verify_content: 为 True 时即使签名一致也比较内容哈希（用于 Git 报告变更的文件：
+                检出或解压等操作可能保留 mtime，大小相同的改动不会改变签名）
             
         Returns:
             True 如果文件是新的或已修改，False 如果文件未更改
         """
-        abs_path = str(Path(file_path).resolve())
-        current_hash = self._calculate_file_hash(file_path)
+        abs_path = self._cache_key(file_path)
+        cached_info = self.cache_data['files'].get(abs_path)
+        if cached_info is None:
+            return True  # 新文件
         
-        if not current_hash:
+        if signature is None:
+            signature = stat_signature(file_path)
+        if signature is None:
             return True  # 无法读取文件，视为已更改
+        unchanged_signature = signature == (cached_info.get('size'), cached_info.get('mtime_ns'),
+                                            cached_info.get('inode'))
+        if unchanged_signature and not verify_content:
+            return False
         
-        # 检查缓存中是否存在该文件
-        if abs_path not in self.cache_data['files']:
-            return True  # 新文件
+        # 使用缓存记录时的算法计算哈希，兼容旧版 MD5 记录
+        current_hash = self._calculate_file_hash(file_path, cached_info.get('hash_algorithm', 'md5'))
+        if not current_hash:
+            return True
+        if cached_info.get('hash') != current_hash:
+            return True
+        if unchanged_signature:
+            return False
+        
+        with self._lock:
+            self._begin()
+            info = dict(cached_info)
+            info['size'], info['mtime_ns'], info['inode'] = signature
+            self._write_file_row(abs_path, info)
+            self._record_update()
+        return False
+    
+    def snapshot(self, file_path: str, signature: Optional[tuple] = None) -> Tuple[tuple, str]:
+        """
+        在分析之前记录文件的状态签名和内容哈希，分析完成后交给 update_file_cache
         
-        cached_info = self.cache_data['files'][abs_path]
-        return cached_info.get('hash') != current_hash
+        先取签名再算哈希：分析期间文件被修改时，缓存中保存的是修改前的签名和哈希，
+        下次运行会发现签名变化并重新分析，而不会把旧的分析结果当作新内容的结果。
+        
+        Args:
+            file_path: 文件路径
+            signature: 调用方已取得的状态签名（例如扫描时的 stat 结果），为 None 时重新 stat
+        """
+        if signature is None:
+            signature = stat_signature(file_path)
+        return signature or (None, None, None), self._calculate_file_hash(file_path)
     
-    def update_file_cache(self, file_path: str, analysis_result: Dict):
+    def update_file_cache(self, file_path: str, analysis_result: Dict,
+                          snapshot: Optional[Tuple[tuple, str]] = None):
         """
-        更新文件缓存信息
+        更新文件缓存信息（单行写入，按批次提交）
         
         Args:
             file_path: 文件路径
             analysis_result: 分析结果
+            snapshot: 分析之前由 snapshot() 取得的 (签名, 哈希)，为 None 时使用文件的当前状态
         """
-        abs_path = str(Path(file_path).resolve())
-        file_hash = self._calculate_file_hash(file_path)
+        abs_path = self._cache_key(file_path)
+        signature, file_hash = snapshot or self.snapshot(file_path)
+        now = datetime.now().isoformat()
         
-        self.cache_data['files'][abs_path] = {
+        info = {
             'hash': file_hash,
-            'last_analyzed': datetime.now().isoformat(),
+            'last_analyzed': now,
             'status': analysis_result.get('status', 'unknown'),
-            'language': analysis_result.get('language', 'unknown')
+            'language': analysis_result.get('language', 'unknown'),
+            'hash_algorithm': HASH_ALGORITHM,
+            'size': signature[0],
+            'mtime_ns': signature[1],
+            'inode': signature[2]
         }
-        self.cache_data['last_update'] = datetime.now().isoformat()
-        self._save_cache()
+        
+        with self._lock:
+            self._begin()
+            self._write_file_row(abs_path, info)
+            if file_hash:
+                self._write_result(self._content_key(info), analysis_result, now)
+            self._write_meta('last_update', now)
+            self._record_update()
     
     def get_cached_files(self) -> List[str]:
         """获取所有已缓存的文件列表"""
@@ -115,27 +376,75 @@ class AnalysisCache:
     
     def remove_file_cache(self, file_path: str):
         """删除文件缓存"""
-        abs_path = str(Path(file_path).resolve())
-        if abs_path in self.cache_data['files']:
-            del self.cache_data['files'][abs_path]
-            self._save_cache()
+        abs_path = self._cache_key(file_path)
+        with self._lock:
+            if abs_path in self.cache_data['files']:
+                self._begin()
+                self._conn.execute("DELETE FROM files WHERE path = ?", (abs_path,))
+                self._conn.execute("DELETE FROM symbols WHERE path = ?", (abs_path,))
+                del self.cache_data['files'][abs_path]
+                self._record_update()
+    
+    def rename_file_cache(self, old_path: str, new_path: str) -> bool:
+        """
+        将缓存记录从旧路径移动到新路径（文件被重命名或移动时保留已有分析结果）
+        
+        Returns:
+            是否移动了缓存记录
+        """
+        old_key, new_key = self._cache_key(old_path), self._cache_key(new_path)
+        with self._lock:
+            info = self.cache_data['files'].get(old_key)
+            if info is None or new_key in self.cache_data['files']:
+                return False
+            self._begin()
+            self._conn.execute("DELETE FROM files WHERE path = ?", (old_key,))
+            self._conn.execute("UPDATE OR REPLACE symbols SET path = ? WHERE path = ?", (new_key, old_key))
+            del self.cache_data['files'][old_key]
+            self._write_file_row(new_key, info)
+            self._record_update()
+            return True
+    
+    def get_last_commit(self) -> Optional[str]:
+        """获取上次完整分析时的 Git 提交"""
+        return self.cache_data.get('last_commit')
+    
+    def set_last_commit(self, commit_sha: str):
+        """记录本次完整分析所基于的 Git 提交"""
+        with self._lock:
+            self._begin()
+            self._write_meta('last_commit', commit_sha)
+            self._commit()
     
     def clear_cache(self):
         """清空所有缓存"""
-        self.cache_data = {
-            'version': '1.0',
-            'last_update': None,
-            'files': {}
-        }
-        self._save_cache()
+        with self._lock:
+            self._begin()
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM symbols")
+            self._commit()
+            self.cache_data = {
+                'version': self.VERSION,
+                'last_update': None,
+                'last_commit': None,
+                'files': {}
+            }
         print("✓ 缓存已清空")
     
     def get_statistics(self) -> Dict:
         """获取缓存统计信息"""
+        with self._lock:
+            stored_results, stored_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM results").fetchone()
         return {
             'total_cached_files': len(self.cache_data['files']),
             'last_update': self.cache_data.get('last_update'),
-            'cache_file': str(self.cache_file)
+            'last_commit': self.cache_data.get('last_commit'),
+            'cache_file': str(self.cache_file),
+            'stored_results': stored_results,
+            'stored_results_bytes': stored_bytes
         }
 
 
@@ -143,7 +452,8 @@ class IncrementalAnalyzer:
     """增量代码分析器"""
     
     def __init__(self, root_dir: str, output_dir: str = None, cache_dir: str = None,
-                 extensions: List[str] = None, use_git: bool = True):
+                 extensions: List[str] = None, use_git: bool = True, dependency_depth: int = 0,
+                 parse_workers: int = 1, workers: int = 1):
         """
         初始化增量分析器
         
@@ -153,6 +463,9 @@ class IncrementalAnalyzer:
             cache_dir: 缓存目录（默认为 output_dir/.cache）
             extensions: 要分析的文件扩展名列表
             use_git: 是否使用 Git 来检测变更
+            dependency_depth: 依赖感知失效的追踪层数，导入或继承了变更文件的文件也会被重新分析（0 表示关闭）
+            parse_workers: 构建依赖索引时解析文件的进程数
+            workers: 并行分析的文件数（同时在途的 LLM 请求数，1 表示串行分析）
         """
         self.root_dir = Path(root_dir).resolve()
         self.output_dir = Path(output_dir) if output_dir else self.root_dir / "incremental_reports"
@@ -166,7 +479,8 @@ class IncrementalAnalyzer:
         self.scanner = DirectoryScanner(
             root_dir=str(self.root_dir),
             output_dir=str(self.output_dir),
-            extensions=extensions
+            extensions=extensions,
+            workers=workers
         )
         
         # 初始化 Git 分析器（如果可用）
@@ -180,36 +494,65 @@ class IncrementalAnalyzer:
                 print("⚠️  不是 Git 仓库，将使用文件哈希来检测变更\n")
                 self.use_git = False
         
+        self.dependency_depth = max(0, dependency_depth)
+        self.parse_workers = max(1, parse_workers)
+        self.dependency_index: Optional[DependencyIndex] = None
+        
         self.ollama_client = OllamaClient()
         self.stats = {
             'total_files': 0,
             'new_files': 0,
             'modified_files': 0,
             'unchanged_files': 0,
+            'dependent_files': 0,
             'analyzed_files': 0,
             'failed_files': 0
         }
     
-    def get_changed_files_from_git(self, since_commit: str = None) -> Set[str]:
+    def get_changed_files_from_git(self, since_commit: str = None) -> Optional[Set[str]]:
         """
-        从 Git 获取已更改的文件列表
+        从 Git 获取自上次分析以来可能变更的文件
+        
+        对比上次完整分析时记录的提交与 HEAD（git diff --name-status -M），并合并
+        工作区状态（已暂存、未暂存和未跟踪的文件）。被重命名的文件会把缓存记录
+        移动到新路径，从而保留已有的分析结果。
         
         Args:
-            since_commit: 起始提交哈希（默认为上次提交）
+            since_commit: 起始提交哈希（默认为缓存中记录的上次分析提交）
             
         Returns:
-            已更改文件的路径集合
+            候选变更文件的绝对路径集合（分类时对这些文件强制比较内容哈希）；
+            没有可用的基准提交时返回 None（只使用状态签名 + 哈希检测）
         """
         if not self.git_analyzer:
-            return set()
+            return None
+        
+        since_commit = since_commit or self.cache.get_last_commit()
+        if not since_commit:
+            print("ℹ️  缓存中没有记录上次分析的提交，将使用文件哈希检测变更\n")
+            return None
         
         try:
-            changed_files = self.git_analyzer.get_changed_files(since_commit)
-            # 转换为绝对路径
-            return {str((self.root_dir / f).resolve()) for f in changed_files if f}
+            changes = self.git_analyzer.get_changes_since(since_commit)
         except Exception as e:
-            print(f"⚠️  获取 Git 变更失败: {e}")
-            return set()
+            print(f"⚠️  获取 Git 变更失败: {e}，将使用文件哈希检测变更\n")
+            return None
+        
+        repo_root = Path(os.path.realpath(self.git_analyzer.repo.working_tree_dir))
+        to_abs = lambda f: str(repo_root / f)
+        
+        candidates = {to_abs(f) for f in changes['modified'] | changes['added']}
+        renamed = 0
+        for old_path, new_path, _ in changes['renamed']:
+            if self.cache.rename_file_cache(to_abs(old_path), to_abs(new_path)):
+                renamed += 1
+            candidates.add(to_abs(new_path))
+        for deleted_path in changes['deleted']:
+            self.cache.remove_file_cache(to_abs(deleted_path))
+        
+        print(f"✓ Git 变更（自 {since_commit[:8]}）: {len(candidates)} 个候选文件, "
+              f"{renamed} 个重命名, {len(changes['deleted'])} 个删除\n")
+        return candidates
     
     def scan_and_filter_files(self, force_all: bool = False) -> Dict[str, List[str]]:
         """
@@ -229,7 +572,8 @@ class IncrementalAnalyzer:
         categorized = {
             'new': [],
             'modified': [],
-            'unchanged': []
+            'unchanged': [],
+            'dependent': []
         }
         
         if force_all:
@@ -238,23 +582,24 @@ class IncrementalAnalyzer:
             self.stats['modified_files'] = len(all_files)
             return categorized
         
-        # 获取 Git 变更的文件（如果可用）
-        git_changed_files = self.get_changed_files_from_git() if self.use_git else set()
+        # Git 变更的候选文件（如果可用）；同时同步重命名和删除，重命名的文件沿用已有分析结果
+        git_candidates = self.get_changed_files_from_git() if self.use_git else None
         
         print("📊 正在分类文件...\n")
         for file_path in all_files:
-            abs_path = str(Path(file_path).resolve())
-            
             # 检查文件是否在缓存中
-            is_cached = abs_path in self.cache.get_cached_files()
+            is_cached = self.cache.is_cached(file_path)
             
             # 检查文件是否已更改
-            if self.use_git and git_changed_files:
-                # 使用 Git 检测
-                is_changed = abs_path in git_changed_files
+            if not is_cached:
+                is_changed = True
             else:
-                # 使用文件哈希检测
-                is_changed = self.cache.is_file_changed(file_path)
+                # 所有缓存文件都用状态签名 + 哈希确认：Git 未列出的文件也可能不同于缓存
+                # （例如分析后又撤销的工作区改动），签名一致时不读取文件，代价只是一次比较；
+                # Git 列出的候选文件即使签名一致也比较内容哈希（mtime 可能被保留）
+                verify = git_candidates is not None and os.path.realpath(file_path) in git_candidates
+                is_changed = self.cache.is_file_changed(file_path, self.scanner.file_signatures.get(file_path),
+                                                        verify_content=verify)
             
             if not is_cached:
                 categorized['new'].append(file_path)
@@ -266,8 +611,39 @@ class IncrementalAnalyzer:
                 categorized['unchanged'].append(file_path)
                 self.stats['unchanged_files'] += 1
         
+        # 提交快速路径签名的刷新
+        self.cache.flush()
+        
+        if self.dependency_depth > 0 and (categorized['new'] or categorized['modified']):
+            self._add_dependent_files(all_files, categorized)
         return categorized
     
+    def _add_dependent_files(self, all_files: List[str], categorized: Dict[str, List[str]]):
+        """将依赖变更文件的未更改文件移入 dependent 分类，使其被重新分析"""
+        print(f"🔗 正在构建依赖索引（追踪 {self.dependency_depth} 层）...")
+        self.dependency_index = DependencyIndex(str(self.root_dir), cache=self.cache, workers=self.parse_workers)
+        self.dependency_index.build(all_files)
+        
+        index_stats = self.dependency_index.get_statistics()
+        print(f"✓ 依赖索引: {index_stats['files']} 个文件, {index_stats['edges']} 条依赖"
+              f"（其中 {index_stats['call_edges']} 条来自跨文件调用）, 重新解析 {index_stats['parsed_files']} 个\n")
+        
+        dependents = self.dependency_index.get_dependents(
+            categorized['new'] + categorized['modified'], self.dependency_depth)
+        if not dependents:
+            return
+        
+        still_unchanged = []
+        for file_path in categorized['unchanged']:
+            if os.path.abspath(file_path) in dependents:
+                categorized['dependent'].append(file_path)
+            else:
+                still_unchanged.append(file_path)
+        categorized['unchanged'] = still_unchanged
+        
+        self.stats['dependent_files'] = len(categorized['dependent'])
+        self.stats['unchanged_files'] = len(still_unchanged)
+    
     def analyze_incremental(self, force_all: bool = False, verbose: bool = True) -> List[Dict]:
         """
         执行增量分析
@@ -292,6 +668,8 @@ class IncrementalAnalyzer:
         print(f"📦 缓存信息:")
         print(f"  - 已缓存文件: {cache_stats['total_cached_files']}")
         print(f"  - 上次更新: {cache_stats['last_update'] or '从未'}")
+        if cache_stats['last_commit']:
+            print(f"  - 上次分析提交: {cache_stats['last_commit'][:8]}")
         print()
         
         # 扫描并分类文件
@@ -303,41 +681,86 @@ class IncrementalAnalyzer:
         print(f"  - 新文件: {self.stats['new_files']}")
         print(f"  - 已修改: {self.stats['modified_files']}")
         print(f"  - 未更改: {self.stats['unchanged_files']}")
+        if self.dependency_depth > 0:
+            print(f"  - 受依赖影响: {self.stats['dependent_files']}")
         print()
         
         # 需要分析的文件
-        files_to_analyze = categorized_files['new'] + categorized_files['modified']
+        files_to_analyze = categorized_files['new'] + categorized_files['modified'] + categorized_files['dependent']
+        
+        # 按影响范围排序：被依赖最多的文件优先分析
+        if self.dependency_index is not None and files_to_analyze:
+            ranked = self.dependency_index.rank_by_blast_radius(files_to_analyze)
+            files_to_analyze = [file_path for file_path, _ in ranked]
+            print("💥 按影响范围排序（前 5 个）:")
+            for file_path, radius in ranked[:5]:
+                print(f"  - {os.path.relpath(file_path, self.root_dir)}: 影响 {radius} 个文件")
+            print()
+        
+        # 未更改文件直接复用缓存中的完整分析结果
+        cached_results = self._load_cached_results(categorized_files['unchanged'])
         
         if not files_to_analyze:
             print("✅ 没有需要分析的文件！所有文件都是最新的。\n")
+            if cached_results:
+                self._save_incremental_report(categorized_files, [], cached_results)
+            self._record_analyzed_commit()
             return []
         
         print(f"🎯 将分析 {len(files_to_analyze)} 个文件\n")
         
-        # 分析文件
+        # 分析之前记录签名和哈希，分析期间的修改会在下次运行时被发现
+        snapshots = {file_path: self.cache.snapshot(file_path, self.scanner.file_signatures.get(file_path))
+                     for file_path in files_to_analyze}
+        
+        # 分析文件（经由扫描器的分析流水线，workers > 1 时多个文件的 LLM 请求同时在途）
         results = []
-        for i, file_path in enumerate(files_to_analyze, 1):
-            print(f"\n进度: [{i}/{len(files_to_analyze)}]")
-            
-            # 使用 DirectoryScanner 的分析方法
-            result = self.scanner.analyze_file(file_path)
-            results.append(result)
-            
-            # 更新缓存
-            if result['status'] == 'success':
-                self.cache.update_file_cache(file_path, result)
-                self.stats['analyzed_files'] += 1
-            else:
-                self.stats['failed_files'] += 1
+        try:
+            for file_path, result in zip(files_to_analyze, self.scanner.iter_analyze(files_to_analyze)):
+                results.append(result)
+                
+                # 更新缓存
+                if result['status'] == 'success':
+                    self.cache.update_file_cache(file_path, result, snapshots[file_path])
+                    self.stats['analyzed_files'] += 1
+                else:
+                    self.stats['failed_files'] += 1
+        finally:
+            # 中断时也提交已完成文件的缓存记录
+            self.cache.flush()
         
         # 打印最终统计
         self._print_summary()
         
         # 保存增量分析报告
-        self._save_incremental_report(categorized_files, results)
+        self._save_incremental_report(categorized_files, results, cached_results)
+        self.cache.prune_results()
+        if self.stats['failed_files'] == 0:
+            self._record_analyzed_commit()
         
         return results
     
+    def _record_analyzed_commit(self):
+        """所有文件都已是最新分析结果时，记录当前 HEAD 作为下次增量分析的基准"""
+        if not self.git_analyzer:
+            return
+        head = self.git_analyzer.get_head_commit()
+        if head:
+            self.cache.set_last_commit(head)
+    
+    def _load_cached_results(self, file_paths: List[str]) -> List[Dict]:
+        """读取未更改文件的缓存分析结果（旧版缓存中没有结果的文件会被跳过）"""
+        cached_results = []
+        for file_path in file_paths:
+            result = self.cache.get_cached_result(file_path)
+            if result is not None:
+                result['file_path'] = os.path.relpath(file_path, self.root_dir)
+                result['from_cache'] = True
+                cached_results.append(result)
+        if file_paths:
+            print(f"♻️  复用缓存中的分析结果: {len(cached_results)}/{len(file_paths)} 个未更改文件\n")
+        return cached_results
+    
     def _print_summary(self):
         """打印分析统计摘要"""
         print("\n" + "="*80)
@@ -347,12 +770,16 @@ class IncrementalAnalyzer:
         print(f"新文件: {self.stats['new_files']}")
         print(f"已修改文件: {self.stats['modified_files']}")
         print(f"未更改文件: {self.stats['unchanged_files']}")
+        if self.dependency_depth > 0:
+            print(f"受依赖影响的文件: {self.stats['dependent_files']}")
         print(f"成功分析: {self.stats['analyzed_files']}")
         print(f"分析失败: {self.stats['failed_files']}")
         print("="*80)
     
-    def _save_incremental_report(self, categorized_files: Dict, results: List[Dict]):
-        """保存增量分析报告"""
+    def _save_incremental_report(self, categorized_files: Dict, results: List[Dict],
+                                 cached_results: Optional[List[Dict]] = None):
+        """保存增量分析报告（包含本次分析结果和未更改文件的缓存结果）"""
+        cached_results = cached_results or []
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         report_file = self.output_dir / f"incremental_report_{timestamp}.md"
         
@@ -361,12 +788,16 @@ class IncrementalAnalyzer:
             f.write(f"**项目目录**: `{self.root_dir}`\n\n")
             f.write(f"**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             f.write(f"**分析模式**: {'Git 变更检测' if self.use_git else '文件哈希检测'}\n\n")
+            if self.cache.get_last_commit():
+                f.write(f"**基准提交**: `{self.cache.get_last_commit()[:8]}`\n\n")
             
             f.write("## 📊 统计信息\n\n")
             f.write(f"- 扫描的文件总数: {self.stats['total_files']}\n")
             f.write(f"- 新文件: {self.stats['new_files']}\n")
             f.write(f"- 已修改文件: {self.stats['modified_files']}\n")
             f.write(f"- 未更改文件: {self.stats['unchanged_files']}\n")
+            if self.dependency_depth > 0:
+                f.write(f"- 受依赖影响的文件: {self.stats['dependent_files']}\n")
             f.write(f"- 成功分析: {self.stats['analyzed_files']}\n")
             f.write(f"- 分析失败: {self.stats['failed_files']}\n\n")
             
@@ -386,6 +817,14 @@ class IncrementalAnalyzer:
                     f.write(f"- `{rel_path}`\n")
                 f.write("\n")
             
+            # 受依赖影响的文件列表
+            if categorized_files.get('dependent'):
+                f.write(f"## 🔗 受依赖影响的文件（追踪 {self.dependency_depth} 层）\n\n")
+                for file_path in categorized_files['dependent']:
+                    rel_path = os.path.relpath(file_path, self.root_dir)
+                    f.write(f"- `{rel_path}`\n")
+                f.write("\n")
+            
             # 分析结果摘要
             f.write("## 📝 分析结果\n\n")
             for result in results:
@@ -394,9 +833,117 @@ class IncrementalAnalyzer:
                 if result['error']:
                     f.write(f"   - 错误: {result['error']}\n")
                 f.write("\n")
+            for result in cached_results:
+                f.write(f"♻️ **{result['file_path']}** ({result['language']}) - 未更改，"
+                        f"复用 {result.get('last_analyzed') or '之前'} 的分析结果\n\n")
+            
+            # 完整分析内容（按文件路径排序）
+            all_results = sorted((r for r in results + cached_results if r.get('analysis')),
+                                 key=lambda r: r['file_path'])
+            if all_results:
+                f.write("## 📚 完整分析内容\n\n")
+                for result in all_results:
+                    f.write(f"### {result['file_path']}\n\n")
+                    f.write(f"{result['analysis']}\n\n")
         
         print(f"\n✓ 增量分析报告已保存: {report_file}")
     
+    def watch(self, debounce: float = 0.5, poll_interval: float = 1.0, backend: str = 'auto'):
+        """
+        监听模式：先完成一次增量分析，之后持续监听文件变更并只分析被修改的文件
+        
+        进程常驻，依赖索引、缓存和 Ollama 连接池在多次变更之间保持可用。
+        
+        Args:
+            debounce: 防抖时间（秒），连续保存时等待静默后再分析
+            poll_interval: 轮询模式下的扫描间隔（秒）
+            backend: 监听后端（auto, watchdog, polling）
+        """
+        self.analyze_incremental()
+        
+        if self.dependency_depth > 0 and self.dependency_index is None:
+            # 使用刚才增量分析扫描得到的文件列表，不再遍历一次目录
+            self.dependency_index = DependencyIndex(str(self.root_dir), cache=self.cache, workers=self.parse_workers)
+            self.dependency_index.build(list(self.scanner.file_signatures))
+        
+        watcher = FileWatcher(str(self.root_dir), ignore_dirs=self.scanner.ignore_dirs,
+                              path_filter=self._is_watched_path, debounce=debounce,
+                              poll_interval=poll_interval, backend=backend, discovery=self.scanner.discovery)
+        watcher.start()
+        print("\n" + "="*80)
+        print(f"👀 监听模式已启动（{watcher.backend}），按 Ctrl+C 退出")
+        print("="*80 + "\n")
+        
+        try:
+            for changed, deleted in watcher.batches():
+                self._handle_watch_batch(changed, deleted)
+        except KeyboardInterrupt:
+            print("\n⏹️  停止监听")
+        finally:
+            watcher.stop()
+            self.cache.flush()
+    
+    def _is_watched_path(self, file_path: str) -> bool:
+        """只监听扫描器会分析的文件，并排除报告输出目录"""
+        if os.path.abspath(file_path).startswith(str(self.output_dir.resolve()) + os.sep):
+            return False
+        return os.path.splitext(file_path)[1].lower() in self.scanner.extensions
+    
+    def _handle_watch_batch(self, changed: Set[str], deleted: Set[str]) -> List[Dict]:
+        """
+        处理一批合并后的文件变更
+        
+        Args:
+            changed: 新增或修改的文件
+            deleted: 删除的文件
+            
+        Returns:
+            本批次的分析结果
+        """
+        for file_path in deleted:
+            self.cache.remove_file_cache(file_path)
+        
+        # 过滤掉不在扫描范围内的文件，以及内容实际未变化的保存
+        touched = sorted(f for f in changed
+                         if self.scanner.is_scannable(f) and self.cache.is_file_changed(f))
+        
+        if self.dependency_index is not None and (touched or deleted):
+            self.dependency_index.update(touched, sorted(deleted))
+        
+        dependents = []
+        if self.dependency_index is not None and touched:
+            dependents = sorted(f for f in self.dependency_index.get_dependents(touched, self.dependency_depth)
+                                if os.path.exists(f))
+        
+        files_to_analyze = touched + dependents
+        if self.dependency_index is not None:
+            files_to_analyze = [f for f, _ in self.dependency_index.rank_by_blast_radius(files_to_analyze)]
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        if deleted:
+            print(f"[{timestamp}] 🗑️  已删除 {len(deleted)} 个文件")
+        if not files_to_analyze:
+            self.cache.flush()
+            return []
+        
+        print(f"[{timestamp}] ✏️  检测到 {len(touched)} 个文件变更"
+              + (f"，{len(dependents)} 个依赖文件需要重新分析" if dependents else ""))
+        
+        snapshots = {file_path: self.cache.snapshot(file_path) for file_path in files_to_analyze}
+        results = []
+        try:
+            for file_path, result in zip(files_to_analyze, self.scanner.iter_analyze(files_to_analyze)):
+                results.append(result)
+                if result['status'] == 'success':
+                    self.cache.update_file_cache(file_path, result, snapshots[file_path])
+        finally:
+            self.cache.flush()
+        
+        succeeded = sum(1 for r in results if r['status'] == 'success')
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✓ 分析完成: 成功 {succeeded}, "
+              f"失败 {len(results) - succeeded}\n")
+        return results
+    
     def clear_cache(self):
         """清空分析缓存"""
         self.cache.clear_cache()
@@ -409,6 +956,7 @@ class IncrementalAnalyzer:
         print("="*80)
         print(f"缓存文件: {stats['cache_file']}")
         print(f"已缓存文件数: {stats['total_cached_files']}")
+        print(f"已保存分析结果: {stats['stored_results']} 条 ({stats['stored_results_bytes'] / 1024:.2f} KB, 已压缩)")
         print(f"上次更新: {stats['last_update'] or '从未'}")
         print("="*80 + "\n")
         
@@ -437,6 +985,15 @@ def main():
   # 只分析 Python 和 Java 文件
   python3 src/incremental_analyzer.py . -o reports -e .py .java
   
+  # 同时重新分析导入或继承了变更文件的文件（追踪 2 层依赖）
+  python3 src/incremental_analyzer.py . -o reports --dependency-depth 2
+  
+  # 同时分析 4 个文件（多个 LLM 请求同时在途）
+  python3 src/incremental_analyzer.py . -o reports --workers 4
+  
+  # 常驻监听模式：文件保存后自动分析（安装 watchdog 时使用 inotify，否则轮询）
+  python3 src/incremental_analyzer.py . -o reports --watch --debounce 1
+  
   # 显示缓存信息
   python3 src/incremental_analyzer.py . --show-cache
   
@@ -451,6 +1008,17 @@ def main():
     parser.add_argument('-e', '--extensions', nargs='+', help='要分析的文件扩展名（例如: .py .java .js）')
     parser.add_argument('--force', action='store_true', help='强制分析所有文件，忽略缓存')
     parser.add_argument('--no-git', action='store_true', help='不使用 Git 检测变更，只使用文件哈希')
+    parser.add_argument('--dependency-depth', type=int, default=0,
+                       help='重新分析依赖变更文件的文件，指定追踪层数（默认: 0，即关闭）')
+    parser.add_argument('--parse-workers', type=int, default=1,
+                       help='构建依赖索引时解析文件的进程数（默认: 1）')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='并行分析的文件数（默认: 1，即串行分析）')
+    parser.add_argument('--watch', action='store_true', help='常驻监听文件变更并自动分析被修改的文件')
+    parser.add_argument('--debounce', type=float, default=0.5,
+                       help='监听模式的防抖时间（秒），默认 0.5')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                       help='未安装 watchdog 时的轮询间隔（秒），默认 1.0')
     parser.add_argument('--show-cache', action='store_true', help='显示缓存信息')
     parser.add_argument('--clear-cache', action='store_true', help='清空缓存')
     
@@ -462,7 +1030,10 @@ def main():
             output_dir=args.output_dir,
             cache_dir=args.cache_dir,
             extensions=args.extensions,
-            use_git=not args.no_git
+            use_git=not args.no_git,
+            dependency_depth=args.dependency_depth,
+            parse_workers=args.parse_workers,
+            workers=args.workers
         )
         
         if args.show_cache:
@@ -473,6 +1044,10 @@ def main():
             analyzer.clear_cache()
             return
         
+        if args.watch:
+            analyzer.watch(debounce=args.debounce, poll_interval=args.poll_interval)
+            return
+        
         analyzer.analyze_incremental(force_all=args.force)
         
     except KeyboardInterrupt:
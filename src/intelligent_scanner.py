@@ -6,14 +6,17 @@
 
 import os
 import sys
-from typing import List, Dict, Set
-import json
+from typing import Iterator, List, Dict, Set, Optional, Union
 from datetime import datetime
 
 # Add the src directory to the python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from agent.langchain_agent import CodeAnalysisAgent
+from llm.response_cache import DEFAULT_CACHE_PATH
+from run_manifest import RunManifest
+from results_sink import ResultsSink
+from file_discovery import FileDiscovery
 
 
 class IntelligentDirectoryScanner:
@@ -35,7 +38,8 @@ class IntelligentDirectoryScanner:
     
     def __init__(self, root_dir: str, output_dir: str = None, extensions: List[str] = None,
                  ignore_dirs: Set[str] = None, max_file_size: int = 1024 * 1024,
-                 use_agent: bool = True):
+                 use_agent: bool = True, llm_cache: str = None, resume: Optional[str] = None,
+                 use_gitignore: bool = True):
         """
         初始化智能目录扫描器
         
@@ -46,6 +50,9 @@ class IntelligentDirectoryScanner:
             ignore_dirs: 要忽略的目录集合
             max_file_size: 最大文件大小（字节）
             use_agent: 是否使用 LangChain Agent（默认 True）
+            llm_cache: LLM 响应缓存文件路径（为 None 时不使用持久化缓存）
+            resume: 要恢复的运行 ID，跳过该运行中已完成的文件（为 None 时开始新的运行）
+            use_gitignore: 是否遵循 .gitignore（Git 仓库中使用 git ls-files 列出文件）
         """
         self.root_dir = os.path.abspath(root_dir)
         self.output_dir = output_dir
@@ -53,6 +60,9 @@ class IntelligentDirectoryScanner:
         self.ignore_dirs = ignore_dirs or self.DEFAULT_IGNORE_DIRS
         self.max_file_size = max_file_size
         self.use_agent = use_agent
+        self.resume = resume
+        self.run_id: Optional[str] = None
+        self.use_gitignore = use_gitignore
         
         if not os.path.isdir(self.root_dir):
             raise ValueError(f"目录不存在: {self.root_dir}")
@@ -64,7 +74,7 @@ class IntelligentDirectoryScanner:
         # 初始化智能代理
         if self.use_agent:
             try:
-                self.agent = CodeAnalysisAgent()
+                self.agent = CodeAnalysisAgent(llm_cache=llm_cache)
                 print("✓ LangChain 智能代理已初始化\n")
             except Exception as e:
                 print(f"⚠️  智能代理初始化失败: {e}")
@@ -77,6 +87,7 @@ class IntelligentDirectoryScanner:
             'skipped_files': 0,
             'failed_files': 0,
             'total_size': 0,
+            'resumed_files': 0,
         }
     
     def scan_directory(self) -> List[str]:
@@ -85,27 +96,17 @@ class IntelligentDirectoryScanner:
         print(f"🔍 开始扫描目录: {self.root_dir}")
         print(f"📝 支持的文件类型: {', '.join(self.extensions)}\n")
         
-        for root, dirs, files in os.walk(self.root_dir):
-            dirs[:] = [d for d in dirs if d not in self.ignore_dirs]
+        discovery = FileDiscovery(self.root_dir, extensions=self.extensions, ignore_dirs=self.ignore_dirs,
+                                  use_gitignore=self.use_gitignore)
+        for found in discovery.iter_files():
+            if found.size > self.max_file_size:
+                print(f"⚠️  跳过大文件 ({found.size / 1024:.1f} KB): {found.path}")
+                self.stats['skipped_files'] += 1
+                continue
             
-            for file in files:
-                file_ext = os.path.splitext(file)[1].lower()
-                if file_ext not in self.extensions:
-                    continue
-                
-                file_path = os.path.join(root, file)
-                try:
-                    file_size = os.path.getsize(file_path)
-                    if file_size > self.max_file_size:
-                        print(f"⚠️  跳过大文件 ({file_size / 1024:.1f} KB): {file_path}")
-                        self.stats['skipped_files'] += 1
-                        continue
-                    
-                    self.stats['total_size'] += file_size
-                    found_files.append(file_path)
-                    self.stats['total_files'] += 1
-                except OSError as e:
-                    print(f"⚠️  无法访问文件: {file_path} - {e}")
+            self.stats['total_size'] += found.size
+            found_files.append(found.path)
+            self.stats['total_files'] += 1
         
         print(f"\n✓ 扫描完成，找到 {len(found_files)} 个文件")
         print(f"  总大小: {self.stats['total_size'] / 1024:.2f} KB\n")
@@ -179,6 +180,7 @@ class IntelligentDirectoryScanner:
             'status': 'pending',
             'analysis': None,
             'error': None,
+            'report_file': None,
         }
         
         print(f"{'='*80}")
@@ -222,7 +224,7 @@ class IntelligentDirectoryScanner:
             
             # 保存分析结果
             if self.output_dir:
-                self._save_analysis(rel_path, language, result)
+                result['report_file'] = self._save_analysis(rel_path, language, result)
             
         except Exception as e:
             result['status'] = 'failed'
@@ -232,10 +234,11 @@ class IntelligentDirectoryScanner:
         
         return result
     
-    def _save_analysis(self, file_path: str, language: str, result: Dict):
-        """保存分析结果到文件"""
+    def _save_analysis(self, file_path: str, language: str, result: Dict) -> str:
+        """保存分析结果到文件，返回报告路径"""
         safe_path = file_path.replace(os.sep, '_').replace('.', '_')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 同一次运行的报告使用运行 ID 命名，恢复运行时可以和清单中的文件一一对应
+        timestamp = self.run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = os.path.join(self.output_dir, f"{safe_path}_agent_analysis_{timestamp}.md")
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -255,27 +258,38 @@ class IntelligentDirectoryScanner:
             f.write(result.get('analysis', ''))
         
         print(f"✓ 分析报告已保存: {output_file}\n")
+        return output_file
     
-    def analyze_all(self) -> List[Dict]:
-        """分析所有扫描到的文件"""
+    def analyze_all(self) -> Union[ResultsSink, List[Dict]]:
+        """分析所有扫描到的文件，返回结果流（迭代得到每个文件的完整结果）"""
         files = self.scan_directory()
         
         if not files:
             print("⚠️  未找到符合条件的文件")
             return []
         
-        results = []
-        for i, file_path in enumerate(files, 1):
-            print(f"\n进度: [{i}/{len(files)}]")
-            result = self.analyze_file(file_path)
-            results.append(result)
+        # 运行清单：每完成一个文件记录一次检查点，中断后可用 --resume 继续
+        manifest, done, pending = RunManifest.start(
+            RunManifest.runs_dir_for(self.output_dir), 'IntelligentDirectoryScanner', self.root_dir, files,
+            {'analysis_mode': 'agent' if self.use_agent else 'basic', 'extensions': sorted(self.extensions)},
+            resume=self.resume, stats=self.stats)
+        self.run_id = manifest.run_id
+        
+        # 结果写入结果流后即释放，不在内存中累积
+        sink = manifest.record_all(self._iter_results(pending, len(done), len(files)), self.stats)
         
         self._print_summary()
         
         if self.output_dir:
-            self._save_summary(results)
+            self._save_summary(sink)
         
-        return results
+        return sink
+    
+    def _iter_results(self, pending: List[str], start: int, total: int) -> Iterator[Dict]:
+        """逐个分析待处理的文件并产生结果"""
+        for i, file_path in enumerate(pending, start + 1):
+            print(f"\n进度: [{i}/{total}]")
+            yield self.analyze_file(file_path)
     
     def _print_summary(self):
         """打印分析统计摘要"""
@@ -284,14 +298,16 @@ class IntelligentDirectoryScanner:
         print("="*80)
         print(f"扫描的文件总数: {self.stats['total_files']}")
         print(f"成功分析: {self.stats['analyzed_files']}")
+        if self.stats['resumed_files']:
+            print(f"  其中恢复自上次运行: {self.stats['resumed_files']}")
         print(f"跳过的文件: {self.stats['skipped_files']}")
         print(f"失败的文件: {self.stats['failed_files']}")
         print(f"总文件大小: {self.stats['total_size'] / 1024:.2f} KB")
         print(f"分析模式: {'智能代理' if self.use_agent else '基础模式'}")
         print("="*80)
     
-    def _save_summary(self, results: List[Dict]):
-        """保存汇总报告"""
+    def _save_summary(self, sink: ResultsSink):
+        """从结果流生成汇总报告（Markdown 只用轻量索引，JSON 逐条复制结果）"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         summary_file = os.path.join(self.output_dir, f"agent_summary_{timestamp}.md")
         
@@ -300,15 +316,19 @@ class IntelligentDirectoryScanner:
             f.write(f"**扫描目录**: `{self.root_dir}`\n\n")
             f.write(f"**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             f.write(f"**分析模式**: {'LangChain 智能代理' if self.use_agent else '基础模式'}\n\n")
+            if self.run_id:
+                f.write(f"**运行 ID**: `{self.run_id}`\n\n")
             f.write("## 统计信息\n\n")
             f.write(f"- 扫描的文件总数: {self.stats['total_files']}\n")
             f.write(f"- 成功分析: {self.stats['analyzed_files']}\n")
+            if self.stats['resumed_files']:
+                f.write(f"  - 其中恢复自上次运行: {self.stats['resumed_files']}\n")
             f.write(f"- 跳过的文件: {self.stats['skipped_files']}\n")
             f.write(f"- 失败的文件: {self.stats['failed_files']}\n")
             f.write(f"- 总文件大小: {self.stats['total_size'] / 1024:.2f} KB\n\n")
             f.write("## 分析结果\n\n")
             
-            for result in results:
+            for result in sink.entries():
                 status_emoji = "✅" if result['status'] == 'success' else "❌"
                 analysis_type = result.get('analysis_type', 'unknown')
                 f.write(f"{status_emoji} **{result['file_path']}** ({result['language']}) - {analysis_type}\n")
@@ -320,14 +340,13 @@ class IntelligentDirectoryScanner:
         
         # 保存 JSON 格式
         json_file = os.path.join(self.output_dir, f"agent_summary_{timestamp}.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'root_dir': self.root_dir,
-                'timestamp': datetime.now().isoformat(),
-                'analysis_mode': 'agent' if self.use_agent else 'basic',
-                'stats': self.stats,
-                'results': results,
-            }, f, ensure_ascii=False, indent=2)
+        sink.write_json(json_file, {
+            'root_dir': self.root_dir,
+            'run_id': self.run_id,
+            'timestamp': datetime.now().isoformat(),
+            'analysis_mode': 'agent' if self.use_agent else 'basic',
+            'stats': self.stats,
+        })
         
         print(f"✓ JSON 报告已保存: {json_file}")
 
@@ -343,6 +362,11 @@ def main():
     parser.add_argument('--max-size', type=int, default=1024 * 1024, help='最大文件大小（字节）')
     parser.add_argument('--ignore-dirs', nargs='+', help='要忽略的目录名称')
     parser.add_argument('--no-agent', action='store_true', help='禁用智能代理，使用基础分析')
+    parser.add_argument('--no-gitignore', action='store_true', help='不遵循 .gitignore 规则')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help='恢复中断的运行，跳过已完成的文件（运行清单保存在输出目录的 runs/ 下）')
+    parser.add_argument('--llm-cache', nargs='?', const=DEFAULT_CACHE_PATH,
+                        help=f'启用持久化 LLM 响应缓存，可指定缓存文件（默认: {DEFAULT_CACHE_PATH}）')
     
     args = parser.parse_args()
     
@@ -353,7 +377,10 @@ def main():
             extensions=args.extensions,
             ignore_dirs=set(args.ignore_dirs) if args.ignore_dirs else None,
             max_file_size=args.max_size,
-            use_agent=not args.no_agent
+            use_agent=not args.no_agent,
+            llm_cache=args.llm_cache,
+            resume=args.resume,
+            use_gitignore=not args.no_gitignore
         )
         scanner.analyze_all()
         
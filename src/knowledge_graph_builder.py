@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from graph.neo4j_client import Neo4jClient
 from graph.code_parser import CodeParser
+from file_discovery import FileDiscovery
 
 
 class KnowledgeGraphBuilder:
@@ -108,30 +109,16 @@ class KnowledgeGraphBuilder:
         
         found_files = []
         
-        for root, dirs, files in os.walk(root_path):
-            # 过滤忽略的目录
-            dirs[:] = [d for d in dirs if d not in self.ignore_dirs]
+        discovery = FileDiscovery(str(root_path), extensions=self.extensions, ignore_dirs=self.ignore_dirs)
+        for found in discovery.iter_files():
+            if found.size > self.max_file_size:
+                print(f"⚠️  跳过大文件 ({found.size / 1024:.1f} KB): {found.path}")
+                self.stats['skipped_files'] += 1
+                continue
             
-            for file in files:
-                file_ext = os.path.splitext(file)[1].lower()
-                if file_ext not in self.extensions:
-                    continue
-                
-                file_path = os.path.join(root, file)
-                
-                try:
-                    file_size = os.path.getsize(file_path)
-                    if file_size > self.max_file_size:
-                        print(f"⚠️  跳过大文件 ({file_size / 1024:.1f} KB): {file_path}")
-                        self.stats['skipped_files'] += 1
-                        continue
-                    
-                    self.stats['total_size'] += file_size
-                    found_files.append(file_path)
-                    self.stats['total_files'] += 1
-                    
-                except OSError as e:
-                    print(f"⚠️  无法访问文件: {file_path} - {e}")
+            self.stats['total_size'] += found.size
+            found_files.append(found.path)
+            self.stats['total_files'] += 1
         
         print(f"\n✓ 扫描完成，找到 {len(found_files)} 个文件")
         print(f"  总大小: {self.stats['total_size'] / 1024:.2f} KB\n")
@@ -0,0 +1,122 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .http_pool import DEFAULT_POOL_SIZE
+from .ollama_client import OllamaClient
+
+
+class AsyncOllamaClient:
+    def __init__(self, base_urls="http://localhost:11434", model="qwen2.5:0.5b", max_in_flight=4,
+                 pool_size=None, connect_timeout=None, read_timeout=None, cache=None, client=None):
+        """
+        Asyncio counterpart of OllamaClient that keeps several prompts in flight.
+
+        Requests go through the same pooled HTTP session as OllamaClient and
+        are run on a dedicated thread pool sized to ``max_in_flight``, so no
+        additional HTTP stack is needed.
+
+        Args:
+            base_urls: Ollama server address, or a list of addresses load-balanced by
+                least outstanding requests
+            model: Model name
+            max_in_flight: Maximum number of prompts sent concurrently
+            pool_size: Pooled connections per host (defaults to max(max_in_flight, DEFAULT_POOL_SIZE))
+            connect_timeout: Seconds to wait for the TCP connection
+            read_timeout: Seconds to wait for the model response
+            cache: Optional ResponseCache shared by all endpoints
+            client: Existing OllamaClient to send prompts through (its endpoints, cache and
+                balancer are reused; the connection settings above are then ignored)
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.max_in_flight = max_in_flight
+        if client is None:
+            if isinstance(base_urls, str):
+                base_urls = [base_urls]
+            if not base_urls:
+                raise ValueError("At least one Ollama base URL is required")
+            pool_size = pool_size or max(max_in_flight, DEFAULT_POOL_SIZE)
+            client = OllamaClient(base_url=list(base_urls), model=model, pool_size=pool_size,
+                                  connect_timeout=connect_timeout, read_timeout=read_timeout, cache=cache)
+        self.client = client
+        self.model = getattr(client, "model", model)
+        self._semaphores = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="ollama")
+
+    def _get_semaphore(self):
+        """Return the in-flight limiter bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphores = {loop: semaphore}
+        return semaphore
+
+    async def generate(self, prompt):
+        """
+        Send one prompt, waiting for a free in-flight slot first.
+        """
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.client.generate_response, prompt)
+
+    async def iter_results(self, prompts):
+        """
+        Yield (index, response) pairs as prompts complete.
+
+        ``prompts`` may be any iterable, including a lazy generator: the next
+        prompt is only pulled once one of the in-flight prompts has finished,
+        so a slow Ollama server applies backpressure to the producer instead
+        of letting an unbounded queue build up.
+
+        If a prompt fails (or the caller stops iterating), the prompts still in
+        flight are cancelled before the exception propagates.
+        """
+        pending = set()
+
+        try:
+            for index, prompt in enumerate(prompts):
+                while len(pending) >= self.max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.create_task(self._indexed_generate(index, prompt)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _indexed_generate(self, index, prompt):
+        return index, await self.generate(prompt)
+
+    async def generate_many(self, prompts):
+        """
+        Send all prompts with bounded concurrency and return responses in input order.
+        """
+        results = {}
+        async for index, response in self.iter_results(prompts):
+            results[index] = response
+        return [results[i] for i in range(len(results))]
+
+    def run_many(self, prompts):
+        """
+        Blocking wrapper around generate_many for synchronous callers.
+        """
+        return asyncio.run(self.generate_many(prompts))
+
+    def close(self):
+        """
+        Shut down the worker threads used for in-flight requests.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
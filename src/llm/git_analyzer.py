@@ -131,3 +131,76 @@ class GitAnalyzer:
         except Exception as e:
             print(f"Error getting changed files: {e}")
             return []
+
+    def get_head_commit(self):
+        """
+        Return the full SHA of HEAD, or None for a repository without commits
+        """
+        try:
+            return self.repo.head.commit.hexsha
+        except ValueError:
+            return None
+
+    def get_changes_since(self, base_commit):
+        """
+        Get every file changed since base_commit, including uncommitted work
+
+        Runs one `git diff --name-status -M <base>..HEAD` for committed changes
+        and `git status --porcelain` for staged, unstaged and untracked files.
+        Paths are relative to the repository root.
+
+        Args:
+            base_commit: Commit hash the previous analysis ran against
+
+        Returns:
+            Dictionary with 'modified', 'added' and 'deleted' path sets and
+            'renamed', a list of (old_path, new_path, similarity) tuples
+        """
+        changes = {'modified': set(), 'added': set(), 'deleted': set(), 'renamed': []}
+
+        diff_output = self.repo.git.diff('--name-status', '-M', '-z', f'{base_commit}..HEAD')
+        fields = diff_output.split('\0')
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            if status.startswith(('R', 'C')):
+                old_path, new_path = fields[i + 1], fields[i + 2]
+                similarity = int(status[1:] or 100)
+                if status.startswith('R'):
+                    changes['renamed'].append((old_path, new_path, similarity))
+                else:
+                    changes['added'].add(new_path)
+                i += 3
+                continue
+            path = fields[i + 1]
+            if status == 'A':
+                changes['added'].add(path)
+            elif status == 'D':
+                changes['deleted'].add(path)
+            else:
+                changes['modified'].add(path)
+            i += 2
+
+        status_output = self.repo.git.status('--porcelain', '-z', '--untracked-files=all')
+        fields = status_output.split('\0')
+        i = 0
+        while i < len(fields):
+            entry = fields[i]
+            if not entry:
+                i += 1
+                continue
+            code, path = entry[:2], entry[3:]
+            if 'R' in code:
+                # Renamed in the index: the original path follows as the next field
+                changes['renamed'].append((fields[i + 1], path, 100))
+                i += 2
+                continue
+            if code == '??' or 'A' in code:
+                changes['added'].add(path)
+            elif 'D' in code:
+                changes['deleted'].add(path)
+            else:
+                changes['modified'].add(path)
+            i += 1
+
+        return changes
@@ -0,0 +1,60 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Default transport settings shared by every Ollama caller
+DEFAULT_POOL_SIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 300
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Return the process-wide pooled HTTP session for the given pool size.
+
+    All clients asking for the same pool size share one ``requests.Session``,
+    so TCP connections to the Ollama server are kept alive and reused across
+    prompts instead of being re-established for every request. When more
+    threads than ``pool_size`` are in flight, callers block until a pooled
+    connection is released rather than opening extra sockets.
+
+    Args:
+        pool_size: Maximum number of keep-alive connections per host
+
+    Returns:
+        Shared requests.Session instance
+    """
+    with _sessions_lock:
+        session = _sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['Connection'] = 'keep-alive'
+            _sessions[pool_size] = session
+        return session
+
+
+def get_timeout(connect_timeout=None, read_timeout=None):
+    """
+    Build a (connect, read) timeout tuple, falling back to the defaults.
+    """
+    return (
+        connect_timeout if connect_timeout is not None else DEFAULT_CONNECT_TIMEOUT,
+        read_timeout if read_timeout is not None else DEFAULT_READ_TIMEOUT,
+    )
+
+
+def close_sessions():
+    """
+    Close every pooled session and drop its idle connections.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,120 @@
+import threading
+import time
+
+DEFAULT_COOLDOWN = 30
+DEFAULT_EWMA_ALPHA = 0.3
+
+
+def parse_base_urls(base_urls):
+    """
+    Normalize Ollama server addresses into a list of URLs without trailing slashes.
+
+    Args:
+        base_urls: A single address, a comma-separated string of addresses
+            (e.g. the OLLAMA_API_URL environment variable), or a list of addresses
+
+    Returns:
+        List of stripped addresses; blank entries are dropped
+    """
+    if isinstance(base_urls, str):
+        base_urls = base_urls.split(',')
+    return [url.strip().rstrip('/') for url in base_urls if url and url.strip()]
+
+
+class Endpoint:
+    def __init__(self, url):
+        """
+        Runtime state of one Ollama server behind the balancer.
+        """
+        self.url = url.strip().rstrip('/')
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.total_latency = 0.0
+        self.latency_ewma = None
+        self.ejected_until = 0.0
+
+    def is_available(self, now):
+        return now >= self.ejected_until
+
+    def to_dict(self, now):
+        return {
+            'url': self.url,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'failures': self.failures,
+            'ejections': self.ejections,
+            'avg_latency': self.total_latency / self.requests if self.requests else None,
+            'ewma_latency': self.latency_ewma,
+            'available': self.is_available(now),
+            'ejected_for': max(0.0, self.ejected_until - now),
+        }
+
+
+class OllamaLoadBalancer:
+    def __init__(self, base_urls, cooldown=DEFAULT_COOLDOWN, slow_threshold=None, ewma_alpha=DEFAULT_EWMA_ALPHA):
+        """
+        Client-side balancer over several Ollama servers.
+
+        Each request goes to the healthy endpoint with the fewest outstanding
+        requests (ties broken by the lower latency average). Endpoints that
+        fail, or answer slower than ``slow_threshold``, are ejected for
+        ``cooldown`` seconds. If every endpoint is ejected, the one whose
+        cooldown ends first is used so requests never stall.
+
+        Args:
+            base_urls: List of Ollama server addresses
+            cooldown: Seconds an endpoint stays ejected after a failure or slow response
+            slow_threshold: Latency in seconds above which an endpoint is treated as slow (None disables)
+            ewma_alpha: Smoothing factor of the per-endpoint latency average
+        """
+        if not base_urls:
+            raise ValueError("At least one Ollama base URL is required")
+        self.endpoints = [Endpoint(url) for url in base_urls]
+        self.cooldown = cooldown
+        self.slow_threshold = slow_threshold
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Pick an endpoint for the next request and count it as outstanding.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.is_available(now)]
+            if candidates:
+                endpoint = min(candidates, key=lambda e: (e.outstanding, e.latency_ewma or 0.0))
+            else:
+                endpoint = min(self.endpoints, key=lambda e: e.ejected_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, latency, success):
+        """
+        Record the outcome of a request and eject the endpoint if it failed or was slow.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            endpoint.total_latency += latency
+            if endpoint.latency_ewma is None:
+                endpoint.latency_ewma = latency
+            else:
+                endpoint.latency_ewma += self.ewma_alpha * (latency - endpoint.latency_ewma)
+
+            slow = self.slow_threshold is not None and latency > self.slow_threshold
+            if not success:
+                endpoint.failures += 1
+            if not success or slow:
+                endpoint.ejected_until = time.monotonic() + self.cooldown
+                endpoint.ejections += 1
+
+    def get_statistics(self):
+        """
+        Return per-endpoint request counts, latency averages and health.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [endpoint.to_dict(now) for endpoint in self.endpoints]
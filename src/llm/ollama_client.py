@@ -1,26 +1,199 @@
 import requests
 import json
+import time
+from contextlib import contextmanager
+
+from .http_pool import DEFAULT_POOL_SIZE, get_session, get_timeout
+from .load_balancer import OllamaLoadBalancer, parse_base_urls
 
 class OllamaClient:
-    def __init__(self, base_url="http://localhost:11434", model="qwen2.5:0.5b"):
-        self.base_url = base_url
+    def __init__(self, base_url="http://localhost:11434", model="qwen2.5:0.5b",
+                 pool_size=DEFAULT_POOL_SIZE, connect_timeout=None, read_timeout=None,
+                 options=None, cache=None, balancer=None):
+        """
+        Args:
+            base_url: Ollama server address, a comma-separated string or a list of addresses
+                to load-balance over (surrounding whitespace and trailing slashes are ignored)
+            model: Model name
+            pool_size: Maximum number of pooled keep-alive connections
+            connect_timeout: Seconds to wait for the TCP connection
+            read_timeout: Seconds to wait for the model response
+            options: Optional Ollama generation options (temperature, num_ctx, ...)
+            cache: Optional ResponseCache consulted before running inference
+            balancer: Optional OllamaLoadBalancer (created automatically for several base URLs)
+        """
+        base_urls = parse_base_urls(base_url)
+        if not base_urls:
+            raise ValueError("At least one Ollama base URL is required")
+        if len(base_urls) > 1 and balancer is None:
+            balancer = OllamaLoadBalancer(base_urls)
+        self.base_url = base_urls[0]
         self.model = model
         self.api_url = f"{self.base_url}/api/generate"
+        self.balancer = balancer
+        self.timeout = get_timeout(connect_timeout, read_timeout)
+        self.session = get_session(pool_size)
+        self.options = options
+        self.cache = cache
 
     def generate_response(self, prompt):
         """
         Sends a prompt to the Ollama model and returns the response.
         """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.model, prompt, self.options)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        payload = self._build_payload(prompt, stream=False)
+
+        # With several endpoints, a failed request is retried once per endpoint
+        attempts = len(self.balancer.endpoints) if self.balancer else 1
+        for attempt in range(attempts):
+            try:
+                with self._select_endpoint() as lease:
+                    response = self.session.post(lease.url, json=payload, timeout=self.timeout)
+                    response.raise_for_status()
+                    result = response.json()
+                break
+            except requests.exceptions.RequestException as e:
+                if attempt == attempts - 1:
+                    return f"Error communicating with Ollama: {e}"
+
+        if "response" not in result:
+            return "No response from model."
+        if cache_key is not None:
+            self.cache.set(cache_key, result["response"], model=self.model)
+        return result["response"]
+
+    @contextmanager
+    def _select_endpoint(self):
+        """
+        Yield an _EndpointLease for the request and report its outcome to the balancer.
+
+        The recorded latency is the whole request, unless the caller marks the
+        first byte with ``lease.first_byte()`` (streaming), so that time spent by
+        the consumer between chunks is not charged to the endpoint.
+        """
+        if self.balancer is None:
+            yield _EndpointLease(self.api_url)
+            return
+
+        endpoint = self.balancer.acquire()
+        lease = _EndpointLease(f"{endpoint.url}/api/generate")
+        success = False
+        try:
+            yield lease
+            success = True
+        except GeneratorExit:
+            # The caller stopped consuming a stream; that is not an endpoint failure
+            success = True
+            raise
+        finally:
+            self.balancer.release(endpoint, lease.latency(), success)
+
+    def _build_payload(self, prompt, stream):
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False
+            "stream": stream
         }
-        
+        if self.options:
+            payload["options"] = self.options
+        return payload
+
+    def generate_stream(self, prompt, metrics=None):
+        """
+        Sends a prompt with streaming enabled and yields tokens as NDJSON chunks arrive.
+
+        Args:
+            prompt: Prompt text
+            metrics: Optional dict filled with timing metrics once the stream ends:
+                time_to_first_token, total_duration, tokens_per_second, eval_count,
+                eval_duration, prompt_eval_count and server_total_duration (seconds).
+                If the request fails or the server sends a malformed or error chunk,
+                the stream stops and the message is stored under "error" (errors are
+                never yielded as tokens).
+
+        Raises:
+            requests.exceptions.RequestException, ValueError: when no metrics dict is
+                supplied, so that a failure is never reported as an empty stream
+        """
+        payload = self._build_payload(prompt, stream=True)
+        raise_errors = metrics is None
+        if metrics is None:
+            metrics = {}
+
+        start = time.perf_counter()
+        first_token_at = None
+        final_chunk = {}
+
         try:
-            response = requests.post(self.api_url, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("response", "No response from model.")
+            with self._select_endpoint() as lease, \
+                    self.session.post(lease.url, json=payload, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    lease.first_byte()
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise ValueError(chunk["error"])
+                    token = chunk.get("response", "")
+                    if token:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        yield token
+                    if chunk.get("done"):
+                        final_chunk = chunk
+                        break
         except requests.exceptions.RequestException as e:
-            return f"Error communicating with Ollama: {e}"
+            if raise_errors:
+                raise
+            metrics["error"] = f"Error communicating with Ollama: {e}"
+        except ValueError as e:
+            if raise_errors:
+                raise
+            metrics["error"] = f"Invalid response from Ollama: {e}"
+        finally:
+            metrics.update(self._build_stream_metrics(start, first_token_at, final_chunk))
+
+    @staticmethod
+    def _build_stream_metrics(start, first_token_at, final_chunk):
+        """
+        Combine client-side timings with the eval statistics Ollama reports in its final chunk.
+        """
+        eval_count = final_chunk.get("eval_count", 0)
+        eval_duration = final_chunk.get("eval_duration", 0) / 1e9
+        return {
+            "time_to_first_token": (first_token_at - start) if first_token_at is not None else None,
+            "total_duration": time.perf_counter() - start,
+            "eval_count": eval_count,
+            "eval_duration": eval_duration,
+            "tokens_per_second": (eval_count / eval_duration) if eval_duration else None,
+            "prompt_eval_count": final_chunk.get("prompt_eval_count", 0),
+            "server_total_duration": final_chunk.get("total_duration", 0) / 1e9,
+        }
+
+
+class _EndpointLease:
+    """
+    URL of the endpoint chosen for one request, plus the latency to report for it.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.start = time.perf_counter()
+        self.first_byte_at = None
+
+    def first_byte(self):
+        """Mark the arrival of the first response data (only the first call counts)."""
+        if self.first_byte_at is None:
+            self.first_byte_at = time.perf_counter()
+
+    def latency(self):
+        """Seconds until the first byte if it was marked, otherwise until now."""
+        end = self.first_byte_at if self.first_byte_at is not None else time.perf_counter()
+        return end - self.start
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Default location shared by the CLI tools and the API/web servers
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aicodeanalyzer", "llm_responses.sqlite")
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL = 7 * 24 * 3600
+# Writes between re-counting the table (picks up entries written by other processes)
+RECOUNT_INTERVAL = 256
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        """
+        Persistent, content-addressed cache of LLM responses backed by SQLite.
+
+        Entries are keyed by a hash of model, prompt and generation options,
+        evicted least-recently-used once ``max_entries`` is exceeded and
+        expire after ``ttl`` seconds. The database runs in WAL mode so several
+        processes (CLI scans, API server, web UI) can share one cache file.
+
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of cached responses
+            ttl: Seconds before an entry expires (None disables expiry)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'writes': 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        # Tracked row count, so that writes below max_entries never scan the table
+        self._entries = self._count()
+        self._writes_since_count = 0
+
+    def _count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model, prompt, options=None):
+        """
+        Hash model, prompt and generation options into a cache key.
+        """
+        material = json.dumps({'model': model, 'prompt': prompt, 'options': options or {}},
+                              sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached response for key, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            response, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._entries -= 1
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.stats['hits'] += 1
+            return response
+
+    def set(self, key, response, model=None):
+        """
+        Store a response and evict the least recently used entries above max_entries.
+
+        Eviction only runs once the tracked row count exceeds max_entries and then
+        deletes just the surplus through the last_access index; the count is
+        re-read every RECOUNT_INTERVAL writes to include other processes' writes.
+        """
+        now = time.time()
+        with self._lock:
+            existed = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            self.stats['writes'] += 1
+            if existed is None:
+                self._entries += 1
+            self._writes_since_count += 1
+            if self._writes_since_count >= RECOUNT_INTERVAL:
+                self._entries = self._count()
+                self._writes_since_count = 0
+            if self.max_entries is not None and self._entries > self.max_entries:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (self._entries - self.max_entries,)
+                )
+                evicted = max(cursor.rowcount, 0)
+                self._entries -= evicted
+                self.stats['evictions'] += evicted
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._entries = 0
+
+    def get_statistics(self):
+        """
+        Return entry count and hit/miss counters for this process.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+            'path': self.path,
+        })
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_cache(path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+    """
+    Return the process-wide ResponseCache for path, creating it on first use.
+    """
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, max_entries=max_entries, ttl=ttl)
+            _caches[path] = cache
+        return cache
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Parse Cache - ASTAnalyzer 单文件解析结果的持久化缓存
+以文件内容哈希判断是否需要重新解析；文件状态签名（大小、mtime_ns、inode）未变时
+连文件内容都不读取。缓存记录分析器版本，解析结果格式变化后旧记录自动失效。
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+from file_signature import hash_file, stat_signature
+
+# 默认位置与 LLM 响应缓存相同
+DEFAULT_PARSE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aicodeanalyzer", "parse_cache.sqlite")
+
+
+class ParseCache:
+    """
+    SQLite 存储的解析缓存，每个 (文件, 语言) 一行
+
+    数据库使用 WAL 模式，多个进程可以共享同一个缓存文件；写入按批次提交。
+    """
+
+    def __init__(self, path: str = DEFAULT_PARSE_CACHE_PATH, version: str = '1', batch_size: int = 200):
+        """
+        打开（或创建）解析缓存
+
+        Args:
+            path: SQLite 数据库文件
+            version: 分析器版本，与缓存中记录的版本不同时清空缓存
+            batch_size: 每累计多少次写入提交一次事务
+        """
+        self.path = path
+        self.version = str(version)
+        self.batch_size = max(1, batch_size)
+        self.stats = {'hits': 0, 'stat_hits': 0, 'misses': 0, 'writes': 0}
+        self._pending_writes = 0
+        # lookup 未命中时算出的 (状态签名, 内容哈希)，store 时直接使用，避免再次读取文件
+        self._missed: Dict[Tuple[str, str], Tuple[Optional[tuple], str]] = {}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parses ("
+            " path TEXT NOT NULL,"
+            " language TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " size INTEGER, mtime_ns INTEGER, inode INTEGER,"
+            " result TEXT NOT NULL,"
+            " PRIMARY KEY (path, language))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != self.version:
+            self._conn.execute("DELETE FROM parses")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+        self._conn.commit()
+
+    def _record_write(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def lookup(self, file_path: str, language: str) -> Optional[Dict]:
+        """
+        查找文件的解析结果
+
+        状态签名一致时直接返回；签名变化但内容哈希一致时刷新签名后返回；否则返回 None。
+        """
+        abs_path = os.path.abspath(file_path)
+        signature = stat_signature(abs_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, size, mtime_ns, inode, result FROM parses WHERE path = ? AND language = ?",
+                (abs_path, language)
+            ).fetchone()
+            if row is not None and signature is not None and tuple(row[1:4]) == signature:
+                self.stats['hits'] += 1
+                self.stats['stat_hits'] += 1
+                return json.loads(row[4])
+
+        content_hash = hash_file(abs_path)
+        with self._lock:
+            if row is not None and content_hash is not None and row[0] == content_hash:
+                if signature is not None:
+                    self._conn.execute(
+                        "UPDATE parses SET size = ?, mtime_ns = ?, inode = ? WHERE path = ? AND language = ?",
+                        (*signature, abs_path, language)
+                    )
+                    self._record_write()
+                self.stats['hits'] += 1
+                return json.loads(row[4])
+
+            self.stats['misses'] += 1
+            if content_hash is not None:
+                self._missed[(abs_path, language)] = (signature, content_hash)
+        return None
+
+    def store(self, file_path: str, language: str, result: Dict):
+        """保存文件的解析结果（使用 lookup 时记录的签名和哈希，没有时重新计算）"""
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            missed = self._missed.pop((abs_path, language), None)
+        if missed is None:
+            signature, content_hash = stat_signature(abs_path), hash_file(abs_path)
+            if content_hash is None:
+                return
+        else:
+            signature, content_hash = missed
+        size, mtime_ns, inode = signature or (None, None, None)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parses (path, language, content_hash, size, mtime_ns, inode, result)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (abs_path, language, content_hash, size, mtime_ns, inode, json.dumps(result, ensure_ascii=False))
+            )
+            self.stats['writes'] += 1
+            self._record_write()
+
+    def flush(self):
+        """提交未提交的写入"""
+        with self._lock:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM parses")
+            self._conn.commit()
+            self._missed.clear()
+
+    def get_statistics(self) -> Dict:
+        """缓存条目数和本进程的命中统计"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM parses").fetchone()[0]
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'entries': entries,
+            'version': self.version,
+            'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+            'path': self.path,
+        })
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
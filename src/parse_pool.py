@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Parse Pool - 多进程解析阶段
+ast.parse 和大量正则匹配是 CPU 密集型操作，在线程中受 GIL 限制只能用到一个核心。
+解析阶段把文件路径分发给进程池，工作进程返回可 pickle 的单文件摘要，
+父进程按输入顺序把摘要合并到全局依赖图 / 调用图中。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# 每个任务包含的文件数上限：太小时进程间通信开销占比高，太大时负载不均衡
+MAX_CHUNK_SIZE = 32
+
+
+def default_workers() -> int:
+    """默认进程数：CPU 核心数"""
+    return os.cpu_count() or 1
+
+
+def parse_in_pool(func: Callable[[T], R], items: Sequence[T], workers: int = 1,
+                  chunksize: Optional[int] = None) -> Iterator[R]:
+    """
+    并行执行解析函数，按输入顺序产生结果
+
+    Args:
+        func: 解析函数，必须可以 pickle（模块级函数或其 functools.partial），返回值也必须可以 pickle
+        items: 要解析的文件路径等输入
+        workers: 进程数，1 表示在当前进程中顺序执行
+        chunksize: 每个任务包含的输入数，为 None 时根据输入数量和进程数自动选择
+
+    Returns:
+        结果迭代器；某个输入的解析抛出异常时，异常在取到该结果时重新抛出
+    """
+    if workers <= 1 or len(items) < 2:
+        yield from map(func, items)
+        return
+
+    workers = min(workers, len(items))
+    if chunksize is None:
+        chunksize = max(1, min(MAX_CHUNK_SIZE, len(items) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, items, chunksize=chunksize)
@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Project Call Graph - 全项目的跨文件函数调用图
+函数以限定名标识（Python: 模块.类.函数，Java: 包.类.方法(参数类型)），重载方法和不同类中的
+同名方法不再互相覆盖。所有文件在一次并行解析中提取函数、类、导入和调用点，
+然后在当前进程中按 self/this、变量声明类型、导入和同包类型把调用点解析到具体的函数。
+单个文件的分析只查询该文件在项目图中的切片，不再重新构建调用图。
+"""
+
+import os
+import re
+import ast
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from call_chain_analyzer import CallChainAnalyzer, _JAVA_METHOD, _line_starts
+from file_signature import stat_signature
+from parse_cache import ParseCache
+from parse_pool import parse_in_pool
+from symbol_graph import SymbolGraph
+
+# 与 AST 解析缓存分开存放：两者版本号独立，共用一个文件会互相清空
+DEFAULT_CALL_GRAPH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aicodeanalyzer", "call_graph_cache.sqlite")
+
+# 单文件摘要的格式版本，修改 summarize_project_file 的输出时递增（使缓存失效）
+SUMMARY_VERSION = 2
+
+LANGUAGES = {'.py': 'Python', '.java': 'Java'}
+
+_CALL_SITE = re.compile(r'(?<!\w)(?:(\w+)\s*\.\s*)?(\w+)\s*\(')
+_JAVA_PACKAGE = re.compile(r'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+_JAVA_IMPORT = re.compile(r'^\s*import\s+(static\s+)?([\w.]+(?:\.\*)?)\s*;', re.MULTILINE)
+_JAVA_TYPE_DECLARATION = re.compile(
+    r'^[ \t]*(?:(?:public|private|protected|static|final|abstract|sealed|non-sealed|strictfp)\s+)*'
+    r'(?:class|interface|enum|record|@interface)\s+(\w+)',
+    re.MULTILINE
+)
+# 字段、参数和局部变量声明: Type name; / Type<...> name = / Type name)
+_JAVA_VARIABLE = re.compile(r'\b([A-Z]\w*)(?:<[^<>;(){}]*(?:<[^<>;(){}]*>[^<>;(){}]*)*>)?(?:\[\])*\s+(\w+)\s*[;=,):]')
+_JAVA_GENERIC = re.compile(r'<[^<>]*>')
+_JAVA_ANNOTATION = re.compile(r'@\w+(?:\([^)]*\))?')
+# Python 中由构造调用赋值的变量和属性: x = Foo( / self.x = Foo(（第一组为 self 时是实例属性）
+_PYTHON_ASSIGNMENT = re.compile(r'(?:\b(self)\.)?\b(\w+)\s*(?::\s*[\w.\[\], ]+)?=\s*([A-Z]\w*)\s*\(')
+
+
+def summarize_project_file(item: Tuple[str, str, bool]) -> Dict:
+    """
+    提取单个文件的函数、类、导入和调用点（可在工作进程中执行，结果可 JSON 序列化）
+
+    Args:
+        item: (文件路径, 语言, 是否过滤默认方法)
+
+    Returns:
+        {language, package, imports, classes, variables, functions}；
+        variables 为类级别的变量类型 {类名（模块级为 ''）: {变量名: 类型名}}（Java 字段、Python 实例属性和模块变量）；
+        functions 中每个函数额外带有 class（所在类，嵌套类为 Outer.Inner）、variables（参数和局部变量的类型）
+        和 calls（[[接收者, 函数名, 参数个数]]）
+    """
+    file_path, language, filter_default_methods = item
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except OSError:
+        content = ''
+
+    analyzer = CallChainAnalyzer(language=language, filter_default_methods=filter_default_methods)
+    if language == 'Java':
+        functions = analyzer.extract_functions_java(content, file_path)
+        package, imports, classes = _java_declarations(analyzer, content)
+    else:
+        functions = analyzer.extract_functions_python(content, file_path)
+        package = None
+        imports, classes = _python_declarations(content)
+    variables = _class_variables(analyzer, language, content, classes, functions)
+
+    for func in functions:
+        func['class'] = _enclosing_class(classes, func['start_line'])
+        func['variables'] = _local_variables(language, func['code'])
+        code = CallChainAnalyzer._strip_declaration(func)
+        # 与单文件分析相同的过滤规则（关键字、getter/setter、常见工具方法）
+        allowed = analyzer.extract_function_calls(code, language)
+        sites = []
+        seen = set()
+        for match in _CALL_SITE.finditer(code):
+            receiver, name = match.group(1), match.group(2)
+            if name not in allowed:
+                continue
+            if receiver is None and match.start() > 0 and code[:match.start()].rstrip().endswith('.'):
+                receiver = ''  # 链式调用 a().b()：接收者未知
+            arity = _argument_count(code, match.end() - 1)
+            if (receiver, name, arity) not in seen:
+                seen.add((receiver, name, arity))
+                sites.append([receiver, name, arity])
+        func['calls'] = sites
+
+    return {
+        'language': language,
+        'package': package,
+        'imports': imports,
+        'classes': classes,
+        'variables': variables,
+        'functions': functions,
+    }
+
+
+def _local_variables(language: str, code: str) -> Dict[str, str]:
+    """函数内声明的变量类型（Java 含参数；Python 为构造调用赋值的局部变量）"""
+    if language == 'Java':
+        return {name: type_name for type_name, name in _JAVA_VARIABLE.findall(code)}
+    return {name: type_name for is_attribute, name, type_name in _PYTHON_ASSIGNMENT.findall(code) if not is_attribute}
+
+
+def _class_variables(analyzer: CallChainAnalyzer, language: str, content: str, classes: List[Dict],
+                     functions: List[Dict]) -> Dict[str, Dict[str, str]]:
+    """
+    类级别的变量类型 {类名（模块级为 ''）: {变量名: 类型名}}
+
+    Java 为方法体之外声明的字段；Python 为实例属性（self.x = Foo()，归属所在的类）和函数之外的模块变量。
+    函数的参数和局部变量不在其中，同名的局部变量不会互相覆盖。
+    """
+    line_starts = _line_starts(content.split('\n'))
+    if language == 'Java':
+        # 包括被过滤的 getter/setter 在内的全部方法体
+        matches = list(_JAVA_METHOD.finditer(content))
+        starts = [bisect_right(line_starts, m.start()) for m in matches]
+        ranges = list(zip(starts, analyzer._find_method_ends(content, starts, len(line_starts))))
+    else:
+        ranges = [(func['start_line'], func['end_line']) for func in functions]
+
+    # 每行是否在某个函数内（按行标记，避免对每个匹配遍历所有函数）
+    in_function = bytearray(len(line_starts) + 2)
+    for start, end in ranges:
+        in_function[start:end + 1] = b'\x01' * (end - start + 1)
+
+    variables: Dict[str, Dict[str, str]] = defaultdict(dict)
+    if language == 'Java':
+        for match in _JAVA_VARIABLE.finditer(content):
+            line = bisect_right(line_starts, match.start())
+            if not in_function[line]:
+                variables[_enclosing_class(classes, line) or ''][match.group(2)] = match.group(1)
+    else:
+        for match in _PYTHON_ASSIGNMENT.finditer(content):
+            line = bisect_right(line_starts, match.start())
+            if match.group(1) or not in_function[line]:
+                variables[_enclosing_class(classes, line) or ''][match.group(2)] = match.group(3)
+    return dict(variables)
+
+
+def _argument_count(code: str, open_paren: int) -> int:
+    """调用点的参数个数（按顶层逗号计数，用于区分 Java 重载方法）"""
+    depth = 0
+    count = 0
+    for i in range(open_paren, len(code)):
+        char = code[i]
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if depth == 0:
+                return count
+        elif depth == 1:
+            if char == ',':
+                count += 1
+            elif count == 0 and not char.isspace():
+                count = 1
+    return count
+
+
+def _java_declarations(analyzer: CallChainAnalyzer, content: str) -> Tuple[Optional[str], List[List], List[Dict]]:
+    match = _JAVA_PACKAGE.search(content)
+    package = match.group(1) if match else None
+    imports = [[bool(static), target] for static, target in _JAVA_IMPORT.findall(content)]
+
+    line_starts = _line_starts(content.split('\n'))
+    matches = list(_JAVA_TYPE_DECLARATION.finditer(content))
+    start_lines = [bisect_right(line_starts, m.start()) for m in matches]
+    end_lines = analyzer._find_method_ends(content, start_lines, len(line_starts))
+
+    classes = []
+    for m, start, end in zip(matches, start_lines, end_lines):
+        outer = _enclosing_class(classes, start)
+        name = f"{outer}.{m.group(1)}" if outer else m.group(1)
+        classes.append({'name': name, 'start_line': start, 'end_line': end})
+    return package, imports, classes
+
+
+def _python_declarations(content: str) -> Tuple[Dict[str, List], List[Dict]]:
+    """用 ast 提取导入别名和类的行范围（语法错误时返回空结果）"""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return {}, []
+
+    imports: Dict[str, List] = {}  # {绑定名: [相对导入层级, 目标]}
+    classes: List[Dict] = []
+
+    def visit(node, prefix):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.Import):
+                for alias in child.names:
+                    if alias.asname:
+                        imports[alias.asname] = [0, alias.name]
+                    else:
+                        top = alias.name.split('.')[0]
+                        imports[top] = [0, top]
+            elif isinstance(child, ast.ImportFrom):
+                for alias in child.names:
+                    if alias.name != '*':
+                        target = f"{child.module}.{alias.name}" if child.module else alias.name
+                        imports[alias.asname or alias.name] = [child.level, target]
+            elif isinstance(child, ast.ClassDef):
+                name = f"{prefix}.{child.name}" if prefix else child.name
+                classes.append({'name': name, 'start_line': child.lineno, 'end_line': child.end_lineno})
+                visit(child, name)
+            else:
+                visit(child, prefix)
+
+    visit(tree, '')
+    classes.sort(key=lambda c: c['start_line'])
+    return imports, classes
+
+
+def _enclosing_class(classes: List[Dict], line: int) -> Optional[str]:
+    """包含 line 的最内层类（类按起始行排序，内层类在外层类之后）"""
+    enclosing = None
+    for cls in classes:
+        if cls['start_line'] > line:
+            break
+        if cls['start_line'] <= line <= cls['end_line'] and cls['start_line'] != line:
+            enclosing = cls['name']
+    return enclosing
+
+
+def _java_parameter_types(params: str) -> str:
+    """方法参数列表归一化为类型列表，例如 'final Map<K, V> m, int... xs' -> 'Map,int...'"""
+    while '<' in params:
+        stripped = _JAVA_GENERIC.sub('', params)
+        if stripped == params:
+            break
+        params = stripped
+    params = _JAVA_ANNOTATION.sub(' ', params)
+    types = []
+    for param in params.split(','):
+        tokens = [t for t in param.split() if t != 'final']
+        if len(tokens) >= 2:
+            types.append(''.join(tokens[:-1]))
+        elif tokens:
+            types.append(tokens[0])
+    return ','.join(types)
+
+
+class ProjectCallGraph:
+    """
+    全项目调用图（Python 和 Java）
+
+    节点为函数限定名；无法解析到项目内函数的调用以被调用的函数名作为外部节点保留，
+    与单文件调用图中的未定义函数一致。
+    """
+
+    def __init__(self, root_dir: str, filter_default_methods: bool = True, workers: int = 1,
+                 cache: Optional[ParseCache] = None):
+        """
+        初始化项目调用图
+
+        Args:
+            root_dir: 项目根目录（用于计算 Python 模块名）
+            filter_default_methods: 是否过滤默认方法（getter/setter 等）
+            workers: 解析文件的进程数（1 表示在当前进程中逐个解析）
+            cache: 可选的解析缓存，内容未变化的文件直接使用缓存的摘要
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.filter_default_methods = filter_default_methods
+        self.workers = workers
+        self.cache = cache
+        self.symbol_graph = SymbolGraph()
+        self.call_graph = self.symbol_graph.forward
+        self.reverse_call_graph = self.symbol_graph.reverse
+        self.functions: Dict[str, Dict] = {}  # {限定名: 函数信息}
+        self.file_functions: Dict[str, List[str]] = {}  # {文件: [限定名]}
+        self.summaries: Dict[str, Dict] = {}
+        self.signatures: Dict[str, Optional[tuple]] = {}  # {文件: 解析时的状态签名}，用于发现过期的文件
+        self.stats = {'files': 0, 'parsed_files': 0, 'cached_files': 0, 'functions': 0, 'edges': 0,
+                      'call_sites': 0, 'resolved_calls': 0, 'external_calls': 0, 'elapsed': 0.0}
+
+    @classmethod
+    def open_cache(cls, path: str = DEFAULT_CALL_GRAPH_CACHE_PATH) -> ParseCache:
+        """打开调用图摘要缓存（摘要格式版本变化时自动清空）"""
+        return ParseCache(path, version=f"calls-{SUMMARY_VERSION}")
+
+    def build(self, files: List[str]) -> 'ProjectCallGraph':
+        """
+        一次并行解析所有文件并链接跨文件调用
+
+        Args:
+            files: 项目文件列表（只处理 .py 和 .java 文件）
+        """
+        start = time.perf_counter()
+        self._parse(files)
+        self._link()
+        self.stats['elapsed'] = time.perf_counter() - start
+        return self
+
+    def link(self, summaries: Dict[str, Dict]) -> 'ProjectCallGraph':
+        """
+        用已有的单文件摘要（summarize_project_file 的结果，例如依赖索引缓存的摘要）构建调用图，不读取文件
+
+        Args:
+            summaries: {文件绝对路径: 摘要}
+        """
+        self.summaries = dict(summaries)
+        self._link()
+        return self
+
+    def is_stale(self, file_path: str) -> bool:
+        """文件尚未包含在图中，或其状态签名与解析时不同"""
+        file_path = os.path.abspath(file_path)
+        return file_path not in self.summaries or stat_signature(file_path) != self.signatures.get(file_path)
+
+    def refresh(self, files: List[str]) -> 'ProjectCallGraph':
+        """
+        重新解析指定的文件（新增、修改或已删除）并重新链接整张图
+
+        只有这些文件会被重新解析；其他文件沿用已有的摘要，只重新解析调用目标。
+        """
+        start = time.perf_counter()
+        existing = []
+        for file_path in files:
+            file_path = os.path.abspath(file_path)
+            if os.path.isfile(file_path):
+                existing.append(file_path)
+            else:
+                self.summaries.pop(file_path, None)
+                self.signatures.pop(file_path, None)
+        self._parse(existing)
+        self._link()
+        self.stats['elapsed'] += time.perf_counter() - start
+        return self
+
+    def update(self, files: List[str]) -> 'ProjectCallGraph':
+        """
+        与当前的文件列表同步：重新解析变化和新增的文件，移除不在列表中的文件
+
+        Returns:
+            self；没有任何变化时不重新链接
+        """
+        current = {os.path.abspath(f) for f in files if LANGUAGES.get(os.path.splitext(f)[1].lower())}
+        changed = [f for f in current if self.is_stale(f)]
+        changed.extend(f for f in self.summaries if f not in current)
+        return self.refresh(changed) if changed else self
+
+    def _parse(self, files: List[str]):
+        """解析文件（或取缓存的摘要），结果写入 summaries"""
+        items = []
+        for file_path in files:
+            language = LANGUAGES.get(os.path.splitext(file_path)[1].lower())
+            if language:
+                items.append((os.path.abspath(file_path), language, self.filter_default_methods))
+
+        cache_key = f"{{}}:{'filtered' if self.filter_default_methods else 'all'}"
+        summaries: List[Optional[Dict]] = [None] * len(items)
+        missing = []
+        for i, (path, language, _) in enumerate(items):
+            # 先取签名再解析：解析期间文件又被修改时，下次检查仍会发现签名不同
+            self.signatures[path] = stat_signature(path)
+            if self.cache is not None:
+                summaries[i] = self.cache.lookup(path, cache_key.format(language))
+            if summaries[i] is None:
+                missing.append(i)
+        self.stats['cached_files'] += len(items) - len(missing)
+
+        for i, summary in zip(missing, parse_in_pool(summarize_project_file, [items[i] for i in missing], self.workers)):
+            summaries[i] = summary
+            if self.cache is not None:
+                self.cache.store(items[i][0], cache_key.format(items[i][1]), summary)
+        self.stats['parsed_files'] += len(missing)
+        if self.cache is not None:
+            self.cache.flush()
+
+        for (path, _, _), summary in zip(items, summaries):
+            self.summaries[path] = summary
+
+    def _module_name(self, file_path: str, summary: Dict) -> str:
+        if summary['language'] == 'Java':
+            return summary.get('package') or ''
+        parts = os.path.relpath(file_path, self.root_dir)[:-len('.py')].split(os.sep)
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        return '.'.join(parts)
+
+    def _link(self):
+        """为函数分配限定名并建立索引，然后解析每个调用点（每次链接都建立新的调用图）"""
+        self.functions = {}
+        self.file_functions = {}
+        self.symbol_graph = SymbolGraph()
+        self.call_graph = self.symbol_graph.forward
+        self.reverse_call_graph = self.symbol_graph.reverse
+        for key in ('call_sites', 'resolved_calls', 'external_calls'):
+            self.stats[key] = 0
+        modules = {}  # {文件: 模块名或包名}
+        class_methods: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))  # {限定类名: {方法名: [限定名]}}
+        module_functions: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))  # {模块: {函数名: [限定名]}}
+        classes_by_name: Dict[str, Set[str]] = defaultdict(set)  # {简单类名: {限定类名}}
+        module_suffixes: Dict[str, Set[str]] = defaultdict(set)  # Python 模块名的各级后缀 -> 模块名
+        name_index: Dict[Tuple[str, str], List[str]] = defaultdict(list)  # {(语言, 函数名): [限定名]}
+
+        for file_path, summary in self.summaries.items():
+            module = modules[file_path] = self._module_name(file_path, summary)
+            language = summary['language']
+            if language == 'Python':
+                parts = module.split('.')
+                for i in range(len(parts)):
+                    module_suffixes['.'.join(parts[i:])].add(module)
+            for cls in summary['classes']:
+                qualified_class = f"{module}.{cls['name']}" if module else cls['name']
+                classes_by_name[cls['name'].split('.')[-1]].add(qualified_class)
+                class_methods[qualified_class]  # 没有方法的类也可以被解析
+
+            names = []
+            for func in summary['functions']:
+                owner = f"{module}.{func['class']}" if func['class'] and module else func['class'] or module
+                qualified = f"{owner}.{func['name']}" if owner else func['name']
+                if language == 'Java':
+                    qualified += f"({_java_parameter_types(func['params'])})"
+                if qualified in self.functions:
+                    qualified += f"#{func['start_line']}"
+                func = dict(func, qualified_name=qualified, module=module, file=file_path)
+                self.functions[qualified] = func
+                names.append(qualified)
+                name_index[(language, func['name'])].append(qualified)
+                if func['class']:
+                    class_methods[owner][func['name']].append(qualified)
+                else:
+                    module_functions[module][func['name']].append(qualified)
+            self.file_functions[file_path] = names
+
+        resolver = _Resolver(modules, class_methods, module_functions, classes_by_name, module_suffixes, name_index)
+        for file_path, summary in self.summaries.items():
+            for qualified, func in zip(self.file_functions[file_path], summary['functions']):
+                callees = []
+                for receiver, name, arity in func['calls']:
+                    targets = resolver.resolve(file_path, summary, func, receiver, name, arity)
+                    self.stats['call_sites'] += 1
+                    if targets:
+                        self.stats['resolved_calls'] += 1
+                        callees.extend(targets)
+                    else:
+                        self.stats['external_calls'] += 1
+                        callees.append(name)
+                self.symbol_graph.add_edges(qualified, callees)
+
+        self.stats['files'] = len(self.summaries)
+        self.stats['functions'] = len(self.functions)
+        self.stats['edges'] = self.symbol_graph.edge_count
+
+    def file_slice(self, file_path: str) -> Dict:
+        """
+        文件在项目调用图中的切片
+
+        Returns:
+            {functions, call_graph: {函数: [被调用者]}, reverse_call_graph: {函数: [调用者（可能在其他文件）]}}
+        """
+        names = self.file_functions.get(os.path.abspath(file_path), [])
+        return {
+            'functions': [self.functions[name] for name in names],
+            'call_graph': {name: self.call_graph[name] for name in names if name in self.call_graph},
+            'reverse_call_graph': {name: self.reverse_call_graph[name] for name in names if name in self.reverse_call_graph},
+        }
+
+    def analyzer_for(self, file_path: str) -> CallChainAnalyzer:
+        """
+        返回只包含该文件函数、但共享项目调用图的分析器
+
+        报告中的调用链、调用者和循环调用组都基于整个项目计算。
+        """
+        file_path = os.path.abspath(file_path)
+        language = LANGUAGES.get(os.path.splitext(file_path)[1].lower(), 'Java')
+        analyzer = CallChainAnalyzer(language=language, filter_default_methods=self.filter_default_methods)
+        analyzer.symbol_graph = self.symbol_graph
+        analyzer.call_graph = self.call_graph
+        analyzer.reverse_call_graph = self.reverse_call_graph
+        analyzer.functions = {name: self.functions[name] for name in self.file_functions.get(file_path, [])}
+        return analyzer
+
+    def __contains__(self, file_path: str) -> bool:
+        return os.path.abspath(file_path) in self.file_functions
+
+    def get_statistics(self) -> Dict:
+        """解析、缓存和调用解析的统计信息"""
+        return dict(self.stats)
+
+
+class _Resolver:
+    """把调用点 (接收者, 函数名) 解析为项目内函数的限定名"""
+
+    def __init__(self, modules, class_methods, module_functions, classes_by_name, module_suffixes, name_index):
+        self.modules = modules
+        self.class_methods = class_methods
+        self.module_functions = module_functions
+        self.classes_by_name = classes_by_name
+        self.module_suffixes = module_suffixes
+        self.name_index = name_index
+
+    def resolve(self, file_path: str, summary: Dict, func: Dict, receiver: Optional[str],
+                name: str, arity: int) -> List[str]:
+        module = self.modules[file_path]
+        language = summary['language']
+        owner_class = func.get('class')
+        own_class = (f"{module}.{owner_class}" if module else owner_class) if owner_class else None
+        variable_type = self._variable_type(summary, func, receiver) if receiver else None
+
+        if language == 'Java':
+            targets = self._overloads(self._resolve_java(summary, module, own_class, receiver, variable_type, name), arity)
+        else:
+            is_package = os.path.basename(file_path) == '__init__.py'
+            targets = self._resolve_python(summary, module, is_package, own_class, receiver, variable_type, name)
+        if targets:
+            return targets
+
+        # 接收者无法确定时，项目中唯一的同名函数即为目标
+        if receiver != 'super':
+            candidates = self.name_index.get((language, name), [])
+            if len(candidates) == 1:
+                return candidates
+        return []
+
+    @staticmethod
+    def _variable_type(summary: Dict, func: Dict, receiver: str) -> Optional[str]:
+        """接收者变量的声明类型：先查函数的参数和局部变量，再查所在类及外层类的字段，最后是模块级变量"""
+        type_name = func.get('variables', {}).get(receiver)
+        if type_name is not None:
+            return type_name
+        cls = func.get('class')
+        while cls:
+            type_name = summary['variables'].get(cls, {}).get(receiver)
+            if type_name is not None:
+                return type_name
+            cls = cls.rsplit('.', 1)[0] if '.' in cls else None
+        return summary['variables'].get('', {}).get(receiver)
+
+    @staticmethod
+    def _overloads(candidates: List[str], arity: int) -> List[str]:
+        """按参数个数筛选 Java 重载方法（可变参数方法匹配更多参数），没有匹配时保留全部候选"""
+        if len(candidates) < 2:
+            return candidates
+        matched = []
+        for qualified in candidates:
+            params = qualified[qualified.index('(') + 1:qualified.rindex(')')]
+            types = params.split(',') if params else []
+            if len(types) == arity or (types and types[-1].endswith('...') and arity >= len(types) - 1):
+                matched.append(qualified)
+        return matched or candidates
+
+    def _methods(self, qualified_class: Optional[str], name: str) -> List[str]:
+        if qualified_class is None or qualified_class not in self.class_methods:
+            return []
+        return self.class_methods[qualified_class].get(name, [])
+
+    # Java
+
+    def _resolve_java(self, summary, package, own_class, receiver, variable_type, name) -> List[str]:
+        if receiver is None or receiver == 'this':
+            # 当前类，然后是外层类
+            prefix = f"{package}." if package else ''
+            cls = own_class
+            while cls:
+                targets = self._methods(cls, name)
+                if targets:
+                    return targets
+                cls = cls.rsplit('.', 1)[0] if '.' in cls[len(prefix):] else None
+            if receiver is None:
+                for static, target in summary['imports']:
+                    if static and target.rsplit('.', 1)[-1] in (name, '*'):
+                        targets = self._methods(target.rsplit('.', 1)[0], name)
+                        if targets:
+                            return targets
+            return []
+        if not receiver:
+            return []
+
+        type_name = variable_type
+        if type_name is None and receiver[0].isupper():
+            type_name = receiver  # 静态调用 Type.method()
+        if type_name is None:
+            return []
+        return self._methods(self._java_class(summary, package, own_class, type_name), name)
+
+    def _java_class(self, summary, package, own_class, simple_name) -> Optional[str]:
+        candidates = self.classes_by_name.get(simple_name, set())
+        if not candidates:
+            return None
+        for _, target in summary['imports']:
+            if target.endswith('.' + simple_name) and target in candidates:
+                return target
+        # 当前类及外层类中的嵌套类，然后是同包类型，然后是通配符导入
+        outer = own_class
+        while outer:
+            nested = f"{outer}.{simple_name}"
+            if nested in candidates:
+                return nested
+            outer = outer.rsplit('.', 1)[0] if '.' in outer else None
+        same_package = f"{package}.{simple_name}" if package else simple_name
+        if same_package in candidates:
+            return same_package
+        for _, target in summary['imports']:
+            if target.endswith('.*') and f"{target[:-2]}.{simple_name}" in candidates:
+                return f"{target[:-2]}.{simple_name}"
+        return next(iter(candidates)) if len(candidates) == 1 else None
+
+    # Python
+
+    def _resolve_python(self, summary, module, is_package, own_class, receiver, variable_type, name) -> List[str]:
+        if receiver in ('self', 'cls'):
+            return self._methods(own_class, name)
+        if receiver is None:
+            targets = self.module_functions.get(module, {}).get(name, [])
+            if targets:
+                return targets
+            if name in summary['imports']:
+                kind, target = self._python_symbol(module, is_package, summary['imports'][name])
+                if kind == 'function':
+                    return target
+            return []
+        if not receiver:
+            return []
+
+        if receiver in summary['imports']:
+            kind, target = self._python_symbol(module, is_package, summary['imports'][receiver])
+            if kind == 'module':
+                return self.module_functions.get(target, {}).get(name, [])
+            if kind == 'class':
+                return self._methods(target, name)
+        type_name = variable_type or receiver
+        local_class = f"{module}.{type_name}" if module else type_name
+        if local_class in self.class_methods:
+            return self._methods(local_class, name)
+        if type_name in summary['imports']:
+            kind, target = self._python_symbol(module, is_package, summary['imports'][type_name])
+            if kind == 'class':
+                return self._methods(target, name)
+        return []
+
+    def _python_symbol(self, module: str, is_package: bool, imported: List) -> Tuple[Optional[str], object]:
+        """
+        解析导入的目标：('module', 模块名)、('class', 限定类名)、('function', [限定名]) 或 (None, None)
+
+        Args:
+            module: 导入所在的模块名
+            is_package: 导入所在的文件是否为包的 __init__.py（相对导入以包自身为起点）
+            imported: [相对导入层级, 目标]
+        """
+        level, target = imported
+        if level:
+            parts = module.split('.') if module else []
+            # 模块中的 "." 是所在的包；__init__.py 的模块名就是包本身
+            keep = len(parts) - level + (1 if is_package else 0)
+            if keep < 0:
+                return None, None
+            base = parts[:keep]
+            target = '.'.join(base + [target]) if target else '.'.join(base)
+
+        parts = target.split('.')
+        for end in range(len(parts), 0, -1):
+            prefix = '.'.join(parts[:end])
+            candidates = self.module_suffixes.get(prefix)
+            if not candidates:
+                continue
+            if prefix in candidates:
+                resolved = prefix
+            elif len(candidates) == 1:
+                resolved = next(iter(candidates))
+            else:
+                return None, None  # 多个模块有相同的后缀，无法确定目标，保留为未解析的调用
+            rest = parts[end:]
+            if not rest:
+                return 'module', resolved
+            qualified_class = f"{resolved}.{'.'.join(rest)}"
+            if qualified_class in self.class_methods:
+                return 'class', qualified_class
+            if len(rest) == 1 and rest[0] in self.module_functions.get(resolved, {}):
+                return 'function', self.module_functions[resolved][rest[0]]
+            return None, None
+        return None, None
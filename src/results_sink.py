@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Results Sink - 流式分析结果存储
+每个文件分析完成后立即以一行 JSON 追加到磁盘，内存中只保留轻量索引和累计统计，
+汇总报告在运行结束时从结果流生成，内存占用与分析文本的总量无关
+"""
+
+import os
+import json
+import threading
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+
+class ResultsSink:
+    """
+    追加写入的 JSONL 结果流
+
+    同一文件可以出现多次（例如失败后重试），以最后一条记录为准。
+    """
+
+    # 写入索引的轻量字段（不包含分析文本、调用链等大字段）
+    INDEX_FIELDS = ('file_path', 'language', 'status', 'error', 'report_file', 'analysis_type')
+
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        打开（或创建）结果流
+
+        Args:
+            path: JSONL 文件路径，已存在时读取其中的记录继续追加
+            fsync: 每条记录写入后是否 fsync（进程崩溃或断电时最多丢失正在写入的记录）
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict] = {}  # {file_path: 轻量字段 + 记录在文件中的偏移}
+        self.bytes_written = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """读取已有记录建立索引；截掉中断时写了一半的最后一行，避免与后续记录粘连"""
+        if not os.path.exists(self.path):
+            return
+
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    self._add_to_index(json.loads(line), offset)
+                except json.JSONDecodeError:
+                    pass
+                offset += len(line)
+                valid_end = offset
+
+        if valid_end != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+        self.bytes_written = valid_end
+
+    def _add_to_index(self, result: Dict, offset: int):
+        entry = {field: result.get(field) for field in self.INDEX_FIELDS}
+        entry['offset'] = offset
+        self._index[result['file_path']] = entry
+
+    def append(self, result: Dict):
+        """追加一个文件的分析结果"""
+        line = (json.dumps(result, ensure_ascii=False, default=list) + '\n').encode('utf-8')
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._add_to_index(result, offset)
+            self.bytes_written = offset + len(line)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._index
+
+    def entries(self) -> List[Dict]:
+        """每个文件最新记录的轻量字段（不读取分析文本）"""
+        return [{k: v for k, v in entry.items() if k != 'offset'} for entry in self._index.values()]
+
+    def completed_files(self) -> List[str]:
+        """已成功完成的文件（相对路径）"""
+        return [path for path, entry in self._index.items() if entry['status'] == 'success']
+
+    def get(self, file_path: str) -> Optional[Dict]:
+        """从磁盘读取某个文件的完整结果"""
+        entry = self._index.get(file_path)
+        if entry is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            return json.loads(f.readline())
+
+    def _iter_lines(self) -> Iterator[bytes]:
+        """按索引顺序逐行读取每个文件的最新记录"""
+        if not self._index:
+            return
+        with open(self.path, 'rb') as f:
+            for entry in list(self._index.values()):
+                f.seek(entry['offset'])
+                yield f.readline()
+
+    def __iter__(self) -> Iterator[Dict]:
+        """逐个产生每个文件的完整结果（一次只有一条记录在内存中）"""
+        for line in self._iter_lines():
+            yield json.loads(line)
+
+    def get_statistics(self) -> Dict:
+        """累计统计：文件数、各状态数量、各语言数量、结果流大小"""
+        with self._lock:
+            statuses = Counter(entry['status'] for entry in self._index.values())
+            languages = Counter(entry['language'] for entry in self._index.values())
+        return {
+            'files': len(self._index),
+            'success': statuses.get('success', 0),
+            'failed': sum(count for status, count in statuses.items() if status != 'success'),
+            'languages': dict(languages),
+            'bytes': self.bytes_written,
+        }
+
+    def write_json(self, output_file: str, header: Dict):
+        """
+        流式写出 JSON 汇总: header 中的字段加上 results 数组
+
+        结果逐条从结果流复制，不在内存中构造完整的数据结构。
+        """
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            for key, value in header.items():
+                f.write(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False, default=list)},\n")
+            f.write('  "results": [')
+            for i, line in enumerate(self._iter_lines()):
+                f.write(',\n    ' if i else '\n    ')
+                f.write(line.decode('utf-8').rstrip('\n'))
+            f.write('\n  ]\n}\n')
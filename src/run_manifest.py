@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Run Manifest - 扫描运行清单与逐文件检查点
+长时间的全量扫描被中断后，可以通过运行 ID 跳过已完成的文件继续分析
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from results_sink import ResultsSink
+
+
+# 未指定输出目录时，运行清单保存在这里
+DEFAULT_RUNS_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aicodeanalyzer", "runs")
+
+# 默认目录中的保留策略：最多保留最近的若干次运行，超过保留天数未更新的运行一律删除
+DEFAULT_KEEP_RUNS = 20
+DEFAULT_MAX_AGE_DAYS = 14
+
+
+class RunManifest:
+    """
+    扫描运行清单
+
+    每次运行对应 runs/<run_id>/ 目录：
+    - manifest.json: 运行信息（扫描器、根目录、配置、状态），通过临时文件 + 原子替换写入
+    - results.jsonl: 结果流（ResultsSink），每完成一个文件追加一行结果，进程崩溃最多丢失正在写入的那一行
+    """
+
+    def __init__(self, run_dir: str, info: Dict):
+        self.run_dir = run_dir
+        self.run_id = info['run_id']
+        self.info = info
+        self.manifest_file = os.path.join(run_dir, 'manifest.json')
+        self.results_file = os.path.join(run_dir, 'results.jsonl')
+        self.results = ResultsSink(self.results_file)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def runs_dir_for(output_dir: Optional[str]) -> str:
+        """运行清单目录：输出目录下的 runs/，没有输出目录时使用用户缓存目录"""
+        return os.path.join(output_dir, 'runs') if output_dir else DEFAULT_RUNS_DIR
+
+    @classmethod
+    def create(cls, runs_dir: str, scanner: str, root_dir: str, config: Dict = None) -> 'RunManifest':
+        """
+        创建新的运行清单
+
+        Args:
+            runs_dir: 运行清单根目录
+            scanner: 扫描器名称
+            root_dir: 扫描的根目录
+            config: 运行配置（模型、扩展名等），用于恢复时核对
+        """
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        run_dir = os.path.join(runs_dir, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+
+        manifest = cls(run_dir, {
+            'run_id': run_id,
+            'scanner': scanner,
+            'root_dir': root_dir,
+            'config': config or {},
+            'status': 'running',
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat(),
+            'total_files': None,
+            'stats': None,
+        })
+        manifest._write_info()
+        return manifest
+
+    @classmethod
+    def load(cls, runs_dir: str, run_id: str) -> 'RunManifest':
+        """
+        加载已有的运行清单
+
+        Raises:
+            ValueError: 运行 ID 不存在
+        """
+        run_dir = os.path.join(runs_dir, run_id)
+        manifest_file = os.path.join(run_dir, 'manifest.json')
+        if not os.path.isfile(manifest_file):
+            raise ValueError(f"找不到运行记录: {run_id}（目录: {runs_dir}）")
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        return cls(run_dir, info)
+
+    @classmethod
+    def open(cls, runs_dir: str, scanner: str, root_dir: str, config: Dict = None,
+             resume: Optional[str] = None) -> 'RunManifest':
+        """
+        恢复指定的运行（resume 不为空时）或创建新的运行
+
+        使用默认目录（没有输出目录）时，先按保留策略清理旧的运行，要恢复的运行不会被清理。
+        """
+        if os.path.abspath(runs_dir) == os.path.abspath(DEFAULT_RUNS_DIR):
+            cls.prune(runs_dir, exclude=resume)
+        if not resume:
+            return cls.create(runs_dir, scanner, root_dir, config)
+
+        manifest = cls.load(runs_dir, resume)
+        if manifest.info.get('scanner') != scanner:
+            raise ValueError(f"运行 {resume} 由 {manifest.info.get('scanner')} 创建，不能用 {scanner} 恢复")
+        if os.path.abspath(manifest.info.get('root_dir', '')) != os.path.abspath(root_dir):
+            print(f"⚠️  运行 {resume} 扫描的目录是 {manifest.info.get('root_dir')}，与当前目录不同")
+        if config and manifest.info.get('config') and manifest.info['config'] != config:
+            print(f"⚠️  运行 {resume} 的配置与当前参数不同，已完成的文件仍会被跳过")
+        manifest.update(status='running')
+        return manifest
+
+    @classmethod
+    def start(cls, runs_dir: str, scanner: str, root_dir: str, files: List[str], config: Dict = None,
+              resume: Optional[str] = None, stats: Optional[Dict] = None) -> Tuple['RunManifest', List[str], List[str]]:
+        """
+        打开运行清单（恢复或新建），并将本次扫描到的文件分为已完成和待分析两部分
+
+        Args:
+            files: 本次扫描到的文件
+            stats: 扫描器的统计字典，恢复时写入 resumed_files
+
+        Returns:
+            (运行清单, 已完成的文件列表, 待分析的文件列表)
+        """
+        manifest = cls.open(runs_dir, scanner, root_dir, config, resume=resume)
+        manifest.update(total_files=len(files))
+        print(f"🆔 运行 ID: {manifest.run_id}（中断后可使用 --resume {manifest.run_id} 继续）")
+
+        done, pending = manifest.split_pending(files, root_dir)
+        if done:
+            if stats is not None:
+                stats['resumed_files'] = len(done)
+            print(f"♻️  跳过上次已完成的文件: {len(done)} 个，剩余 {len(pending)} 个")
+        return manifest, done, pending
+
+    @staticmethod
+    def prune(runs_dir: str, keep: int = DEFAULT_KEEP_RUNS, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+              exclude: Optional[str] = None) -> List[str]:
+        """
+        清理旧的运行目录：只保留最近 keep 次运行，并删除超过 max_age_days 天未更新的运行
+
+        运行 ID 以创建时间开头，按名称排序即按时间排序；未完成的运行同样适用（长期未恢复的
+        中断运行和被强制终止、状态停留在 running 的运行都会过期）。
+
+        Args:
+            runs_dir: 运行清单根目录
+            keep: 最多保留的运行数
+            max_age_days: 运行目录最后更新后的保留天数
+            exclude: 不清理的运行 ID（例如将要恢复的运行）
+
+        Returns:
+            被删除的运行 ID 列表
+        """
+        if not os.path.isdir(runs_dir):
+            return []
+        run_ids = sorted((name for name in os.listdir(runs_dir)
+                          if name != exclude and os.path.isfile(os.path.join(runs_dir, name, 'manifest.json'))),
+                         reverse=True)
+        cutoff = time.time() - max_age_days * 86400
+        removed = []
+        for i, run_id in enumerate(run_ids):
+            manifest_file = os.path.join(runs_dir, run_id, 'manifest.json')
+            try:
+                expired = i >= keep or os.path.getmtime(manifest_file) < cutoff
+            except OSError:
+                continue
+            if expired:
+                shutil.rmtree(os.path.join(runs_dir, run_id), ignore_errors=True)
+                removed.append(run_id)
+        return removed
+
+    def _write_info(self):
+        """原子写入 manifest.json"""
+        self.info['updated_at'] = datetime.now().isoformat()
+        tmp_file = self.manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.info, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.manifest_file)
+
+    def update(self, **fields):
+        """更新运行信息（状态、文件总数、统计等）"""
+        with self._lock:
+            self.info.update(fields)
+            self._write_info()
+
+    def record(self, result: Dict):
+        """追加一个文件的分析结果（检查点）"""
+        self.results.append(result)
+
+    def record_all(self, results: Iterable[Dict], stats: Dict) -> ResultsSink:
+        """
+        逐个记录分析结果，结束时更新运行状态
+
+        中断（包括 KeyboardInterrupt）时标记为 interrupted 并重新抛出；全部完成后以结果流中
+        每个文件的最新记录（包含恢复前完成的文件）更新 stats 的成功和失败数，标记为 completed。
+
+        Args:
+            results: 逐个产生文件分析结果的可迭代对象（通常是生成器，结果记录后即释放）
+            stats: 扫描器的统计字典
+
+        Returns:
+            结果流（ResultsSink）
+        """
+        try:
+            for result in results:
+                self.record(result)
+        except BaseException:
+            self.update(status='interrupted', stats=stats)
+            print(f"\n💾 进度已保存，可使用 --resume {self.run_id} 继续")
+            raise
+
+        sink_stats = self.results.get_statistics()
+        stats['analyzed_files'] = sink_stats['success']
+        stats['failed_files'] = sink_stats['failed']
+        self.update(status='completed', stats=stats)
+        return self.results
+
+    def split_pending(self, files: List[str], root_dir: str) -> Tuple[List[str], List[str]]:
+        """
+        将扫描到的文件分为已完成和待分析两部分（失败的文件会重新分析）
+
+        Returns:
+            (已完成的文件列表, 待分析的文件列表)
+        """
+        completed = set(self.results.completed_files())
+        done, pending = [], []
+        for file_path in files:
+            if os.path.relpath(file_path, root_dir) in completed:
+                done.append(file_path)
+            else:
+                pending.append(file_path)
+        return done, pending
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Symbol Graph - 紧凑的整数索引有向图
+符号名（函数、类、文件）只保存一次并映射为整数 id，邻接关系以 CSR 形式保存在 array 中，
+同时维护正向（调用者 → 被调用者）和反向（被调用者 → 调用者）两份索引。
+新增的边先追加到缓冲区，首次查询时与已有索引一次性归并。
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 边编码为 (src << _ID_BITS) | dst 后排序去重
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+class _CSR:
+    """压缩稀疏行：节点 i 的邻居为 targets[offsets[i]:offsets[i + 1]]"""
+
+    __slots__ = ('offsets', 'targets', 'sources')
+
+    def __init__(self):
+        self.offsets = array('q', [0])
+        self.targets = array('i')
+        self.sources = 0  # 至少有一条边的节点数
+
+    def neighbors(self, node_id: int) -> array:
+        if node_id + 1 >= len(self.offsets):
+            return array('i')
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def degree(self, node_id: int) -> int:
+        if node_id + 1 >= len(self.offsets):
+            return 0
+        return self.offsets[node_id + 1] - self.offsets[node_id]
+
+    def keys(self) -> List[int]:
+        """按 (src, dst) 升序返回所有边的编码"""
+        offsets, targets = self.offsets, self.targets
+        return [(src << _ID_BITS) | dst
+                for src in range(len(offsets) - 1) if offsets[src + 1] > offsets[src]
+                for dst in targets[offsets[src]:offsets[src + 1]]]
+
+    @classmethod
+    def from_sorted_keys(cls, keys: List[int], node_count: int) -> '_CSR':
+        """由升序且去重的边编码构建，节点 i 的邻居区间起点为第一个 >= (i << _ID_BITS) 的位置"""
+        csr = cls()
+        csr.offsets = array('q', [bisect_left(keys, node_id << _ID_BITS) for node_id in range(node_count + 1)])
+        csr.targets = array('i', [key & _ID_MASK for key in keys])
+        offsets = csr.offsets
+        csr.sources = sum(1 for node_id in range(node_count) if offsets[node_id + 1] > offsets[node_id])
+        return csr
+
+
+class GraphView(Mapping):
+    """
+    SymbolGraph 某一方向的只读字典视图：{节点名: [相邻节点名]}
+
+    只包含至少有一条该方向边的节点，与原先 defaultdict(set) 的键集合一致；
+    邻居按节点首次出现的顺序排列。
+    """
+
+    def __init__(self, graph: 'SymbolGraph', reverse: bool = False):
+        self._graph = graph
+        self._reverse = reverse
+
+    def _csr(self) -> _CSR:
+        self._graph._compact()
+        return self._graph._reverse_csr if self._reverse else self._graph._forward_csr
+
+    def __getitem__(self, name: str) -> List[str]:
+        node_id = self._graph._ids.get(name)
+        if node_id is None:
+            raise KeyError(name)
+        neighbors = self._csr().neighbors(node_id)
+        if not neighbors:
+            raise KeyError(name)
+        names = self._graph._names
+        return [names[i] for i in neighbors]
+
+    def __contains__(self, name) -> bool:
+        node_id = self._graph._ids.get(name)
+        return node_id is not None and self._csr().degree(node_id) > 0
+
+    def __iter__(self) -> Iterator[str]:
+        csr = self._csr()
+        names = self._graph._names
+        offsets = csr.offsets
+        for node_id in range(len(offsets) - 1):
+            if offsets[node_id + 1] > offsets[node_id]:
+                yield names[node_id]
+
+    def __len__(self) -> int:
+        return self._csr().sources
+
+    def index(self) -> _CSR:
+        """该方向的 CSR 索引（按整数 id 遍历时使用，避免构造名称列表）"""
+        return self._csr()
+
+    def node_id(self, name: str) -> Optional[int]:
+        return self._graph._ids.get(name)
+
+    @property
+    def names(self) -> List[str]:
+        """整数 id 到符号名的映射"""
+        return self._graph._names
+
+    def degree(self, name: str) -> int:
+        """节点在该方向上的边数"""
+        node_id = self._graph._ids.get(name)
+        return 0 if node_id is None else self._csr().degree(node_id)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """转换为可 JSON 序列化的普通字典"""
+        return {name: self[name] for name in self}
+
+
+class SymbolGraph:
+    """
+    符号名驻留为整数 id 的有向图，正向和反向邻接均为 CSR 数组
+
+    重复添加的边只保留一条。add_edge 只追加到缓冲区（O(1)），
+    读取 forward / reverse 视图时才把缓冲区归并进索引。
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._forward_csr = _CSR()
+        self._reverse_csr = _CSR()
+        self._pending = array('q')
+        self._memo: Dict[str, Tuple[int, object]] = {}
+        self.version = 0  # 每次添加边时递增，派生结果（如强连通分量）据此判断是否需要重新计算
+        self.forward = GraphView(self)
+        self.reverse = GraphView(self, reverse=True)
+
+    def intern(self, name: str) -> int:
+        """返回符号名的整数 id，首次出现时分配"""
+        node_id = self._ids.get(name)
+        if node_id is None:
+            node_id = len(self._names)
+            self._ids[name] = node_id
+            self._names.append(name)
+        return node_id
+
+    def node_id(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def name(self, node_id: int) -> str:
+        return self._names[node_id]
+
+    def add_edge(self, src: str, dst: str):
+        """添加一条 src → dst 的边"""
+        self._pending.append((self.intern(src) << _ID_BITS) | self.intern(dst))
+        self.version += 1
+
+    def add_edges(self, src: str, dsts: Iterable[str]):
+        """添加 src 到多个节点的边"""
+        base = self.intern(src) << _ID_BITS
+        self._pending.extend(base | self.intern(dst) for dst in dsts)
+        self.version += 1
+
+    def _compact(self):
+        """把缓冲区中的边归并进正向索引，并据此重建反向索引"""
+        node_count = len(self._names)
+        if not self._pending and len(self._forward_csr.offsets) == node_count + 1:
+            return
+
+        keys = set(self._pending)
+        keys.update(self._forward_csr.keys())
+        forward_keys = sorted(keys)
+        del keys
+        self._pending = array('q')
+        self._forward_csr = _CSR.from_sorted_keys(forward_keys, node_count)
+        reverse_keys = sorted([((key & _ID_MASK) << _ID_BITS) | (key >> _ID_BITS) for key in forward_keys])
+        del forward_keys
+        self._reverse_csr = _CSR.from_sorted_keys(reverse_keys, node_count)
+
+    def memo(self, key: str, compute: Callable[[], object]):
+        """按图版本缓存派生结果：图未变化时多次查询（例如每个文件的报告）只计算一次"""
+        cached = self._memo.get(key)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, compute())
+            self._memo[key] = cached
+        return cached[1]
+
+    @property
+    def node_count(self) -> int:
+        return len(self._names)
+
+    @property
+    def edge_count(self) -> int:
+        self._compact()
+        return len(self._forward_csr.targets)
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        """按 (src, dst) 顺序产生所有边"""
+        self._compact()
+        names = self._names
+        for key in self._forward_csr.keys():
+            yield names[key >> _ID_BITS], names[key & _ID_MASK]
+
+    def memory_usage(self) -> int:
+        """邻接数组占用的字节数（不含符号名本身）"""
+        self._compact()
+        return sum(a.buffer_info()[1] * a.itemsize for csr in (self._forward_csr, self._reverse_csr)
+                   for a in (csr.offsets, csr.targets))
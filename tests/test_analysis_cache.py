@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+测试增量分析缓存（AnalysisCache）的 SQLite 存储与 JSON 迁移
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from incremental_analyzer import AnalysisCache
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_update_and_reload():
+    """测试更新在 flush 后持久化，且重新打开后可读取"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        _write(source, 'print(1)\n')
+
+        cache = AnalysisCache(os.path.join(tmp, 'cache'), batch_size=10)
+        assert cache.is_file_changed(source)
+        cache.update_file_cache(source, {'status': 'success', 'language': 'Python'})
+        assert not cache.is_file_changed(source)
+        cache.close()
+
+        reopened = AnalysisCache(os.path.join(tmp, 'cache'))
+        stats = reopened.get_statistics()
+        assert stats['total_cached_files'] == 1
+        assert stats['last_update'] is not None
+        assert not reopened.is_file_changed(source)
+
+        _write(source, 'print(2)\n')
+        assert reopened.is_file_changed(source)
+        reopened.close()
+
+
+def test_batched_commit():
+    """测试达到批次大小时自动提交事务"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        cache = AnalysisCache(cache_dir, batch_size=2)
+        for name in ('a.py', 'b.py'):
+            path = os.path.join(tmp, name)
+            _write(path, name)
+            cache.update_file_cache(path, {'status': 'success', 'language': 'Python'})
+
+        # 未关闭原连接，另一连接也能看到已提交的两条记录
+        other = AnalysisCache(cache_dir)
+        assert other.get_statistics()['total_cached_files'] == 2
+        other.close()
+        cache.close()
+
+
+def test_stat_fast_path_skips_hashing():
+    """测试状态签名未变化时不读取文件内容；只改 mtime 时刷新签名"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        _write(source, 'x = 1\n')
+        cache = AnalysisCache(os.path.join(tmp, 'cache'))
+        cache.update_file_cache(source, {'status': 'success', 'language': 'Python'})
+
+        hashed = []
+        original = cache._calculate_file_hash
+        cache._calculate_file_hash = lambda path, *args: hashed.append(path) or original(path, *args)
+
+        assert not cache.is_file_changed(source)
+        assert hashed == []
+
+        # 内容不变、mtime 变化：需要哈希一次，随后签名被刷新
+        st = os.stat(source)
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        assert not cache.is_file_changed(source)
+        assert len(hashed) == 1
+        assert not cache.is_file_changed(source)
+        assert len(hashed) == 1
+
+        _write(source, 'x = 2\n')
+        assert cache.is_file_changed(source)
+        cache.close()
+
+
+def test_legacy_md5_hash_still_matches():
+    """测试迁移来的 MD5 记录在内容未变时不会被视为已修改"""
+    import hashlib
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        _write(source, 'x = 1\n')
+        cache_dir = Path(tmp) / 'cache'
+        cache_dir.mkdir()
+        legacy = {'files': {os.path.abspath(source): {
+            'hash': hashlib.md5(b'x = 1\n').hexdigest(), 'status': 'success', 'language': 'Python'}}}
+        _write(cache_dir / 'analysis_cache.json', json.dumps(legacy))
+
+        cache = AnalysisCache(str(cache_dir))
+        assert cache.is_cached(source)
+        assert not cache.is_file_changed(source)
+        cache.close()
+
+
+def test_full_result_round_trip():
+    """测试完整分析结果被压缩保存，并可在下次运行时读取"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        _write(source, 'def f():\n    return 1\n')
+        result = {
+            'file_path': 'a.py', 'language': 'Python', 'status': 'success',
+            'analysis': '## 分析\n' + '内容 ' * 500,
+            'call_chain': {'functions': [{'name': 'f'}], 'call_graph': {'f': set()}},
+            'ast_analysis': {'functions': [{'name': 'f', 'line': 1}]}
+        }
+        cache = AnalysisCache(os.path.join(tmp, 'cache'))
+        cache.update_file_cache(source, result)
+        cache.close()
+
+        reopened = AnalysisCache(os.path.join(tmp, 'cache'))
+        cached = reopened.get_cached_result(source)
+        assert cached['analysis'] == result['analysis']
+        assert cached['call_chain']['call_graph'] == {'f': []}
+        assert cached['ast_analysis'] == result['ast_analysis']
+        stats = reopened.get_statistics()
+        assert stats['stored_results'] == 1
+        assert stats['stored_results_bytes'] < len(result['analysis'].encode('utf-8'))
+
+        # 内容变化后旧结果不再被引用，可被清理
+        _write(source, 'def f():\n    return 2\n')
+        reopened.update_file_cache(source, dict(result, analysis='new'))
+        assert reopened.get_cached_result(source)['analysis'] == 'new'
+        assert reopened.prune_results() == 1
+        reopened.close()
+
+
+def test_prune_results_ignores_files_without_hash():
+    """测试存在没有哈希的文件记录时，不再被引用的结果仍会被清理"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        other = os.path.join(tmp, 'b.py')
+        _write(source, 'a = 1\n')
+        _write(other, 'b = 1\n')
+        cache = AnalysisCache(os.path.join(tmp, 'cache'))
+        cache.update_file_cache(source, {'status': 'success', 'analysis': 'old'})
+        cache.update_file_cache(other, {'status': 'success', 'analysis': 'b'})
+        _write(source, 'a = 2\n')
+        cache.update_file_cache(source, {'status': 'success', 'analysis': 'new'})
+        cache.close()
+
+        with sqlite3.connect(str(cache.cache_file)) as conn:
+            conn.execute("UPDATE files SET hash = NULL WHERE path = ?", (os.path.abspath(other),))
+        conn.close()
+
+        reopened = AnalysisCache(os.path.join(tmp, 'cache'))
+        assert reopened.prune_results() == 2
+        assert reopened.get_cached_result(source)['analysis'] == 'new'
+        reopened.close()
+
+
+def test_migrate_legacy_json():
+    """测试从旧版 analysis_cache.json 迁移"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / 'cache'
+        cache_dir.mkdir()
+        legacy = {
+            'version': '1.0',
+            'last_update': '2024-01-01T00:00:00',
+            'files': {
+                '/project/a.py': {'hash': 'abc', 'last_analyzed': '2024-01-01T00:00:00',
+                                  'status': 'success', 'language': 'Python'}
+            }
+        }
+        _write(cache_dir / 'analysis_cache.json', json.dumps(legacy))
+
+        cache = AnalysisCache(str(cache_dir))
+        assert cache.get_cached_files() == ['/project/a.py']
+        assert cache.get_statistics()['last_update'] == '2024-01-01T00:00:00'
+        assert not (cache_dir / 'analysis_cache.json').exists()
+        assert (cache_dir / 'analysis_cache.json.migrated').exists()
+        cache.close()
+
+        reopened = AnalysisCache(str(cache_dir))
+        assert reopened.cache_data['files']['/project/a.py']['hash'] == 'abc'
+        reopened.close()
+
+
+def test_remove_and_clear():
+    """测试删除单个文件缓存与清空缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        _write(source, 'x = 1\n')
+        cache = AnalysisCache(os.path.join(tmp, 'cache'))
+        cache.update_file_cache(source, {'status': 'success', 'language': 'Python'})
+        cache.remove_file_cache(source)
+        assert cache.get_statistics()['total_cached_files'] == 0
+
+        cache.update_file_cache(source, {'status': 'success', 'language': 'Python'})
+        cache.clear_cache()
+        cache.close()
+
+        reopened = AnalysisCache(os.path.join(tmp, 'cache'))
+        assert reopened.get_statistics()['total_cached_files'] == 0
+        reopened.close()
+
+
+if __name__ == "__main__":
+    try:
+        test_update_and_reload()
+        test_batched_commit()
+        test_stat_fast_path_skips_hashing()
+        test_legacy_md5_hash_still_matches()
+        test_full_result_round_trip()
+        test_prune_results_ignores_files_without_hash()
+        test_migrate_legacy_json()
+        test_remove_and_clear()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+测试异步 Ollama 客户端（AsyncOllamaClient）的并发上限、背压和大文件分片分析
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm.async_ollama_client import AsyncOllamaClient
+from directory_scanner import DirectoryScanner
+from incremental_analyzer import IncrementalAnalyzer
+
+
+class FakeClient:
+    """代替 OllamaClient 的假传输层：记录同时在途的请求数"""
+
+    def __init__(self, delay=0.02):
+        self.model = 'fake'
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate_response(self, prompt):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.prompts.append(prompt)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return f"analysis of {prompt}"
+
+
+def test_concurrency_is_bounded_and_order_kept():
+    """测试同时在途的请求不超过 max_in_flight，结果按输入顺序返回"""
+    fake = FakeClient()
+    with AsyncOllamaClient(client=fake, max_in_flight=3) as client:
+        results = client.run_many([f"p{i}" for i in range(10)])
+
+    assert results == [f"analysis of p{i}" for i in range(10)]
+    assert fake.max_in_flight == 3
+    assert client.model == 'fake'
+
+
+def test_lazy_prompts_apply_backpressure():
+    """测试惰性产生的提示词：第一个结果返回前，最多只取出 max_in_flight + 1 个提示词"""
+    fake = FakeClient()
+    produced = []
+
+    def prompts():
+        for i in range(8):
+            produced.append(i)
+            yield f"p{i}"
+
+    async def first_result(client):
+        async for index, response in client.iter_results(prompts()):
+            return len(produced)
+
+    with AsyncOllamaClient(client=fake, max_in_flight=2) as client:
+        assert asyncio.run(first_result(client)) <= 3
+
+
+def test_failed_prompt_cancels_pending_tasks():
+    """测试某个请求失败时，其余仍在等待的请求被取消，不会继续发送"""
+    class FailingClient(FakeClient):
+        def generate_response(self, prompt):
+            if prompt == 'p0':
+                raise RuntimeError('boom')
+            return super().generate_response(prompt)
+
+    fake = FailingClient(delay=0.05)
+
+    async def consume(client):
+        try:
+            async for _ in client.iter_results([f"p{i}" for i in range(6)]):
+                pass
+        except RuntimeError:
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            await asyncio.sleep(0)
+            return all(t.cancelled() or t.done() for t in pending)
+        return False
+
+    with AsyncOllamaClient(client=fake, max_in_flight=3) as client:
+        assert asyncio.run(consume(client))
+    # 只有失败前已发出的请求到达服务端
+    assert len(fake.prompts) <= 2
+
+
+def test_incremental_analysis_runs_files_concurrently():
+    """测试增量分析经由扫描器的并行流水线分析文件，结果与文件一一对应地写入缓存"""
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as out:
+        for i in range(6):
+            with open(os.path.join(tmp, f"m{i}.py"), 'w', encoding='utf-8') as f:
+                f.write(f"value = {i}\n")
+        analyzer = IncrementalAnalyzer(tmp, output_dir=out, use_git=False, workers=3)
+        fake = FakeClient(delay=0.05)
+        analyzer.scanner.ollama_client = fake
+
+        results = analyzer.analyze_incremental()
+
+        assert len(results) == 6 and all(r['status'] == 'success' for r in results)
+        assert fake.max_in_flight == 3
+        for result in results:
+            cached = analyzer.cache.get_cached_result(os.path.join(analyzer.root_dir, result['file_path']))
+            assert cached['analysis'] == result['analysis']
+            assert f"文件路径: {result['file_path']}" in result['analysis']
+
+
+def test_parallel_file_pipeline_is_bounded():
+    """测试并行分析时队首的慢文件不会让所有文件都被提交：最多 2 × workers 个文件同时在途"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(20):
+            files.append(os.path.join(tmp, f"m{i:02d}.py"))
+            with open(files[-1], 'w', encoding='utf-8') as f:
+                f.write(f"value = {i}\n")
+        scanner = DirectoryScanner(root_dir=tmp, workers=2)
+        fake = FakeClient(delay=0.01)
+        slow = fake.generate_response
+        fake.generate_response = lambda prompt: (time.sleep(0.3) if 'm00.py' in prompt else None) or slow(prompt)
+        scanner.ollama_client = fake
+
+        results = scanner.iter_analyze(files)
+        first = next(results)
+        started_before_first = len(fake.prompts)
+        rest = list(results)
+
+    assert started_before_first <= 4
+    assert [r['file_path'] for r in [first] + rest] == [os.path.basename(f) for f in files]
+
+
+def test_chunked_file_is_analyzed_through_async_client():
+    """测试目录扫描器的大文件分片分析经由异步客户端并发发送，合并结果保持片段顺序"""
+    source = ''.join(f"def func{i}():\n    value = {i}\n    return value * {i}\n\n\n" for i in range(12))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'big.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        scanner = DirectoryScanner(root_dir=tmp, max_prompt_tokens=60, chunk_workers=2)
+        fake = FakeClient()
+        scanner.ollama_client = fake
+
+        result = scanner.analyze_file(path)
+
+    assert result['status'] == 'success'
+    assert len(fake.prompts) > 2
+    assert fake.max_in_flight == 2
+    sections = [line for line in result['analysis'].splitlines() if line.startswith('## 片段')]
+    assert [int(line.split()[2].rstrip(':')) for line in sections] == list(range(1, len(fake.prompts) + 1))
+
+
+def test_chunk_prompts_carry_call_graph_slice_and_ast_context():
+    """测试各片段的提示词包含所在的类、导入，以及片段内函数的调用者和被调用者（不包含其他片段的函数）"""
+    source = "import os\n\n\nclass Worker:\n" + ''.join(
+        f"    def step{i}(self):\n        value = {i}\n        return self.step{i + 1}() * value\n\n" for i in range(8)
+    ) + "    def step8(self):\n        return os.getpid()\n"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'big.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        scanner = DirectoryScanner(root_dir=tmp, max_prompt_tokens=60, chunk_workers=2,
+                                   enable_call_chain=True, enable_ast=True)
+        fake = FakeClient()
+        scanner.ollama_client = fake
+
+        assert scanner.analyze_file(path)['status'] == 'success'
+
+    first = next(p for p in fake.prompts if '`step0`' in p)
+    assert '- 类 `Worker` (第 4 行)' in first
+    assert '`os`' in first
+    assert '  - 调用: `big.Worker.step1`' in first
+    assert '  - 被调用于: `big.Worker.step0`' in first  # step1 的调用者
+    assert '`def step5(self)`' not in first
+    last = next(p for p in fake.prompts if '`step8`' in p)
+    assert '- `def step8(self)`' in last and '`def step0(self)`' not in last
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试按函数边界切分代码（CodeChunker）
+"""
+
+import sys
+import os
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from code_chunker import CodeChunker, estimate_tokens, detect_language
+
+
+PYTHON_CODE = '''import os
+
+
+def first(a):
+    total = 0
+    for i in range(a):
+        total += i
+    return total
+
+
+def second(b):
+    return first(b) * 2
+
+
+class Worker:
+    def run(self):
+        return second(3)
+'''
+
+JAVA_CODE = '''public class Service {
+    private int count;
+
+    public int add(int a, int b) {
+        count++;
+        return a + b;
+    }
+
+    public int twice(int a) {
+        return add(a, a);
+    }
+}
+'''
+
+
+def test_small_file_is_one_chunk():
+    """测试未超出预算的文件只有一个片段"""
+    chunker = CodeChunker(max_tokens=10000)
+    assert not chunker.needs_chunking(PYTHON_CODE)
+    chunks = chunker.chunk(PYTHON_CODE, 'Python')
+    assert len(chunks) == 1
+    assert chunks[0]['content'] == PYTHON_CODE.rstrip('\n') + '\n'
+    assert chunks[0]['functions'] == ['first', 'second', 'run']
+
+
+def test_chunks_align_with_functions():
+    """测试片段边界与函数边界对齐，且拼接后覆盖整个文件"""
+    chunker = CodeChunker(max_tokens=40)
+    chunks = chunker.chunk(PYTHON_CODE, 'Python')
+    print(f"Python 片段: {[(c['start_line'], c['end_line'], c['functions']) for c in chunks]}")
+
+    assert len(chunks) > 1
+    assert '\n'.join(c['content'] for c in chunks) == PYTHON_CODE
+    for chunk in chunks:
+        for name in chunk['functions']:
+            assert f"def {name}" in chunk['content']
+    assert [c['index'] for c in chunks] == list(range(1, len(chunks) + 1))
+
+
+def test_java_chunks():
+    """测试 Java 方法不会被拆到两个片段中"""
+    chunker = CodeChunker(max_tokens=30)
+    chunks = chunker.chunk(JAVA_CODE, 'Java')
+    print(f"Java 片段: {[(c['start_line'], c['end_line'], c['functions']) for c in chunks]}")
+
+    owners = {name: c['index'] for c in chunks for name in c['functions']}
+    assert set(owners) == {'add', 'twice'}
+    add_chunk = chunks[owners['add'] - 1]['content']
+    assert 'count++' in add_chunk and 'return a + b' in add_chunk
+
+
+def test_oversized_function_is_split_by_lines():
+    """测试超出预算的单个函数按行切分"""
+    body = '\n'.join(f"    x{i} = {i}" for i in range(200))
+    code = f"def huge():\n{body}\n"
+    chunker = CodeChunker(max_tokens=100)
+    chunks = chunker.chunk(code, 'Python')
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c['content']) <= 101 for c in chunks)
+    assert '\n'.join(c['content'] for c in chunks) == code
+
+
+def test_detect_language():
+    """测试根据代码内容判断语言"""
+    assert detect_language(PYTHON_CODE) == 'Python'
+    assert detect_language(JAVA_CODE) == 'Java'
+    assert detect_language('SELECT 1;') is None
+
+
+if __name__ == "__main__":
+    try:
+        test_small_file_is_one_chunk()
+        test_chunks_align_with_functions()
+        test_java_chunks()
+        test_oversized_function_is_split_by_lines()
+        test_detect_language()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+测试文件级反向依赖索引（DependencyIndex）
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dependency_index import DependencyIndex
+from incremental_analyzer import AnalysisCache
+
+
+def _write(root, rel_path, text):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def _python_project(root):
+    return {
+        'base': _write(root, 'pkg/base.py', 'class Base:\n    pass\n'),
+        'service': _write(root, 'pkg/service.py', 'from pkg.base import Base\n\nclass Service(Base):\n    pass\n'),
+        'api': _write(root, 'api.py', 'import pkg.service\n'),
+        'cli': _write(root, 'cli.py', 'from api import *\n'),
+        'other': _write(root, 'other.py', 'import os\n'),
+    }
+
+
+def test_python_dependents_by_depth():
+    """测试按层数查找 Python 文件的依赖者"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _python_project(tmp)
+        index = DependencyIndex(tmp)
+        index.build(list(files.values()))
+
+        assert index.get_dependents([files['base']], max_depth=1) == {files['service']: 1}
+        assert index.get_dependents([files['base']], max_depth=3) == {
+            files['service']: 1, files['api']: 2, files['cli']: 3}
+        assert index.get_dependents([files['other']], max_depth=3) == {}
+
+
+def test_rank_by_blast_radius():
+    """测试按影响范围排序"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _python_project(tmp)
+        index = DependencyIndex(tmp)
+        index.build(list(files.values()))
+
+        ranked = index.rank_by_blast_radius([files['cli'], files['api'], files['base']])
+        assert ranked == [(files['base'], 3), (files['api'], 1), (files['cli'], 0)]
+
+
+def test_java_imports_and_inheritance():
+    """测试 Java 导入、通配符导入和同包继承"""
+    with tempfile.TemporaryDirectory() as tmp:
+        model = _write(tmp, 'com/shop/model/User.java',
+                       'package com.shop.model;\npublic class User {}\n')
+        repo = _write(tmp, 'com/shop/repo/UserRepo.java',
+                      'package com.shop.repo;\nimport com.shop.model.User;\npublic class UserRepo {}\n')
+        cached = _write(tmp, 'com/shop/repo/CachedUserRepo.java',
+                        'package com.shop.repo;\npublic class CachedUserRepo extends UserRepo {}\n')
+        web = _write(tmp, 'com/shop/web/Api.java',
+                     'package com.shop.web;\nimport com.shop.repo.*;\npublic class Api {}\n')
+
+        index = DependencyIndex(tmp)
+        index.build([model, repo, cached, web])
+
+        assert index.get_dependents([model], max_depth=1) == {repo: 1}
+        assert index.get_dependents([repo], max_depth=1) == {cached: 1, web: 1}
+
+
+def test_symbols_reused_from_cache():
+    """测试未变化文件的符号摘要从缓存复用"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _python_project(os.path.join(tmp, 'project'))
+        cache = AnalysisCache(os.path.join(tmp, 'cache'))
+
+        first = DependencyIndex(os.path.join(tmp, 'project'), cache=cache)
+        first.build(list(files.values()))
+        assert first.get_statistics()['parsed_files'] == len(files)
+
+        second = DependencyIndex(os.path.join(tmp, 'project'), cache=cache)
+        second.build(list(files.values()))
+        assert second.get_statistics()['parsed_files'] == 0
+        assert second.get_statistics()['reused_files'] == len(files)
+        assert second.reverse_dependencies == first.reverse_dependencies
+        cache.close()
+
+
+
+def test_same_package_calls_without_import():
+    """测试同包的 Java 类不需要导入，通过调用依赖被调用方法所在的文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = _write(tmp, 'com/shop/Repo.java', """package com.shop;
+public class Repo {
+    public void save(Object o) { }
+}
+""")
+        service = _write(tmp, 'com/shop/Service.java', """package com.shop;
+public class Service {
+    private Repo repo;
+    public void place(Object o) {
+        repo.save(o);
+    }
+}
+""")
+        unrelated = _write(tmp, 'com/shop/Clock.java', """package com.shop;
+public class Clock {
+    public void tick() { }
+}
+""")
+
+        index = DependencyIndex(tmp)
+        index.build([repo, service, unrelated])
+        assert index.get_dependents([repo], max_depth=1) == {service: 1}
+        assert index.get_dependents([unrelated], max_depth=1) == {}
+        assert index.get_statistics()['call_edges'] == 1
+
+
+def test_blast_radius_matches_breadth_first_search():
+    """测试一次性计算的影响范围与逐个文件的广度优先搜索一致（含循环依赖和菱形依赖）"""
+    import random
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DependencyIndex(tmp)
+        files = [os.path.join(tmp, f'f{i}.py') for i in range(60)]
+        for _ in range(120):
+            source, target = rng.choice(files), rng.choice(files)
+            if source != target:
+                index.dependencies[source].add(target)
+                index.reverse_dependencies[target].add(source)
+        index.symbols = {f: {} for f in files}
+
+        expected = {f: len(index.get_dependents([f], max_depth=len(files))) for f in files}
+        assert {f: index.blast_radius(f) for f in files} == expected
+        ranked = index.rank_by_blast_radius(files)
+        assert [radius for _, radius in ranked] == sorted(expected.values(), reverse=True)
+
+
+if __name__ == "__main__":
+    try:
+        test_python_dependents_by_depth()
+        test_rank_by_blast_radius()
+        test_java_imports_and_inheritance()
+        test_symbols_reused_from_cache()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+测试共享文件发现引擎（FileDiscovery）
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from file_discovery import FileDiscovery, GitignoreRules
+
+
+def _write(root, rel_path, text=''):
+    path = os.path.join(root, *rel_path.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _make_project(root):
+    for rel_path in ('main.py', 'README.md', 'lib/util.py', 'lib/gen/auto.py', 'lib/keep.log',
+                     'build/out.py', 'node_modules/dep.py', 'logs/a.py', 'docs/x.py'):
+        _write(root, rel_path, '# code\n')
+    _write(root, '.gitignore', '# 注释\n*.log\n/logs/\ndocs\n')
+    _write(root, 'lib/.gitignore', 'gen/\n!keep.log\n')
+
+
+def _relative(root, found):
+    return [os.path.relpath(f.path, root).replace(os.sep, '/') for f in found]
+
+
+def test_gitignore_rules():
+    """测试 gitignore 规则的锚定、目录限定、取反和 ** 通配"""
+    rules = GitignoreRules(['*.pyc', '/dist', 'cache/', '!important.pyc', 'a/**/z', 'foo/*.txt', ''])
+    assert rules.match('x/y.pyc', False) is True
+    assert rules.match('important.pyc', False) is False
+    assert rules.match('dist', True) is True
+    assert rules.match('src/dist', True) is None
+    assert rules.match('src/cache', True) is True
+    assert rules.match('src/cache', False) is None
+    assert rules.match('a/z', False) is True and rules.match('a/b/c/z', False) is True
+    assert rules.match('foo/bar.txt', False) is True
+    assert rules.match('foo/sub/bar.txt', False) is None
+
+
+def test_scandir_honors_gitignore_and_filters():
+    """测试 scandir 遍历：顺序确定，遵循各层 .gitignore 和目录/扩展名过滤，签名来自遍历时的 stat"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_project(tmp)
+        discovery = FileDiscovery(tmp, extensions=['.py', '.log'], ignore_dirs={'build', 'node_modules'})
+
+        found = list(discovery.iter_files())
+        assert discovery.method == 'scandir'
+        assert _relative(tmp, found) == ['main.py', 'lib/keep.log', 'lib/util.py']
+        st = os.stat(found[0].path)
+        assert found[0].signature == (st.st_size, st.st_mtime_ns, st.st_ino)
+
+        assert discovery.is_ignored(os.path.join(tmp, 'lib', 'gen', 'auto.py'))
+        assert discovery.is_ignored(os.path.join(tmp, 'build', 'out.py'))
+        assert not discovery.is_ignored(os.path.join(tmp, 'lib', 'keep.log'))
+
+        all_files = FileDiscovery(tmp, extensions=['.py'], use_gitignore=False)
+        assert len(list(all_files)) == 7
+
+
+def test_git_ls_files_fast_path():
+    """测试 Git 仓库中使用 git ls-files 列出文件，结果与 scandir 遍历一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_project(tmp)
+        try:
+            subprocess.run(['git', 'init', '-q'], cwd=tmp, check=True)
+            subprocess.run(['git', 'add', 'main.py'], cwd=tmp, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return  # 环境中没有 git
+
+        discovery = FileDiscovery(tmp, extensions=['.py', '.log'], ignore_dirs={'build', 'node_modules'})
+        found = _relative(tmp, discovery)
+        assert discovery.method == 'git'
+        assert found == ['main.py', 'lib/keep.log', 'lib/util.py']
+
+        scandir = FileDiscovery(tmp, extensions=['.py', '.log'], ignore_dirs={'build', 'node_modules'}, use_git=False)
+        assert _relative(tmp, scandir) == found
+
+
+def test_parallel_walk_keeps_order():
+    """测试多线程遍历的输出顺序与单线程一致，提前停止迭代时工作线程随之结束"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_project(tmp)
+        for i in range(20):
+            for j in range(5):
+                _write(tmp, f'pkg{i:02d}/sub{j}/m{j}.py', '# code\n')
+
+        serial = _relative(tmp, FileDiscovery(tmp, extensions=['.py'], use_git=False))
+        discovery = FileDiscovery(tmp, extensions=['.py'], use_git=False, workers=4)
+        assert _relative(tmp, discovery) == serial
+        stats = discovery.get_statistics()
+        assert stats['files'] == len(serial) and stats['workers'] == 4
+        assert stats['directories'] > 100 and stats['files_per_sec'] > 0
+
+        threads_before = threading.active_count()
+        it = discovery.iter_files()
+        assert [os.path.relpath(next(it).path, tmp).replace(os.sep, '/') for _ in range(3)] == serial[:3]
+        it.close()
+        assert threading.active_count() == threads_before
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+测试文件监听器（FileWatcher）的轮询后端、防抖和事件合并
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from file_watcher import FileWatcher
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_polling_coalesces_bursts():
+    """测试连续多次保存被合并为一批，并区分变更和删除"""
+    with tempfile.TemporaryDirectory() as tmp:
+        keep = os.path.join(tmp, 'keep.py')
+        gone = os.path.join(tmp, 'gone.py')
+        _write(keep, 'a = 0\n')
+        _write(gone, 'b = 0\n')
+        os.makedirs(os.path.join(tmp, 'node_modules'))
+
+        watcher = FileWatcher(tmp, ignore_dirs={'node_modules'}, debounce=0.3, poll_interval=0.05,
+                              backend='polling')
+        watcher.start()
+        try:
+            for i in range(5):
+                _write(keep, f'a = {i + 1}\n')
+                time.sleep(0.06)
+            _write(os.path.join(tmp, 'new.py'), 'c = 1\n')
+            _write(os.path.join(tmp, 'node_modules', 'lib.py'), 'ignored = 1\n')
+            os.remove(gone)
+
+            batch = watcher.next_batch(timeout=3)
+            assert batch is not None
+            changed, deleted = batch
+            print(f"变更: {sorted(map(os.path.basename, changed))}, 删除: {sorted(map(os.path.basename, deleted))}")
+            assert changed == {keep, os.path.join(tmp, 'new.py')}
+            assert deleted == {gone}
+            assert watcher.next_batch(timeout=0.3) is None
+        finally:
+            watcher.stop()
+
+
+def test_path_filter():
+    """测试文件过滤函数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        watcher = FileWatcher(tmp, path_filter=lambda p: p.endswith('.py'), debounce=0.1,
+                              poll_interval=0.05, backend='polling')
+        watcher.start()
+        try:
+            _write(os.path.join(tmp, 'notes.txt'), 'x')
+            _write(os.path.join(tmp, 'code.py'), 'x = 1\n')
+            changed, deleted = watcher.next_batch(timeout=3)
+            assert changed == {os.path.join(tmp, 'code.py')}
+            assert not deleted
+        finally:
+            watcher.stop()
+
+
+def test_polling_respects_gitignore():
+    """测试轮询后端与扫描器一样遵循 .gitignore，被忽略的构建输出不会产生事件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write(os.path.join(tmp, '.gitignore'), 'build/\n*.gen.py\n')
+        os.makedirs(os.path.join(tmp, 'build'))
+        watcher = FileWatcher(tmp, path_filter=lambda p: p.endswith('.py'), debounce=0.1,
+                              poll_interval=0.05, backend='polling')
+        watcher.start()
+        try:
+            _write(os.path.join(tmp, 'build', 'out.py'), 'x = 1\n')
+            _write(os.path.join(tmp, 'schema.gen.py'), 'x = 1\n')
+            _write(os.path.join(tmp, 'code.py'), 'x = 1\n')
+            changed, deleted = watcher.next_batch(timeout=3)
+            assert changed == {os.path.join(tmp, 'code.py')}
+            assert not deleted
+            assert watcher._is_ignored(os.path.join(tmp, 'build', 'out.py'))
+        finally:
+            watcher.stop()
+
+
+if __name__ == "__main__":
+    try:
+        test_polling_coalesces_bursts()
+        test_path_filter()
+        test_polling_respects_gitignore()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
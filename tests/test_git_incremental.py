@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+测试基于上次分析提交的 Git 增量检测
+"""
+
+import sys
+import os
+import io
+import tempfile
+import subprocess
+import contextlib
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from incremental_analyzer import IncrementalAnalyzer
+
+
+def _git(repo, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+def _write(repo, rel_path, text):
+    path = os.path.join(repo, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def _analyzer(repo, cache_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return IncrementalAnalyzer(repo, output_dir=os.path.join(cache_dir, 'reports'),
+                                   cache_dir=cache_dir, extensions=['.py'])
+
+
+def _classify(analyzer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        categorized = analyzer.scan_and_filter_files()
+    return {key: sorted(os.path.basename(f) for f in files) for key, files in categorized.items()}
+
+
+def _mark_all_analyzed(analyzer):
+    """模拟一次完整分析：缓存所有文件并记录当前提交"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file_path in analyzer.scanner.scan_directory():
+            analyzer.cache.update_file_cache(file_path, {'status': 'success', 'language': 'Python',
+                                                         'analysis': f'analysis of {file_path}'})
+    analyzer._record_analyzed_commit()
+
+
+def test_changes_across_several_commits():
+    """测试多个提交之间的修改、新增、重命名和未提交改动都能被检测"""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache_dir:
+        _git(repo, 'init', '-q')
+        _write(repo, 'a.py', 'a = 1\n')
+        _write(repo, 'b.py', 'b = 1\n')
+        _write(repo, 'old_name.py', 'def moved():\n    return 42\n')
+        _write(repo, 'c.py', 'c = 1\n')
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-q', '-m', 'initial')
+
+        analyzer = _analyzer(repo, cache_dir)
+        _mark_all_analyzed(analyzer)
+        base = analyzer.cache.get_last_commit()
+        assert base
+
+        # 两个提交: 修改 a.py、新增 d.py、重命名 old_name.py；另有未提交的 c.py 改动
+        _write(repo, 'a.py', 'a = 2\n')
+        _git(repo, 'commit', '-q', '-am', 'change a')
+        _write(repo, 'd.py', 'd = 1\n')
+        _git(repo, 'mv', 'old_name.py', 'new_name.py')
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-q', '-m', 'add d, move file')
+        _write(repo, 'c.py', 'c = 2\n')
+
+        analyzer = _analyzer(repo, cache_dir)
+        categorized = _classify(analyzer)
+        print(f"分类结果: {categorized}")
+
+        assert categorized['new'] == ['d.py']
+        assert categorized['modified'] == ['a.py', 'c.py']
+        # 重命名的文件保留缓存的分析结果，不需要重新分析
+        assert categorized['unchanged'] == ['b.py', 'new_name.py']
+        cached = analyzer.cache.get_cached_result(os.path.join(repo, 'new_name.py'))
+        assert cached['analysis'].startswith('analysis of')
+        assert not analyzer.cache.is_cached(os.path.join(repo, 'old_name.py'))
+
+
+def test_uncommitted_change_not_reanalyzed_twice():
+    """测试已分析过的未提交改动在下次运行时不会被重复分析"""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache_dir:
+        _git(repo, 'init', '-q')
+        _write(repo, 'a.py', 'a = 1\n')
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-q', '-m', 'initial')
+
+        analyzer = _analyzer(repo, cache_dir)
+        _mark_all_analyzed(analyzer)
+
+        _write(repo, 'a.py', 'a = 2\n')
+        analyzer = _analyzer(repo, cache_dir)
+        assert _classify(analyzer)['modified'] == ['a.py']
+        _mark_all_analyzed(analyzer)
+
+        analyzer = _analyzer(repo, cache_dir)
+        assert _classify(analyzer)['unchanged'] == ['a.py']
+
+
+def test_reverted_working_tree_edit_is_redetected():
+    """测试分析过工作区改动后又撤销该改动，Git 不再列出文件时仍能检测到变化"""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache_dir:
+        _git(repo, 'init', '-q')
+        _write(repo, 'a.py', 'a = 1\n')
+        _write(repo, 'b.py', 'b = 1\n')
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-q', '-m', 'initial')
+
+        analyzer = _analyzer(repo, cache_dir)
+        _mark_all_analyzed(analyzer)
+
+        _write(repo, 'a.py', 'a = 2\n')
+        analyzer = _analyzer(repo, cache_dir)
+        assert _classify(analyzer)['modified'] == ['a.py']
+        _mark_all_analyzed(analyzer)
+
+        _git(repo, 'checkout', '--', 'a.py')
+        analyzer = _analyzer(repo, cache_dir)
+        categorized = _classify(analyzer)
+        assert categorized['modified'] == ['a.py']
+        assert categorized['unchanged'] == ['b.py']
+
+
+def test_git_listed_file_with_preserved_mtime_is_redetected():
+    """测试 Git 报告变更的文件即使大小、mtime 和 inode 都与缓存一致，也会比较内容哈希"""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache_dir:
+        _git(repo, 'init', '-q')
+        path = _write(repo, 'a.py', 'a = 1\n')
+        _write(repo, 'b.py', 'b = 1\n')
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-q', '-m', 'initial')
+
+        analyzer = _analyzer(repo, cache_dir)
+        _mark_all_analyzed(analyzer)
+        st = os.stat(path)
+
+        # 大小相同的改动，提交后恢复原来的 mtime（同一个 inode）
+        with open(path, 'r+', encoding='utf-8') as f:
+            f.write('a = 2\n')
+        _git(repo, 'commit', '-q', '-am', 'same size change')
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert os.stat(path).st_ino == st.st_ino
+
+        analyzer = _analyzer(repo, cache_dir)
+        categorized = _classify(analyzer)
+        assert categorized['modified'] == ['a.py']
+        assert categorized['unchanged'] == ['b.py']
+
+
+def test_edit_during_analysis_is_redetected():
+    """测试分析期间被修改的文件在下次运行时仍被视为已修改（签名和哈希取自分析之前）"""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache_dir:
+        _git(repo, 'init', '-q')
+        path = _write(repo, 'a.py', 'a = 1\n')
+        _write(repo, 'b.py', 'b = 1\n')
+
+        analyzer = _analyzer(repo, cache_dir)
+
+        def analyze_and_edit(file_path):
+            if file_path == path:
+                _write(repo, 'a.py', 'a = 2  # edited while the LLM was busy\n')
+            return {'status': 'success', 'language': 'Python', 'analysis': f'analysis of {file_path}',
+                    'file_path': os.path.relpath(file_path, repo), 'error': None}
+
+        analyzer.scanner.analyze_file = analyze_and_edit
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.analyze_incremental()
+        analyzer.cache.close()
+
+        analyzer = _analyzer(repo, cache_dir)
+        categorized = _classify(analyzer)
+        assert categorized['modified'] == ['a.py']
+        assert categorized['unchanged'] == ['b.py']
+
+
+if __name__ == "__main__":
+    try:
+        test_changes_across_several_commits()
+        test_uncommitted_change_not_reanalyzed_twice()
+        test_reverted_working_tree_edit_is_redetected()
+        test_git_listed_file_with_preserved_mtime_is_redetected()
+        test_edit_during_analysis_is_redetected()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
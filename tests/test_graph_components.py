@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+测试强连通分量检测、缩点 DAG 和调用链报告中的循环调用组
+"""
+
+import sys
+import os
+import random
+import time
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from graph_components import condense
+from symbol_graph import SymbolGraph
+from call_chain_analyzer import CallChainAnalyzer
+
+
+def _reachable(graph, source):
+    seen, stack = {source}, [source]
+    while stack:
+        for nxt in graph.get(stack.pop(), ()):
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return seen
+
+
+def test_components_match_mutual_reachability():
+    """测试随机图的分量与两两可达性一致，缩点 DAG 的边都指向编号更大的分量"""
+    rng = random.Random(3)
+    symbol_graph = SymbolGraph()
+    graph = {}
+    for _ in range(300):
+        src, dst = f'f{rng.randrange(80)}', f'f{rng.randrange(80)}'
+        graph.setdefault(src, set()).add(dst)
+        symbol_graph.add_edge(src, dst)
+
+    result = condense(graph)
+    reach = {node: _reachable(graph, node) for node in result.component_of}
+    for node, index in result.component_of.items():
+        expected = {other for other in reach[node] if node in reach[other]}
+        assert set(result.components[index]) == expected
+    for index, successors in enumerate(result.dag):
+        assert all(successor > index for successor in successors)
+
+    # 直接在 CSR 视图上计算得到相同的分量
+    by_view = condense(symbol_graph.forward)
+    assert sorted(map(sorted, by_view.components)) == sorted(map(sorted, result.components))
+    assert sorted(map(sorted, by_view.cycles())) == sorted(map(sorted, result.cycles()))
+
+
+def test_long_cycle_is_found_once():
+    """测试超过递归深度限制和 max_depth 的长循环只报告一次"""
+    length = sys.getrecursionlimit() * 3
+    graph = {f'f{i}': [f'f{(i + 1) % length}'] for i in range(length)}
+    graph['entry'] = ['f0']
+    graph['f5'].append('leaf')
+
+    start = time.perf_counter()
+    result = condense(graph)
+    assert time.perf_counter() - start < 2.0
+
+    cycles = result.cycles()
+    assert len(cycles) == 1 and len(cycles[0]) == length
+    assert result.order(['leaf', 'f7', 'entry']) == ['entry', 'f7', 'leaf']
+    assert result.order(['leaf', 'f7', 'entry'], callees_first=True) == ['leaf', 'f7', 'entry']
+    assert not result.is_cyclic('entry') and result.cycle_of('leaf') == []
+
+
+def test_report_lists_each_cycle_once():
+    """测试调用链报告按分量列出循环调用组，函数声明不会被当作自调用"""
+    code = """class Parser {
+    public void parse() {
+        expr();
+    }
+    void expr() {
+        term();
+    }
+    void term() {
+        open();
+        expr();
+    }
+    void open() { }
+    void fact(int n) { fact(n - 1); }
+}
+"""
+    analyzer = CallChainAnalyzer(language='Java', filter_default_methods=False)
+    analyzer.build_call_graph(code, 'Parser.java')
+
+    assert 'parse' not in analyzer.call_graph['parse']
+    assert analyzer.call_graph['fact'] == ['fact']
+    report = analyzer.generate_call_chain_report()
+    assert '- **循环调用组** (直接或间接递归): 2\n' in report
+    assert '  - `expr` ⇄ `term`\n' in report
+    assert '  - `fact`\n' in report
+    assert '- **叶子函数** (不调用其他函数): 1\n' in report
+    order = analyzer.get_impact_order('open')
+    assert sorted(order[:2]) == ['expr', 'term'] and order[2:] == ['parse']
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+测试基于可达性的影响链追踪（BFS、最短距离、示例路径、按需重建路径）
+"""
+
+import sys
+import os
+import time
+from collections import defaultdict
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from impact_engine import CYCLE_MARK, trace_reachability
+from ast_analyzer import ASTAnalyzer
+from call_chain_analyzer import CallChainAnalyzer
+
+
+def _layered_graph(layers, width):
+    """每层 width 个节点，相邻两层全连接：路径数为 width ** (layers - 1)"""
+    graph = defaultdict(set)
+    for layer in range(layers - 1):
+        for i in range(width):
+            for j in range(width):
+                graph[f'n{layer}_{i}'].add(f'n{layer + 1}_{j}')
+    return graph
+
+
+def test_distances_and_lazy_paths():
+    """测试最短距离、前驱链重建路径以及深度限制"""
+    graph = {'a': ['b', 'c'], 'b': ['d'], 'c': ['d'], 'd': ['e']}
+    reach = trace_reachability(graph, 'a', max_depth=5)
+    assert reach.affected == {'b': 1, 'c': 1, 'd': 2, 'e': 3}
+    assert reach.path_to('e') == ['a', 'b', 'd', 'e']
+    assert reach.path_to('missing') is None
+    assert reach.sample_paths == [['a', 'b', 'd', 'e']]
+
+    limited = trace_reachability(graph, 'a', max_depth=1)
+    assert limited.affected == {'b': 1, 'c': 1}
+    assert limited.truncated
+    assert limited.sample_paths == [['a', 'b'], ['a', 'c']]
+
+
+def test_dense_graph_is_bounded():
+    """测试稠密图：路径数指数增长时，节点只访问一次，示例路径数量受限"""
+    graph = _layered_graph(layers=12, width=30)  # 约 1 万条边、30^11 条路径
+    start = time.perf_counter()
+    reach = trace_reachability(graph, 'n0_0', max_depth=20, max_paths=7)
+    elapsed = time.perf_counter() - start
+
+    assert len(reach.affected) == 11 * 30
+    assert reach.distances['n11_29'] == 11
+    assert len(reach.sample_paths) == 7
+    assert len(reach.path_to('n11_5')) == 12
+    assert elapsed < 1.0
+    # defaultdict 不会因为查询而新增键
+    assert 'n11_0' not in graph
+
+
+def test_deep_chain_has_no_recursion_limit():
+    """测试超过递归深度限制的长链"""
+    graph = {f'f{i}': [f'f{i + 1}'] for i in range(sys.getrecursionlimit() * 2)}
+    reach = trace_reachability(graph, 'f0', max_depth=len(graph))
+    assert len(reach.affected) == len(graph)
+
+
+def test_call_chain_cycles_and_reverse():
+    """测试调用链中的循环标记和反向调用链"""
+    analyzer = CallChainAnalyzer(language='Python')
+    analyzer.call_graph = {'main': {'parse'}, 'parse': {'expr'}, 'expr': {'parse'}}
+    analyzer.reverse_call_graph = {'parse': {'main', 'expr'}, 'expr': {'parse'}}
+
+    assert analyzer.get_call_chain('main') == [['main', 'parse', 'expr', 'parse' + CYCLE_MARK]]
+    reverse = analyzer.get_reverse_call_chain('expr')
+    assert ['main', 'parse', 'expr'] in reverse
+    assert ['expr' + CYCLE_MARK, 'parse', 'expr'] in reverse
+    assert analyzer.trace_calls('expr', reverse=True).affected == {'parse': 1, 'main': 2}
+
+
+def test_trace_impact_reports_all_affected():
+    """测试 trace_impact 汇总上下游受影响项目"""
+    analyzer = ASTAnalyzer(language='Java')
+    for child, parent in [('B', 'A'), ('C', 'B'), ('D', 'B'), ('A', 'Base')]:
+        analyzer.symbol_graph.add_edge(child, parent)
+
+    impact = analyzer.trace_impact(['A'], max_depth=5)
+    assert impact['upstream_affected']['A'] == {'B': 1, 'C': 2, 'D': 2}
+    assert impact['downstream_affected']['A'] == {'Base': 1}
+    assert sorted(impact['upstream_impact']['A']) == [['A', 'B', 'C'], ['A', 'B', 'D']]
+    assert impact['total_affected'] == 5
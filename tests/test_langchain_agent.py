@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+测试 LangChain 智能代理对大文件的处理：代码以引用传给工具，不被截断
+"""
+
+import sys
+import os
+import re
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip('langchain')
+
+from agent import langchain_agent
+from agent.langchain_agent import OptimizedCodeAnalysisAgent, CODE_REF_PREFIX
+
+
+class FakeExecutor:
+    """代替 AgentExecutor：把任务中的代码引用作为 Action Input 调用第一个工具"""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.inputs = []
+
+    def invoke(self, inputs):
+        self.inputs.append(inputs['input'])
+        ref = re.search(re.escape(CODE_REF_PREFIX) + r'\w+', inputs['input']).group(0)
+        return {'output': self.tool.func(f"`{ref}`")}
+
+
+def test_large_file_reaches_tool_untruncated(monkeypatch):
+    """测试超过 2 KB 的文件经由代码引用完整到达工具，并按函数边界分片"""
+    prompts = []
+    monkeypatch.setattr(langchain_agent.OllamaLLM, '_call',
+                        lambda self, prompt, *args, **kwargs: prompts.append(prompt) or 'ok')
+    code = ''.join(f"def func{i}():\n    value = {i}\n    return value * {i}\n\n\n" for i in range(80))
+    assert len(code) > 2000
+
+    agent = OptimizedCodeAnalysisAgent(enable_cache=False, chunk_tokens=256)
+    executor = FakeExecutor(agent.tools[0])
+    agent.agent_executor = executor
+    result = agent.analyze('分析代码质量', code)
+
+    assert result['status'] == 'success'
+    assert code not in executor.inputs[0] and 'func0, func1' in executor.inputs[0]
+    assert len(prompts) > 1
+    assert all(f"def func{i}():" in ''.join(prompts) for i in range(80))
+    assert agent._code_refs == {}
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+测试多个 Ollama 服务之间的负载均衡（OllamaLoadBalancer）
+"""
+
+import sys
+import os
+import json
+import time
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm import load_balancer
+from llm.load_balancer import OllamaLoadBalancer, parse_base_urls
+from llm.ollama_client import OllamaClient
+
+
+class FakeClock:
+    """可手动推进的 time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_least_outstanding_routing():
+    """测试请求发往在途请求最少的服务，在途数相同时选择延迟均值更低的服务"""
+    balancer = OllamaLoadBalancer(['http://a:11434', 'http://b:11434', 'http://c:11434/'])
+    first, second, third = (balancer.acquire() for _ in range(3))
+    assert [e.url for e in (first, second, third)] == ['http://a:11434', 'http://b:11434', 'http://c:11434']
+
+    balancer.release(second, 0.5, True)
+    assert balancer.acquire() is second  # b 没有在途请求
+
+    balancer.release(first, 2.0, True)
+    balancer.release(third, 0.1, True)
+    balancer.release(second, 0.5, True)
+    # 三个服务都空闲：按延迟均值选择 c
+    assert balancer.acquire().url == 'http://c:11434'
+
+
+def test_ejection_cooldown_and_fallback(monkeypatch):
+    """测试失败或过慢的服务在冷却期内不再被选中，全部被剔除时选择最早恢复的服务"""
+    clock = FakeClock()
+    monkeypatch.setattr(load_balancer, 'time', clock)
+    balancer = OllamaLoadBalancer(['http://a', 'http://b'], cooldown=30, slow_threshold=5)
+    a, b = balancer.endpoints
+
+    balancer.release(balancer.acquire(), 0.1, False)  # a 失败
+    assert balancer.acquire() is b
+    assert balancer.acquire() is b  # a 仍在冷却期，即使 b 的在途请求更多
+
+    clock.now += 10
+    balancer.release(b, 9.0, True)  # b 过慢
+    balancer.release(b, 0.1, True)
+    # 两个服务都被剔除：a 的冷却期先结束
+    assert not any(e.is_available(clock.now) for e in balancer.endpoints)
+    assert balancer.acquire() is a
+    balancer.release(a, 0.1, True)
+
+    clock.now += 21
+    assert a.is_available(clock.now) and not b.is_available(clock.now)
+    clock.now += 10
+    assert b.is_available(clock.now)
+
+
+def test_statistics(monkeypatch):
+    """测试每个服务的请求数、失败数、剔除次数和延迟统计"""
+    clock = FakeClock()
+    monkeypatch.setattr(load_balancer, 'time', clock)
+    balancer = OllamaLoadBalancer(['http://a', 'http://b'], cooldown=30, ewma_alpha=0.5)
+    a, b = balancer.endpoints
+
+    balancer.release(balancer.acquire(), 1.0, True)
+    balancer.release(balancer.acquire(), 3.0, True)
+    endpoint = balancer.acquire()
+    assert endpoint is a
+    balancer.release(endpoint, 2.0, False)
+
+    stats = {s['url']: s for s in balancer.get_statistics()}
+    assert stats['http://a'] == {
+        'url': 'http://a', 'outstanding': 0, 'requests': 2, 'failures': 1, 'ejections': 1,
+        'avg_latency': 1.5, 'ewma_latency': 1.5, 'available': False, 'ejected_for': 30,
+    }
+    assert stats['http://b']['requests'] == 1 and stats['http://b']['available']
+
+
+def test_base_urls_are_normalized():
+    """测试逗号分隔的地址去除空白和结尾斜杠"""
+    assert parse_base_urls('http://a:11434, http://b:11434/ ,') == ['http://a:11434', 'http://b:11434']
+    client = OllamaClient(base_url='http://a:11434/ , http://b:11434')
+    assert client.api_url == 'http://a:11434/api/generate'
+    assert [e.url for e in client.balancer.endpoints] == ['http://a:11434', 'http://b:11434']
+    assert OllamaClient(base_url=[' http://a:11434/ ']).api_url == 'http://a:11434/api/generate'
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        yield from self.lines
+
+
+class FakeSession:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def post(self, url, json=None, timeout=None, stream=False):
+        return FakeStreamResponse(self.lines)
+
+
+def test_stream_latency_excludes_consumer_time():
+    """测试流式请求记录到首个字节的延迟，不包括调用方处理各个片段的时间"""
+    lines = [json.dumps({'response': t}).encode() for t in ('a', 'b', 'c')]
+    lines.append(json.dumps({'done': True}).encode())
+    client = OllamaClient(base_url=['http://a', 'http://b'])
+    client.balancer.slow_threshold = 0.05
+    client.session = FakeSession(lines)
+
+    tokens = []
+    for token in client.generate_stream('prompt'):
+        tokens.append(token)
+        time.sleep(0.03)  # 调用方读取较慢
+
+    stats = client.balancer.get_statistics()[0]
+    assert tokens == ['a', 'b', 'c']
+    assert stats['requests'] == 1 and stats['outstanding'] == 0
+    assert stats['avg_latency'] < 0.05 and stats['ejections'] == 0
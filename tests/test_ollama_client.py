@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试 OllamaClient 流式生成的错误处理：错误写入 metrics，不作为片段返回
+"""
+
+import sys
+import os
+import json
+
+import requests
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm.ollama_client import OllamaClient
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        yield from self.lines
+
+
+class FakeSession:
+    def __init__(self, lines=None, error=None):
+        self.lines = lines or []
+        self.error = error
+
+    def post(self, url, json=None, timeout=None, stream=False):
+        if self.error:
+            raise self.error
+        return FakeStreamResponse(self.lines)
+
+
+def _stream(session, base_url='http://a'):
+    client = OllamaClient(base_url=base_url)
+    client.session = session
+    metrics = {}
+    tokens = list(client.generate_stream('prompt', metrics))
+    return client, tokens, metrics
+
+
+def test_stream_collects_tokens_and_metrics():
+    """测试正常的流式响应：返回各个片段，最后一个片段的统计写入 metrics"""
+    lines = [json.dumps({'response': t}).encode() for t in ('a', 'b')]
+    lines.append(json.dumps({'done': True, 'eval_count': 4, 'eval_duration': 2e9}).encode())
+    _, tokens, metrics = _stream(FakeSession(lines))
+
+    assert tokens == ['a', 'b']
+    assert 'error' not in metrics
+    assert metrics['eval_count'] == 4 and metrics['tokens_per_second'] == 2
+
+
+def test_malformed_chunk_stops_stream_with_error():
+    """测试无法解析的片段使流结束，错误写入 metrics 而不是作为片段返回"""
+    lines = [json.dumps({'response': 'a'}).encode(), b'{"response": "b', json.dumps({'done': True}).encode()]
+    client, tokens, metrics = _stream(FakeSession(lines), base_url='http://a, http://b')
+
+    assert tokens == ['a']
+    assert metrics['error'].startswith('Invalid response from Ollama')
+    # 格式错误的响应计为该服务的失败
+    assert sum(s['failures'] for s in client.balancer.get_statistics()) == 1
+
+
+def test_server_error_chunk_and_request_failure():
+    """测试服务端返回的 error 片段和请求异常都写入 metrics"""
+    _, tokens, metrics = _stream(FakeSession([json.dumps({'error': 'model not found'}).encode()]))
+    assert tokens == []
+    assert metrics['error'] == 'Invalid response from Ollama: model not found'
+
+    _, tokens, metrics = _stream(FakeSession(error=requests.exceptions.ConnectionError('refused')))
+    assert tokens == []
+    assert metrics['error'] == 'Error communicating with Ollama: refused'
+    assert metrics['time_to_first_token'] is None
+
+
+def test_errors_raise_without_metrics():
+    """测试调用方没有传入 metrics 时错误直接抛出，而不是得到一个空的流"""
+    client = OllamaClient(base_url='http://a')
+    client.session = FakeSession(error=requests.exceptions.ConnectionError('refused'))
+    try:
+        list(client.generate_stream('prompt'))
+        assert False, "应该抛出 ConnectionError"
+    except requests.exceptions.ConnectionError:
+        pass
+
+    client.session = FakeSession([b'not json'])
+    try:
+        list(client.generate_stream('prompt'))
+        assert False, "应该抛出 ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    try:
+        test_stream_collects_tokens_and_metrics()
+        test_malformed_chunk_stops_stream_with_error()
+        test_server_error_chunk_and_request_failure()
+        test_errors_raise_without_metrics()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试 ASTAnalyzer 的持久化解析缓存（ParseCache）
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ast_analyzer import ASTAnalyzer
+from parse_cache import ParseCache
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_reuses_results_until_content_changes():
+    """测试未变化的文件命中缓存，touch 后按内容哈希命中，修改内容后重新解析"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'service.py')
+        _write(source, 'import os\n\nclass Service:\n    def run(self):\n        os.getcwd()\n')
+        cache = ASTAnalyzer.open_parse_cache(os.path.join(tmp, 'parse.sqlite'))
+
+        fresh = ASTAnalyzer(language='Python', parse_cache=cache).analyze_file(source)
+        assert ASTAnalyzer(language='Python', parse_cache=cache).analyze_file(source) == fresh
+        assert cache.get_statistics()['stat_hits'] == 1
+
+        os.utime(source, ns=(1, 1))
+        assert ASTAnalyzer(language='Python', parse_cache=cache).analyze_file(source) == fresh
+        stats = cache.get_statistics()
+        assert stats['hits'] == 2 and stats['stat_hits'] == 1 and stats['misses'] == 1
+
+        _write(source, 'import sys\n')
+        assert ASTAnalyzer(language='Python', parse_cache=cache).analyze_file(source)['imports'] == ['sys']
+        assert cache.get_statistics()['misses'] == 2
+        cache.close()
+
+
+def test_dependency_graph_parses_only_changed_files():
+    """测试重新构建依赖图时只解析变化的文件，版本变化后缓存失效"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(4):
+            files.append(os.path.join(tmp, f'M{i}.java'))
+            _write(files[-1], f'package p;\nimport p.Base;\npublic class M{i} extends Base {{\n}}\n')
+        cache_path = os.path.join(tmp, 'parse.sqlite')
+
+        cache = ASTAnalyzer.open_parse_cache(cache_path)
+        first = ASTAnalyzer(language='Java', parse_cache=cache).build_dependency_graph(files)
+        _write(files[2], 'package p;\npublic class M2 extends Other {\n}\n')
+        second = ASTAnalyzer(language='Java', parse_cache=cache).build_dependency_graph(files, workers=2)
+
+        stats = cache.get_statistics()
+        assert stats['misses'] == 5 and stats['hits'] == 3 and stats['entries'] == 4
+        assert second['files'][0] == first['files'][0]
+        assert second['inheritance']['M2'] == ['Other']
+        cache.close()
+
+        reopened = ParseCache(cache_path, version='ast-999')
+        assert reopened.get_statistics()['entries'] == 0
+        reopened.close()
+
+
+def test_content_hash_matches_analysis_cache():
+    """测试解析缓存与增量分析缓存使用同一个哈希函数和算法"""
+    from file_signature import HASH_ALGORITHM, hash_file
+    from incremental_analyzer import AnalysisCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'a.py')
+        _write(source, 'x = 1\n')
+        cache = ParseCache(os.path.join(tmp, 'parse.sqlite'))
+        assert cache.lookup(source, 'Python') is None
+        cache.store(source, 'Python', {'ok': True})
+        stored = cache._conn.execute("SELECT content_hash FROM parses").fetchone()[0]
+        cache.close()
+
+        analysis_cache = AnalysisCache(os.path.join(tmp, 'cache'))
+        assert stored == hash_file(source) == analysis_cache._calculate_file_hash(source, HASH_ALGORITHM)
+        analysis_cache.close()
+        assert hash_file(os.path.join(tmp, 'missing.py')) is None
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+测试多进程解析阶段：并行解析的结果与逐个解析一致
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ast_analyzer import ASTAnalyzer
+from call_chain_analyzer import CallChainAnalyzer
+from dependency_index import DependencyIndex
+from parse_pool import parse_in_pool
+
+
+def _write(root, rel_path, text):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def _make_java_project(root):
+    files = [_write(root, 'com/example/Base.java', 'package com.example;\npublic class Base {\n}\n')]
+    for i in range(6):
+        files.append(_write(root, f'com/example/Service{i}.java', f"""package com.example;
+import com.example.Base;
+public class Service{i} extends Base implements Runnable {{
+    public void run() {{
+        step{i}();
+    }}
+    private void step{i}() {{
+        helper();
+    }}
+}}
+"""))
+    return files
+
+
+def _sorted_graph(graph):
+    return {k: sorted(v) for k, v in graph.items()}
+
+
+def test_parse_in_pool_keeps_order():
+    """测试进程池按输入顺序返回结果"""
+    assert list(parse_in_pool(abs, [-3, 1, -2, 5, -8], workers=2, chunksize=1)) == [3, 1, 2, 5, 8]
+    assert list(parse_in_pool(abs, [-1], workers=4)) == [1]
+
+
+def test_dependency_graph_parallel_matches_serial():
+    """测试多进程构建的依赖图（含继承和接口实现）与单进程一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_java_project(tmp)
+        serial = ASTAnalyzer(language='Java').build_dependency_graph(files)
+        parallel = ASTAnalyzer(language='Java').build_dependency_graph(files, workers=2)
+
+        assert [r['file'] for r in parallel['files']] == files
+        for key in ('dependencies', 'reverse_dependencies', 'inheritance', 'implementations'):
+            assert _sorted_graph(parallel[key]) == _sorted_graph(serial[key])
+        assert parallel['inheritance']['Service0'] == ['Base']
+        assert parallel['implementations']['Service3'] == ['Runnable']
+
+
+def test_call_graph_from_files_parallel():
+    """测试多进程解析多个文件后合并的调用图"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_java_project(tmp)
+        serial = CallChainAnalyzer(language='Java').build_call_graph_from_files(files)
+        analyzer = CallChainAnalyzer(language='Java')
+        parallel = analyzer.build_call_graph_from_files(files, workers=2)
+
+        assert _sorted_graph(parallel['call_graph']) == _sorted_graph(serial['call_graph'])
+        assert sorted(parallel['reverse_call_graph']['helper']) == [f'step{i}' for i in range(6)]
+        assert len(parallel['functions']) == 12
+        assert 'step5' in analyzer.functions
+
+
+def test_dependency_index_parallel_build():
+    """测试依赖索引使用多进程解析时得到相同的依赖边"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_java_project(tmp)
+        serial = DependencyIndex(tmp)
+        serial.build(files)
+        parallel = DependencyIndex(tmp, workers=2)
+        parallel.build(files)
+
+        assert parallel.symbols == serial.symbols
+        assert _sorted_graph(parallel.dependencies) == _sorted_graph(serial.dependencies)
+        assert parallel.get_statistics()['parsed_files'] == len(files)
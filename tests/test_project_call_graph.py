@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+测试全项目跨文件调用图：限定名、重载、导入解析、缓存和文件切片
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from project_call_graph import ProjectCallGraph
+from directory_scanner import DirectoryScanner
+
+
+def _write(root, rel_path, text):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+JAVA_FILES = {
+    'com/shop/Repo.java': """package com.shop;
+public class Repo {
+    public void save(Order o) { log(o); }
+    public void save(Order o, boolean flush) { save(o); }
+    private void log(Order o) { }
+}
+""",
+    'com/shop/Service.java': """package com.shop;
+import com.shop.util.Mailer;
+public class Service {
+    private Repo repo;
+    private Mailer mailer = new Mailer();
+    public void place(Order o) {
+        repo.save(o, true);
+        mailer.send(o);
+        Mailer.ping();
+        audit();
+    }
+    private void log(String s) { }
+    class Inner {
+        void run() { log("x"); }
+    }
+}
+""",
+    'com/shop/util/Mailer.java': """package com.shop.util;
+public class Mailer {
+    public void send(Object o) { ping(); }
+    public static void ping() { }
+}
+""",
+}
+
+PYTHON_FILES = {
+    'app/__init__.py': '',
+    'app/core.py': """from app.utils import helper as h
+from . import utils
+from .models import Model
+
+
+class Engine:
+    def run(self):
+        self.step()
+        h()
+        utils.fmt()
+        model = Model()
+        model.save()
+
+    def step(self):
+        return top()
+
+
+def top():
+    return 1
+""",
+    'app/utils.py': """def helper():
+    pass
+
+
+def fmt():
+    helper()
+""",
+    'app/models.py': """class Model:
+    def save(self):
+        pass
+""",
+}
+
+
+def _make_project(root, sources):
+    return [_write(root, rel_path, text) for rel_path, text in sources.items()]
+
+
+def test_java_qualified_names_and_overloads():
+    """测试 Java 方法按 包.类.方法(参数类型) 标识，重载按参数个数解析，字段类型和导入决定跨文件目标"""
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = ProjectCallGraph(tmp).build(_make_project(tmp, JAVA_FILES))
+        calls = graph.call_graph
+
+        assert 'com.shop.Repo.save(Order)' in graph.functions
+        assert 'com.shop.Repo.save(Order,boolean)' in graph.functions
+        assert calls['com.shop.Repo.save(Order,boolean)'] == ['com.shop.Repo.save(Order)']
+        assert sorted(calls['com.shop.Service.place(Order)']) == [
+            'audit', 'com.shop.Repo.save(Order,boolean)',
+            'com.shop.util.Mailer.ping()', 'com.shop.util.Mailer.send(Object)',
+        ]
+        # 嵌套类调用外层类的方法，不会解析到其他类的同名方法
+        assert calls['com.shop.Service.Inner.run()'] == ['com.shop.Service.log(String)']
+        assert graph.get_statistics()['external_calls'] == 1
+
+
+def test_python_imports_resolve_across_modules():
+    """测试 Python 的别名导入、相对导入和构造赋值的变量类型"""
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = ProjectCallGraph(tmp, workers=2).build(_make_project(tmp, PYTHON_FILES))
+
+        # 没有 __init__ 的类构造调用保留为外部节点
+        assert sorted(graph.call_graph['app.core.Engine.run']) == [
+            'Model', 'app.core.Engine.step', 'app.models.Model.save', 'app.utils.fmt', 'app.utils.helper',
+        ]
+        assert graph.call_graph['app.core.Engine.step'] == ['app.core.top']
+        assert sorted(graph.reverse_call_graph['app.utils.helper']) == ['app.core.Engine.run', 'app.utils.fmt']
+
+
+def test_locals_are_scoped_per_function():
+    """测试同名的局部变量在不同方法中有不同的类型，字段类型只在没有同名局部变量时使用"""
+    sources = {
+        'p/A.java': "package p;\npublic class A {\n    public void work() { }\n}\n",
+        'p/B.java': "package p;\npublic class B {\n    public void work() { }\n}\n",
+        'p/Main.java': """package p;
+public class Main {
+    private B item;
+    void first() {
+        A item = new A();
+        item.work();
+    }
+    void second() {
+        item.work();
+    }
+    void third(A item) {
+        item.work();
+    }
+}
+""",
+        'py/jobs.py': """class Left:
+    def go(self):
+        pass
+
+
+class Right:
+    def go(self):
+        pass
+
+
+def one():
+    job = Left()
+    job.go()
+
+
+def two():
+    job = Right()
+    job.go()
+""",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = ProjectCallGraph(tmp).build(_make_project(tmp, sources))
+        calls = graph.call_graph
+        assert sorted(calls['p.Main.first()']) == ['A', 'p.A.work()']
+        assert calls['p.Main.second()'] == ['p.B.work()']
+        assert calls['p.Main.third(A)'] == ['p.A.work()']
+        assert sorted(calls['py.jobs.one']) == ['Left', 'py.jobs.Left.go']
+        assert sorted(calls['py.jobs.two']) == ['Right', 'py.jobs.Right.go']
+
+
+def test_python_package_init_and_ambiguous_modules():
+    """测试 __init__.py 中的相对导入以包自身为起点，后缀相同的多个模块不会被任选一个"""
+    sources = {
+        'pkg/__init__.py': """from .core import start
+from . import helpers
+
+
+def boot():
+    start()
+    helpers.assist()
+""",
+        'pkg/core.py': "def start():\n    pass\n",
+        'pkg/helpers.py': "def assist():\n    pass\n",
+        'one/tools/util.py': "def shared():\n    pass\n",
+        'two/tools/util.py': "def shared():\n    pass\n",
+        'client.py': "import tools.util\n\n\ndef run():\n    tools.util.shared()\n",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = ProjectCallGraph(tmp).build(_make_project(tmp, sources))
+        assert sorted(graph.call_graph['pkg.boot']) == ['pkg.core.start', 'pkg.helpers.assist']
+        # tools.util 同时是 one.tools.util 和 two.tools.util 的后缀：调用保留为外部节点
+        assert graph.call_graph['client.run'] == ['shared']
+
+
+def test_cache_and_file_slice():
+    """测试摘要缓存命中后得到相同的图，文件切片包含其他文件中的调用者"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_project(tmp, JAVA_FILES)
+        cache_path = os.path.join(tmp, 'calls.sqlite')
+
+        cache = ProjectCallGraph.open_cache(cache_path)
+        first = ProjectCallGraph(tmp, cache=cache).build(files)
+        second = ProjectCallGraph(tmp, cache=cache).build(files)
+        cache.close()
+        assert second.get_statistics()['cached_files'] == len(files)
+        assert second.call_graph.to_dict() == first.call_graph.to_dict()
+
+        repo = second.file_slice(files[0])
+        assert [f['qualified_name'] for f in repo['functions']] == [
+            'com.shop.Repo.save(Order)', 'com.shop.Repo.save(Order,boolean)', 'com.shop.Repo.log(Order)',
+        ]
+        assert repo['reverse_call_graph']['com.shop.Repo.save(Order,boolean)'] == ['com.shop.Service.place(Order)']
+
+        report = second.analyzer_for(files[0]).generate_call_chain_report()
+        assert '**函数总数**: 3' in report
+        assert '- **被调用于**: `com.shop.Service.place(Order)`' in report
+
+
+def test_scanner_queries_project_graph():
+    """测试目录扫描器的调用链分析使用上次扫描文件列表构建的项目调用图切片，且不重复统计文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_project(tmp, JAVA_FILES)
+        scanner = DirectoryScanner(root_dir=tmp, extensions=['.java'], enable_call_chain=True)
+        scanner.scan_directory()
+        stats = dict(scanner.stats)
+        service = os.path.join(scanner.root_dir, 'com', 'shop', 'Service.java')
+        with open(service, encoding='utf-8') as f:
+            info = scanner._analyze_call_chain(f.read(), service, 'Java')
+
+        assert scanner.stats == stats
+        assert scanner.get_project_call_graph() is scanner.get_project_call_graph()
+        assert scanner.get_project_call_graph().get_statistics()['files'] == len(files)
+        assert 'com.shop.util.Mailer.send(Object)' in info['call_graph']['com.shop.Service.place(Order)']
+        assert 'com_shop_Service_place_Order_["com.shop.Service.place(Order)"]' in info['mermaid']
+
+
+def test_scanner_refreshes_modified_file():
+    """测试长期存在的扫描器在文件修改后只重新解析该文件，调用链不再过期"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_project(tmp, JAVA_FILES)
+        scanner = DirectoryScanner(root_dir=tmp, extensions=['.java'], enable_call_chain=True)
+        scanner.scan_directory()
+        mailer = os.path.join(scanner.root_dir, 'com', 'shop', 'util', 'Mailer.java')
+
+        def callees():
+            with open(mailer, encoding='utf-8') as f:
+                info = scanner._analyze_call_chain(f.read(), mailer, 'Java')
+            return info['call_graph'].get('com.shop.util.Mailer.send(Object)')
+
+        assert callees() == ['com.shop.util.Mailer.ping()']
+        _write(tmp, 'com/shop/util/Mailer.java', JAVA_FILES['com/shop/util/Mailer.java'].replace(
+            'ping(); }', 'ping(); extra(); }\n    void extra() { }'))
+        os.utime(mailer, ns=(1, 1))
+        assert callees() == ['com.shop.util.Mailer.ping()', 'com.shop.util.Mailer.extra()']
+
+        graph = scanner.get_project_call_graph()
+        assert graph.get_statistics()['parsed_files'] == len(JAVA_FILES) + 1
+        # 其他文件中的调用者仍然链接到该文件的方法
+        assert 'com.shop.util.Mailer.send(Object)' in graph.call_graph['com.shop.Service.place(Order)']
+
+
+def test_single_file_analysis_does_not_walk_project():
+    """测试没有扫描过目录时，单文件分析只解析该文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_project(tmp, JAVA_FILES)
+        scanner = DirectoryScanner(root_dir=tmp, extensions=['.java'], enable_call_chain=True)
+        with open(files[0], encoding='utf-8') as f:
+            info = scanner._analyze_call_chain(f.read(), files[0], 'Java')
+
+        assert scanner.stats['total_files'] == 0
+        assert scanner.get_project_call_graph().get_statistics()['parsed_files'] == 1
+        assert info['call_graph']['com.shop.Repo.save(Order,boolean)'] == ['com.shop.Repo.save(Order)']
+
+
+def test_update_drops_deleted_files():
+    """测试与文件列表同步时移除已删除的文件，未变化时不重新解析"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_project(tmp, JAVA_FILES)
+        graph = ProjectCallGraph(tmp).build(files)
+        graph.update(files)
+        assert graph.get_statistics()['parsed_files'] == len(files)
+
+        os.remove(files[2])
+        graph.update(files[:2])
+        assert 'com.shop.util.Mailer.send(Object)' not in graph.functions
+        assert 'send' in graph.call_graph['com.shop.Service.place(Order)']
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+测试 LLM 响应缓存（ResponseCache）
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from llm import response_cache
+from llm.response_cache import ResponseCache
+
+
+def test_hit_and_miss():
+    """测试命中与未命中计数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite'))
+        key = cache.make_key('qwen2.5:0.5b', 'analyze this')
+
+        assert cache.get(key) is None
+        cache.set(key, 'analysis text', model='qwen2.5:0.5b')
+        assert cache.get(key) == 'analysis text'
+
+        stats = cache.get_statistics()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+        cache.close()
+
+
+def test_key_depends_on_model_prompt_and_options():
+    """测试缓存键由模型、提示词和生成参数共同决定"""
+    base = ResponseCache.make_key('m', 'p')
+    assert base == ResponseCache.make_key('m', 'p', {})
+    assert base != ResponseCache.make_key('other', 'p')
+    assert base != ResponseCache.make_key('m', 'p2')
+    assert base != ResponseCache.make_key('m', 'p', {'temperature': 0})
+
+
+def test_lru_eviction():
+    """测试超过容量时淘汰最久未访问的条目"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite'), max_entries=2)
+        cache.set('a', '1')
+        time.sleep(0.01)
+        cache.set('b', '2')
+        time.sleep(0.01)
+        assert cache.get('a') == '1'  # 访问 a，使 b 成为最久未访问
+        time.sleep(0.01)
+        cache.set('c', '3')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == '1'
+        assert cache.get('c') == '3'
+        assert cache.get_statistics()['evictions'] == 1
+        cache.close()
+
+
+def test_eviction_tracks_row_count(monkeypatch):
+    """测试覆盖已有条目不计入容量，其他进程写入的条目在重新计数后参与淘汰"""
+    monkeypatch.setattr(response_cache, 'RECOUNT_INTERVAL', 7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite')
+        cache = ResponseCache(path, max_entries=3)
+        for _ in range(5):
+            cache.set('a', '1')
+        time.sleep(0.01)
+        cache.set('b', '2')
+        time.sleep(0.01)
+        assert cache.get_statistics()['evictions'] == 0
+
+        other = ResponseCache(path, max_entries=None)  # 另一个进程
+        other.set('x', '9')
+        other.set('y', '9')
+        other.close()
+        time.sleep(0.01)
+
+        cache.set('c', '3')  # 第 7 次写入：重新计数后发现 5 条，淘汰最久未访问的 2 条
+        stats = cache.get_statistics()
+        assert stats['entries'] == 3 and stats['evictions'] == 2
+        assert cache.get('a') is None and cache.get('c') == '3'
+        cache.close()
+
+
+def test_ttl_expiry():
+    """测试过期条目视为未命中"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite'), ttl=0.05)
+        cache.set('k', 'v')
+        time.sleep(0.1)
+        assert cache.get('k') is None
+        assert cache.get_statistics()['expired'] == 1
+        cache.close()
+
+
+def test_persistence():
+    """测试缓存在重新打开后依然可用"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite')
+        cache = ResponseCache(path)
+        cache.set('k', 'v')
+        cache.close()
+
+        reopened = ResponseCache(path)
+        assert reopened.get('k') == 'v'
+        reopened.close()
+
+
+if __name__ == "__main__":
+    try:
+        test_hit_and_miss()
+        test_key_depends_on_model_prompt_and_options()
+        test_lru_eviction()
+        test_ttl_expiry()
+        test_persistence()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
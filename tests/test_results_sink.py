@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+测试流式结果存储（ResultsSink）
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_sink import ResultsSink
+
+
+def test_append_and_stream_back():
+    """测试追加的结果可以按文件逐条读回，重试后的记录覆盖之前的失败记录"""
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = ResultsSink(os.path.join(tmp, 'results.jsonl'))
+        sink.append({'file_path': 'a.py', 'language': 'Python', 'status': 'failed', 'error': 'timeout'})
+        sink.append({'file_path': 'b.java', 'language': 'Java', 'status': 'success', 'analysis': '中文分析'})
+        sink.append({'file_path': 'a.py', 'language': 'Python', 'status': 'success', 'analysis': 'retry',
+                     'call_chain': {'functions': {'f'}}})
+
+        assert len(sink) == 2
+        assert [r['file_path'] for r in sink] == ['a.py', 'b.java']
+        assert sink.get('a.py')['analysis'] == 'retry'
+        assert sink.get('a.py')['call_chain'] == {'functions': ['f']}
+        assert sink.entries()[1] == {'file_path': 'b.java', 'language': 'Java', 'status': 'success',
+                                     'error': None, 'report_file': None, 'analysis_type': None}
+
+        stats = sink.get_statistics()
+        assert stats['files'] == 2 and stats['success'] == 2 and stats['failed'] == 0
+        assert stats['languages'] == {'Python': 1, 'Java': 1}
+        assert stats['bytes'] == os.path.getsize(sink.path)
+
+
+def test_reopen_truncates_partial_line():
+    """测试重新打开时截掉写了一半的记录，之后追加的记录不受影响"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.jsonl')
+        ResultsSink(path).append({'file_path': 'a.py', 'status': 'success'})
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"file_path": "b.py", "sta')
+
+        sink = ResultsSink(path)
+        assert sink.completed_files() == ['a.py']
+        sink.append({'file_path': 'c.py', 'status': 'success'})
+        assert [r['file_path'] for r in ResultsSink(path)] == ['a.py', 'c.py']
+
+
+def test_write_json_summary():
+    """测试流式写出的 JSON 汇总是合法的 JSON 并包含全部结果"""
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = ResultsSink(os.path.join(tmp, 'results.jsonl'), fsync=False)
+        for i in range(3):
+            sink.append({'file_path': f'f{i}.py', 'status': 'success', 'analysis': f'分析 {i}'})
+
+        output = os.path.join(tmp, 'summary.json')
+        sink.write_json(output, {'root_dir': tmp, 'stats': {'total_files': 3}})
+        with open(output, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        assert summary['root_dir'] == tmp
+        assert summary['stats'] == {'total_files': 3}
+        assert [r['analysis'] for r in summary['results']] == ['分析 0', '分析 1', '分析 2']
+
+        empty = ResultsSink(os.path.join(tmp, 'empty.jsonl'))
+        empty.write_json(output, {'stats': {}})
+        with open(output, 'r', encoding='utf-8') as f:
+            assert json.load(f)['results'] == []
+
+
+if __name__ == "__main__":
+    try:
+        test_append_and_stream_back()
+        test_reopen_truncates_partial_line()
+        test_write_json_summary()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
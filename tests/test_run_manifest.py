@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+测试运行清单（RunManifest）的检查点记录与中断恢复
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import run_manifest
+from run_manifest import RunManifest
+from directory_scanner import DirectoryScanner
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_checkpoints_survive_reload():
+    """测试检查点在重新加载后可读取，失败和写了一半的记录不算完成"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = RunManifest.create(tmp, 'DirectoryScanner', tmp, {'model': 'm'})
+        manifest.record({'file_path': 'a.py', 'status': 'success', 'analysis': 'ok'})
+        manifest.record({'file_path': 'b.py', 'status': 'failed', 'error': 'timeout'})
+        with open(manifest.results_file, 'a', encoding='utf-8') as f:
+            f.write('{"file_path": "c.py", "sta')  # 模拟进程在写入时被杀
+
+        loaded = RunManifest.load(tmp, manifest.run_id)
+        assert loaded.results.completed_files() == ['a.py']
+        assert loaded.results.get('a.py')['analysis'] == 'ok'
+
+        done, pending = loaded.split_pending([os.path.join(tmp, n) for n in ('a.py', 'b.py', 'c.py')], tmp)
+        assert done == [os.path.join(tmp, 'a.py')]
+        assert pending == [os.path.join(tmp, 'b.py'), os.path.join(tmp, 'c.py')]
+
+
+def test_record_all_updates_status_and_stats():
+    """测试逐个记录结果：中断时标记 interrupted，恢复完成后按结果流统计成功和失败数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [os.path.join(tmp, n) for n in ('a.py', 'b.py', 'c.py')]
+        manifest, done, pending = RunManifest.start(tmp, 'DirectoryScanner', tmp, files)
+        assert done == [] and pending == files
+
+        def interrupted():
+            yield {'file_path': 'a.py', 'status': 'success'}
+            raise KeyboardInterrupt
+
+        stats = {}
+        try:
+            manifest.record_all(interrupted(), stats)
+            assert False, "应该被中断"
+        except KeyboardInterrupt:
+            pass
+        assert RunManifest.load(tmp, manifest.run_id).info['status'] == 'interrupted'
+
+        stats = {}
+        manifest, done, pending = RunManifest.start(tmp, 'DirectoryScanner', tmp, files,
+                                                    resume=manifest.run_id, stats=stats)
+        assert done == files[:1] and stats['resumed_files'] == 1
+        sink = manifest.record_all([{'file_path': 'b.py', 'status': 'success'},
+                                    {'file_path': 'c.py', 'status': 'failed'}], stats)
+        assert stats['analyzed_files'] == 2 and stats['failed_files'] == 1
+        assert sorted(sink.completed_files()) == ['a.py', 'b.py']
+        assert RunManifest.load(tmp, manifest.run_id).info['status'] == 'completed'
+
+
+def test_resume_unknown_run():
+    """测试恢复不存在或扫描器不同的运行时报错"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for resume, scanner in (('missing', 'DirectoryScanner'), (None, 'IntelligentDirectoryScanner')):
+            if resume is None:
+                resume = RunManifest.create(tmp, 'DirectoryScanner', tmp).run_id
+            try:
+                RunManifest.open(tmp, scanner, tmp, resume=resume)
+                assert False, "应该抛出 ValueError"
+            except ValueError:
+                pass
+
+
+def test_prune_keeps_recent_runs(monkeypatch):
+    """测试默认目录只保留最近的运行，过期的运行被删除，要恢复的运行不会被清理"""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setattr(run_manifest, 'DEFAULT_KEEP_RUNS', 2)
+        monkeypatch.setattr(run_manifest, 'DEFAULT_RUNS_DIR', tmp)
+        run_ids = []
+        for day in range(4):
+            run_id = f"2026010{day + 1}_000000_abcdef"
+            os.makedirs(os.path.join(tmp, run_id))
+            RunManifest(os.path.join(tmp, run_id), {'run_id': run_id, 'scanner': 'DirectoryScanner',
+                                                    'root_dir': tmp}).update(status='interrupted')
+            run_ids.append(run_id)
+        stale = os.path.join(tmp, run_ids[3], 'manifest.json')
+        old = time.time() - 30 * 86400
+        os.utime(stale, (old, old))
+
+        assert RunManifest.prune(tmp, keep=3) == [run_ids[3], run_ids[0]]
+        assert sorted(os.listdir(tmp)) == run_ids[1:3]
+
+        # 恢复最旧的运行时它不会被清理，其余运行按 DEFAULT_KEEP_RUNS 保留
+        RunManifest.create(tmp, 'DirectoryScanner', tmp)
+        resumed = RunManifest.open(tmp, 'DirectoryScanner', tmp, resume=run_ids[1])
+        assert resumed.run_id == run_ids[1]
+        assert len(os.listdir(tmp)) == 3 and run_ids[1] in os.listdir(tmp)
+
+
+def test_scanner_resume_skips_finished_files():
+    """测试扫描中断后恢复只分析剩余文件，汇总包含全部结果"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = os.path.join(tmp, 'project')
+        os.makedirs(project)
+        for name in ('a.py', 'b.py', 'c.py'):
+            _write(os.path.join(project, name), f'# {name}\n')
+        output = os.path.join(tmp, 'reports')
+
+        prompts = []
+
+        def interrupted(prompt):
+            if len(prompts) == 2:
+                raise KeyboardInterrupt
+            prompts.append(prompt)
+            return 'analysis'
+
+        scanner = DirectoryScanner(project, output_dir=output)
+        scanner.ollama_client.generate_response = interrupted
+        try:
+            scanner.analyze_all()
+            assert False, "应该被中断"
+        except KeyboardInterrupt:
+            pass
+        run_id = scanner.run_id
+        assert RunManifest.load(RunManifest.runs_dir_for(output), run_id).info['status'] == 'interrupted'
+
+        prompts.clear()
+        resumed = DirectoryScanner(project, output_dir=output, resume=run_id)
+        resumed.ollama_client.generate_response = lambda prompt: prompts.append(prompt) or 'analysis'
+        results = resumed.analyze_all()
+
+        files = [os.path.relpath(f, project) for f in resumed.scan_directory()]
+        assert len(prompts) == 1 and files[-1] in prompts[0]
+        assert sorted(r['file_path'] for r in results) == sorted(files)
+        assert all(r['status'] == 'success' and r['analysis'] == 'analysis' for r in results)
+        assert resumed.stats['resumed_files'] == 2 and resumed.stats['analyzed_files'] == 3
+        assert all(run_id in r['report_file'] for r in results)
+        assert RunManifest.load(RunManifest.runs_dir_for(output), run_id).info['status'] == 'completed'
+
+
+if __name__ == "__main__":
+    try:
+        test_checkpoints_survive_reload()
+        test_record_all_updates_status_and_stats()
+        test_resume_unknown_run()
+        test_scanner_resume_skips_finished_files()
+
+        print("\n" + "=" * 80)
+        print("✅ 所有测试完成！")
+        print("=" * 80)
+
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+测试整数索引的 CSR 图（SymbolGraph）及其字典视图
+"""
+
+import sys
+import os
+import json
+import random
+from collections import defaultdict
+
+# 添加 src 目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from symbol_graph import SymbolGraph
+from call_chain_analyzer import CallChainAnalyzer
+
+
+def test_views_match_set_based_graph():
+    """测试随机增量插入（含重复边）后，正反向视图与 defaultdict(set) 一致"""
+    rng = random.Random(7)
+    graph = SymbolGraph()
+    forward, reverse = defaultdict(set), defaultdict(set)
+    for round_ in range(5):
+        for _ in range(400):
+            src, dst = f'f{rng.randrange(120)}', f'f{rng.randrange(150)}'
+            graph.add_edge(src, dst)
+            forward[src].add(dst)
+            reverse[dst].add(src)
+        # 每轮插入后查询一次，触发与已有索引的归并
+        assert {k: set(v) for k, v in graph.forward.items()} == forward
+        assert {k: set(v) for k, v in graph.reverse.items()} == reverse
+
+    assert graph.edge_count == sum(len(v) for v in forward.values())
+    assert len(graph.forward) == len(forward) and len(graph.reverse) == len(reverse)
+    assert set(graph.edges()) == {(s, d) for s, ds in forward.items() for d in ds}
+
+
+def test_view_behaves_like_dict():
+    """测试视图的键集合只包含有边的节点，缺失的键与普通字典行为一致"""
+    graph = SymbolGraph()
+    graph.add_edges('main', ['parse', 'run', 'parse'])
+    graph.intern('orphan')
+
+    assert graph.forward['main'] == ['parse', 'run']
+    assert 'parse' not in graph.forward and 'orphan' not in graph.reverse
+    assert graph.forward.get('parse') is None
+    assert graph.reverse.degree('run') == 1
+    try:
+        graph.forward['missing']
+        assert False, 'expected KeyError'
+    except KeyError:
+        pass
+    assert json.loads(json.dumps(graph.reverse.to_dict())) == {'parse': ['main'], 'run': ['main']}
+
+
+def test_call_chain_report_uses_graph_views():
+    """测试调用链报告和 Mermaid 图基于 CSR 视图生成"""
+    analyzer = CallChainAnalyzer(language='Python')
+    code = "def a():\n    b()\n    c()\n\ndef b():\n    c()\n\ndef c():\n    pass\n"
+    result = analyzer.build_call_graph(code, 'm.py')
+
+    calls = analyzer.summarize_file(code, 'm.py')['calls']
+    assert {k: sorted(v) for k, v in result['call_graph'].items()} == {k: v for k, v in calls.items() if v}
+    assert sorted(result['reverse_call_graph']['c']) == sorted(k for k, v in calls.items() if 'c' in v)
+    edge_count = sum(len(v) for v in calls.values())
+    assert f'**调用关系数**: {edge_count}' in analyzer.generate_call_chain_report()
+    assert analyzer.generate_mermaid_diagram().count('-->') == edge_count
@@ -1,17 +1,20 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context
 import os
+import json
 import sys
 import markdown
 from datetime import datetime
 import glob
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add src directory to path, so llm.* resolves to the same modules the scanners and agent use
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from src.llm.ollama_client import OllamaClient
-from src.llm.git_analyzer import GitAnalyzer
-from src.prompts.java_analysis import get_java_analysis_prompt
-from src.prompts.impact_analysis import get_impact_analysis_prompt, get_quality_report_prompt
+from llm.ollama_client import OllamaClient
+from llm.load_balancer import parse_base_urls
+from llm.response_cache import get_cache
+from llm.git_analyzer import GitAnalyzer
+from prompts.java_analysis import get_java_analysis_prompt
+from prompts.impact_analysis import get_impact_analysis_prompt, get_quality_report_prompt
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -20,6 +23,12 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'web_reports')
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# Shared Ollama client: requests reuse its pooled keep-alive connections and
+# answer repeated prompts from the persistent response cache
+# OLLAMA_API_URL may list several comma-separated servers to load-balance over
+OLLAMA_URLS = parse_base_urls(os.environ.get('OLLAMA_API_URL', 'http://localhost:11434'))
+ollama_client = OllamaClient(base_url=OLLAMA_URLS, cache=get_cache())
+
 @app.route('/')
 def index():
     """Main dashboard"""
@@ -75,6 +84,26 @@ def view_report(filename):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_code_prompt(code, language):
+    """Build the analysis prompt for a code snippet"""
+    if language == 'java':
+        return get_java_analysis_prompt('snippet.java', code)
+    # Generic analysis for other languages
+    return f"""
+            You are an expert code reviewer. Analyze the following {language} code:
+            
+            ```{language}
+            {code}
+            ```
+            
+            Provide:
+            1. Functionality summary
+            2. Potential bugs or issues
+            3. Improvement suggestions
+            
+            Output in Markdown format.
+            """
+
 @app.route('/analyze', methods=['POST'])
 def analyze_code():
     """Analyze code snippet or file"""
@@ -88,27 +117,10 @@ def analyze_code():
         return jsonify({'error': 'No code provided'}), 400
     
     try:
-        client = OllamaClient()
+        client = ollama_client
         
         # Generate appropriate prompt based on language
-        if language == 'java':
-            prompt = get_java_analysis_prompt('snippet.java', code)
-        else:
-            # Generic analysis for other languages
-            prompt = f"""
-            You are an expert code reviewer. Analyze the following {language} code:
-            
-            ```{language}
-            {code}
-            ```
-            
-            Provide:
-            1. Functionality summary
-            2. Potential bugs or issues
-            3. Improvement suggestions
-            
-            Output in Markdown format.
-            """
+        prompt = build_code_prompt(code, language)
         
         # Get analysis
         analysis = client.generate_response(prompt)
@@ -125,6 +137,41 @@ def analyze_code():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_code_stream():
+    """
+    Analyze a code snippet and stream tokens as they are generated
+
+    Returns an NDJSON stream: one {"token": ...} object per chunk, then {"error": ...}
+    if generation failed, and always a final {"done": true, "html": ..., "metrics": {...}}
+    with the rendered analysis
+    """
+    data = request.json or {}
+    code = data.get('code', '')
+    language = data.get('language', 'java')
+    
+    if not code:
+        return jsonify({'error': 'No code provided'}), 400
+    
+    prompt = build_code_prompt(code, language)
+    
+    def generate():
+        metrics = {}
+        tokens = []
+        try:
+            for token in ollama_client.generate_stream(prompt, metrics):
+                tokens.append(token)
+                yield json.dumps({'token': token}, ensure_ascii=False) + '\n'
+        except Exception as e:
+            metrics['error'] = str(e)
+        error = metrics.pop('error', None)
+        if error:
+            yield json.dumps({'error': error}, ensure_ascii=False) + '\n'
+        html_content = markdown.markdown(''.join(tokens), extensions=['fenced_code', 'tables'])
+        yield json.dumps({'done': True, 'html': html_content, 'metrics': metrics}, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/analyze-repo', methods=['POST'])
 def analyze_repository():
     """Analyze a Git repository"""
@@ -170,8 +217,6 @@ def analyze_repository():
 def health():
     """Health check endpoint"""
     try:
-        client = OllamaClient()
-        # Simple test
         return jsonify({
             'status': 'healthy',
             'ollama': 'connected'
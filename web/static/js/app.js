@@ -60,7 +60,8 @@ document.getElementById('analyze-btn').addEventListener('click', async () => {
     spinner.style.display = 'inline-block';
     
     try {
-        const response = await fetch('/analyze', {
+        // Stream tokens as they are generated (NDJSON: token lines, optional error, final done line)
+        const response = await fetch('/analyze/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -72,20 +73,52 @@ document.getElementById('analyze-btn').addEventListener('click', async () => {
             })
         });
         
-        const data = await response.json();
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || response.statusText);
+        }
         
-        if (data.success) {
-            // Show result
-            const resultContainer = document.getElementById('analysis-result');
-            const resultContent = document.getElementById('analysis-content');
-            
-            resultContent.innerHTML = data.html;
-            resultContainer.style.display = 'block';
-            
-            // Scroll to result
-            resultContainer.scrollIntoView({ behavior: 'smooth' });
-        } else {
-            alert('分析失败: ' + data.error);
+        const resultContainer = document.getElementById('analysis-result');
+        const resultContent = document.getElementById('analysis-content');
+        resultContent.textContent = '';
+        resultContainer.style.display = 'block';
+        resultContainer.scrollIntoView({ behavior: 'smooth' });
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let error = null;
+        
+        const handleLine = (line) => {
+            if (!line.trim()) {
+                return;
+            }
+            const message = JSON.parse(line);
+            if (message.token) {
+                text += message.token;
+                resultContent.textContent = text;
+            } else if (message.error) {
+                error = message.error;
+            } else if (message.done && !error) {
+                resultContent.innerHTML = message.html;
+            }
+        };
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
+        }
+        handleLine(buffer + decoder.decode());
+        
+        if (error) {
+            alert('分析失败: ' + error);
         }
     } catch (error) {
         alert('请求失败: ' + error.message);